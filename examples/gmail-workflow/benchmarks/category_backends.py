@@ -0,0 +1,93 @@
+"""
+Compares category classifier backends (torch fp32, torch int8, onnxruntime)
+and the embedding category engine ('embedding') on a fixed labelled email set: accuracy against the labels, agreement with
+the first backend, load time and throughput.
+
+Usage:
+    python benchmarks/category_backends.py [--backends torch,torch-int8,onnx,embedding]
+        [--data benchmarks/data/labelled_emails.jsonl] [--batch-size 8]
+"""
+import argparse
+import json
+import time
+
+from common import LABELLED_EMAILS, email_text, load_analyzer_step, read_jsonl
+
+from email_analysis.inference import build_category_model, classify_texts
+
+
+def run_backend(backend, model, embedding_model, labels, texts, batch_size):
+    started = time.perf_counter()
+    if backend == 'embedding':
+        classifier = build_category_model('embedding', embedding_model=embedding_model)
+    else:
+        classifier = build_category_model('zero-shot', model, backend)
+    load_seconds = time.perf_counter() - started
+
+    # One untimed call so lazy initialization is not counted as throughput
+    classify_texts(classifier, texts[:1], labels)
+
+    predictions = []
+    started = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        for result in classify_texts(classifier, texts[offset:offset + batch_size], labels):
+            predictions.append(result['labels'][0])
+    elapsed = time.perf_counter() - started
+
+    return {
+        'backend': backend,
+        'load_seconds': load_seconds,
+        'emails_per_second': len(texts) / elapsed if elapsed else 0,
+        'predictions': predictions
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backends', default='torch,torch-int8,onnx', help='Comma-separated backends, the first is the baseline')
+    parser.add_argument('--data', default=LABELLED_EMAILS, help='JSONL file of emails with a "label" field')
+    parser.add_argument('--model', default=None, help='Category model id (defaults to the analyzer model)')
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--json', dest='json_output', default=None, help='Also write the report to this file')
+    args = parser.parse_args()
+
+    step = load_analyzer_step()
+    model = args.model or step.CATEGORY_MODEL
+    labels = step.EMAIL_CATEGORIES
+
+    emails = list(read_jsonl(args.data))
+    texts = [email_text(email) for email in emails]
+    expected = [email['label'] for email in emails]
+
+    report = []
+    baseline = None
+    for backend in [value.strip() for value in args.backends.split(',') if value.strip()]:
+        try:
+            run = run_backend(backend, model, step.CATEGORY_EMBEDDING_MODEL, labels, texts, args.batch_size)
+        except Exception as e:
+            print(f"{backend}: skipped ({e})")
+            continue
+
+        predictions = run.pop('predictions')
+        if baseline is None:
+            baseline = predictions
+
+        run['accuracy'] = sum(p == e for p, e in zip(predictions, expected)) / len(expected)
+        run['main_category_accuracy'] = sum(
+            p.split('.')[0] == e.split('.')[0] for p, e in zip(predictions, expected)
+        ) / len(expected)
+        run['agreement_with_baseline'] = sum(p == b for p, b in zip(predictions, baseline)) / len(baseline)
+        report.append(run)
+
+    print(f"{'backend':<12} {'load s':>7} {'emails/s':>9} {'accuracy':>9} {'main acc':>9} {'agreement':>10}")
+    for run in report:
+        print(f"{run['backend']:<12} {run['load_seconds']:>7.1f} {run['emails_per_second']:>9.2f} "
+              f"{run['accuracy']:>9.2%} {run['main_category_accuracy']:>9.2%} {run['agreement_with_baseline']:>10.2%}")
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump({'model': model, 'emails': len(emails), 'backends': report}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
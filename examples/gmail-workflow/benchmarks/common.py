@@ -0,0 +1,35 @@
+import importlib.util
+import json
+import os
+import sys
+
+BENCHMARKS_DIR = os.path.dirname(os.path.realpath(__file__))
+STEPS_DIR = os.path.join(BENCHMARKS_DIR, '..', 'steps')
+ANALYZER_STEP = os.path.join(STEPS_DIR, 'analyze-email.step.py')
+LABELLED_EMAILS = os.path.join(BENCHMARKS_DIR, 'data', 'labelled_emails.jsonl')
+
+sys.path.append(STEPS_DIR)
+
+
+def load_analyzer_step():
+    """
+    Imports steps/analyze-email.step.py as a module (its file name is not a
+    valid module name). Environment variables must be set before calling.
+    """
+    spec = importlib.util.spec_from_file_location('analyze_email_step', ANALYZER_STEP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def email_text(email):
+    # Same combination the analyzer classifies
+    return f"{email.get('subject', '')}\n\n{email.get('snippet', '')}"
@@ -0,0 +1,108 @@
+"""
+Compares deadline detection and recency scoring of the previous analyze_urgency
+code (raw pattern strings passed to re.search, naive datetime.now() against
+parsed dates) with email_analysis.temporal, over the labelled corpus with a
+realistic mix of date formats.
+
+Usage:
+    python benchmarks/deadline_extraction.py [--emails 20000]
+"""
+import argparse
+import contextlib
+import io
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+from common import LABELLED_EMAILS, email_text, read_jsonl
+
+from email_analysis.temporal import find_deadline, parse_email_date, recency_score
+
+LEGACY_DATE_PATTERNS = [
+    r'\b(?:due|by|before)(?:\s+the)?\s+(\d{1,2}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec))',
+    r'\b(?:due|by|before)(?:\s+the)?\s+(\d{1,2}/\d{1,2}(?:/\d{2,4})?)',
+    r'\b(?:due|by|before)(?:\s+the)?\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
+]
+
+DEADLINE_PHRASES = [
+    '', '', '', ' Please send it by friday.', ' The report is due 15th of mar.',
+    ' Payment due by 04/30.', ' Reply before the 3 jun please.', ' Submit by 12/01/2025.'
+]
+
+
+def legacy(text_lower, date_str):
+    deadline = False
+    for pattern in LEGACY_DATE_PATTERNS:
+        if re.search(pattern, text_lower):
+            deadline = True
+            break
+
+    recency = 0
+    try:
+        email_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        now = datetime.now()
+        hours_old = (now - email_date).total_seconds() / 3600
+        if hours_old < 12:
+            recency = max(0, 0.2 - (hours_old / 60))
+    except Exception as e:
+        print(f"Error parsing date: {e}")
+    return deadline, recency
+
+
+def current(text_lower, date_str, now):
+    sent = parse_email_date(date_str)
+    deadline = find_deadline(text_lower, (sent or now).date())
+    return deadline, recency_score(sent, now)
+
+
+def build_corpus(rng, count):
+    base = [email_text(email).lower() for email in read_jsonl(LABELLED_EMAILS)]
+    now = datetime.now(timezone.utc)
+    corpus = []
+    for _ in range(count):
+        sent = now - timedelta(hours=rng.uniform(0, 48))
+        # Gmail dates are offset-aware; naive ones come from the handler's default
+        date_str = rng.choice([
+            sent.isoformat(),
+            sent.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            sent.astimezone(timezone(timedelta(hours=-5))).isoformat(),
+            sent.astimezone().replace(tzinfo=None).isoformat()
+        ])
+        corpus.append((rng.choice(base) + rng.choice(DEADLINE_PHRASES), date_str))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--emails', type=int, default=20000, help='Number of emails to score')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(random.Random(args.seed), args.emails)
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        started = time.perf_counter()
+        legacy_results = [legacy(text, date_str) for text, date_str in corpus]
+        legacy_us = (time.perf_counter() - started) / len(corpus) * 1e6
+    legacy_errors = output.getvalue().count('\n')
+
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    current_results = [current(text, date_str, now) for text, date_str in corpus]
+    current_us = (time.perf_counter() - started) / len(corpus) * 1e6
+
+    print(f"{'':>8} {'us/email':>9} {'deadlines':>10} {'recent':>7} {'errors printed':>15}")
+    for name, per_email, results, errors in (
+        ('legacy', legacy_us, legacy_results, legacy_errors),
+        ('temporal', current_us, current_results, 0)
+    ):
+        deadlines = sum(1 for deadline, _ in results if deadline)
+        recent = sum(1 for _, recency in results if recency)
+        print(f"{name:>8} {per_email:>9.1f} {deadlines:>10} {recent:>7} {errors:>15}")
+    print(f"speedup: {legacy_us / current_us:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Checks HeuristicScorer importance results against the previous
+analyze_importance code (one running sum per email) for every combination of
+importance factors. Exits with status 1 when a score, level or factor set
+differs.
+
+Usage:
+    python benchmarks/heuristic_scoring.py
+"""
+import itertools
+import sys
+
+import common  # noqa: F401 (puts steps/ on the path)
+
+from email_analysis.lexicon import KeywordMatcher
+from email_analysis.scoring import HeuristicScorer
+
+VIP_SENDERS = ["boss", "ceo", "director", "manager", "supervisor", "client"]
+
+GREETINGS = ['', 'Dear team, ', 'hi there, ']
+# Body lengths around each threshold: very short, neither, optimal, too long
+LENGTHS = [20, 49, 50, 75, 99, 100, 800, 1500, 1501, 2000]
+SENDERS = ['newsletter@example.com', 'The Boss <boss@example.com>']
+SUBJECTS = ['Weekly update', 'Re: Weekly update']
+
+
+def legacy_importance(sender, subject, content):
+    importance_score = 0.5
+    factors = {}
+
+    sender_lower = sender.lower()
+    for vip in VIP_SENDERS:
+        if vip in sender_lower:
+            importance_score += 0.2
+            factors["vip_sender"] = 0.2
+            break
+
+    if "dear" in content.lower()[:100] or "hi " in content.lower()[:50]:
+        importance_score += 0.1
+        factors["direct_addressing"] = 0.1
+
+    content_length = len(content)
+    if 100 <= content_length <= 1500:
+        importance_score += 0.1
+        factors["optimal_length"] = 0.1
+    elif content_length < 50:
+        importance_score -= 0.1
+        factors["very_short"] = -0.1
+
+    if "re:" in subject.lower():
+        importance_score += 0.1
+        factors["is_reply"] = 0.1
+
+    question_count = content.count('?')
+    if question_count > 0:
+        question_factor = min(question_count * 0.05, 0.2)
+        importance_score += question_factor
+        factors["questions"] = question_factor
+
+    importance_score = max(0, min(importance_score, 1.0))
+    if importance_score > 0.7:
+        importance = "high"
+    elif importance_score > 0.4:
+        importance = "medium"
+    else:
+        importance = "low"
+    return {'importance': importance, 'score': importance_score, 'factors': factors}
+
+
+def build_scorer():
+    return HeuristicScorer(
+        {}, [], [], VIP_SENDERS, KeywordMatcher({'urgency': []}), KeywordMatcher({'vip': VIP_SENDERS})
+    )
+
+
+def body(greeting, questions, length):
+    text = greeting + '?' * questions
+    return (text + 'x' * length)[:max(length, len(text))]
+
+
+def combinations():
+    for sender, subject, greeting, questions, length in itertools.product(
+        SENDERS, SUBJECTS, GREETINGS, range(6), LENGTHS
+    ):
+        yield sender, subject, body(greeting, questions, length)
+
+
+def check_parity(scorer):
+    emails = list(combinations())
+    senders, subjects, contents = zip(*emails)
+    results = scorer.score_importance(senders, subjects, contents, breakdown=True)
+
+    mismatches = []
+    for email, result in zip(emails, results):
+        expected = legacy_importance(*email)
+        if (result['importance'] != expected['importance']
+                or abs(result['score'] - expected['score']) > 1e-9
+                or set(result['factors']) != set(expected['factors'])):
+            mismatches.append((email[0], email[1], email[2][:20], len(email[2]), expected, result))
+    return len(emails), mismatches
+
+
+def main():
+    checked, mismatches = check_parity(build_scorer())
+    print(f"Parity: {checked - len(mismatches)}/{checked} factor combinations match the previous scorer")
+    for mismatch in mismatches:
+        print("  mismatch:", mismatch)
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
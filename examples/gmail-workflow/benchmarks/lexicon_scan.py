@@ -0,0 +1,87 @@
+"""
+Compares both KeywordMatcher modes (one str.find loop per keyword, and the
+single trie-regex pass) against the previous `keyword in text` scan per
+lexicon entry, for growing lexicon sizes. The last column is the mode
+KeywordMatcher picks by default (SUBSTRING_SCAN_MAX_KEYWORDS); the previous
+scan only tests presence, while the matcher also reports positions.
+
+Usage:
+    python benchmarks/lexicon_scan.py [--sizes 10,55,100,500,1000] [--emails 2000]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'steps'))
+
+from email_analysis.lexicon import SUBSTRING_SCAN_MAX_KEYWORDS, KeywordMatcher
+
+BASE_WORDS = [
+    "urgent", "deadline", "offer", "discount", "meeting", "invoice", "today",
+    "tomorrow", "update", "newsletter", "please", "review", "attached", "thanks",
+    "schedule", "project", "client", "report", "sale", "reminder", "fyi"
+]
+
+
+def random_word(rng):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+
+
+def pick_word(rng):
+    return rng.choice(BASE_WORDS) if rng.random() < 0.1 else random_word(rng)
+
+
+def build_corpus(rng, count):
+    emails = []
+    for _ in range(count):
+        # Roughly one word in ten is a lexicon keyword, as in ordinary mail
+        subject = ' '.join(pick_word(rng) for _ in range(rng.randint(3, 8)))
+        body = ' '.join(pick_word(rng) for _ in range(rng.randint(20, 120)))
+        emails.append(f"{subject}\n\n{body}".lower())
+    return emails
+
+
+def build_lexicon(rng, size):
+    keywords = list(BASE_WORDS[:min(size, len(BASE_WORDS))])
+    while len(keywords) < size:
+        keywords.append(random_word(rng))
+    return {keyword: 1.0 for keyword in keywords}
+
+
+def naive_scan(lexicon, text):
+    return [keyword for keyword in lexicon if keyword in text]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10,55,100,500,1000', help='Comma-separated lexicon sizes')
+    parser.add_argument('--emails', type=int, default=2000, help='Number of synthetic emails')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = build_corpus(rng, args.emails)
+
+    print(f"{'lexicon':>8} {'naive us/email':>15} {'find us/email':>14} {'regex us/email':>15} {'default':>8}")
+    for size in [int(value) for value in args.sizes.split(',')]:
+        lexicon = build_lexicon(rng, size)
+        timings = {'naive': lambda text: naive_scan(lexicon, text)}
+        for mode, limit in (('find', size), ('regex', 0)):
+            timings[mode] = KeywordMatcher({'lexicon': lexicon}, max_substring_keywords=limit).scan
+
+        per_email = {}
+        for mode, scan in timings.items():
+            started = time.perf_counter()
+            for text in corpus:
+                scan(text)
+            per_email[mode] = (time.perf_counter() - started) / len(corpus) * 1e6
+
+        default = 'find' if size <= SUBSTRING_SCAN_MAX_KEYWORDS else 'regex'
+        print(f"{size:>8} {per_email['naive']:>15.1f} {per_email['find']:>14.1f} {per_email['regex']:>15.1f} {default:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Replays a JSONL corpus of EmailResponse-shaped records through the analyzer
+handler offline, with a fake Motia context and a stubbed sentiment backend,
+and reports throughput, per-stage latency percentiles, peak RSS and model
+load time.
+
+Usage:
+    python benchmarks/replay.py [--corpus benchmarks/data/labelled_emails.jsonl]
+        [--repeat 10] [--concurrency 8] [--stub-category]
+        [--output report.json] [--baseline report.json --max-regression 0.1]
+        [--min-throughput 5]
+
+Exits with status 1 when the throughput regression threshold is crossed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+from types import SimpleNamespace
+
+from common import LABELLED_EMAILS, load_analyzer_step, read_jsonl
+
+from email_analysis.models import LazyModel
+
+STAGES = ('category', 'urgency', 'importance', 'state_write', 'handler')
+
+
+class FakeLogger:
+    def __init__(self):
+        self.errors = []
+
+    def info(self, message, data=None):
+        pass
+
+    def debug(self, message, data=None):
+        pass
+
+    def warn(self, message, data=None):
+        pass
+
+    def error(self, message, data=None):
+        self.errors.append(message)
+
+
+class InMemoryState:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, scope, key):
+        value = self.values.get((scope, key))
+        # Round-trip through JSON like the real state adapter
+        return json.loads(value) if value is not None else None
+
+    async def set(self, scope, key, value):
+        self.values[(scope, key)] = json.dumps(value)
+
+    async def delete(self, scope, key):
+        self.values.pop((scope, key), None)
+
+    async def get_group(self, scope):
+        return [json.loads(value) for (group, _), value in self.values.items() if group == scope]
+
+
+class FakeContext:
+    def __init__(self, state):
+        self.logger = FakeLogger()
+        self.state = state
+        self.emitted = []
+        self.trace_id = 'replay'
+
+    async def emit(self, event):
+        self.emitted.append(event)
+
+
+class StubSentimentBackend:
+    """
+    Deterministic stand-in for the sentiment model, so replays never hit the network
+    """
+
+    name = 'stub'
+
+    async def score(self, text):
+        return 0.3 + (sum(map(ord, text)) % 50) / 100
+
+
+class StubZeroShot:
+    """
+    Returns the categories in a fixed order, for measuring everything but the model
+    """
+
+    def __call__(self, sequences, candidate_labels, batch_size=None):
+        count = len(candidate_labels)
+        result = {'labels': list(candidate_labels), 'scores': [1 / count] * count}
+        if isinstance(sequences, str):
+            return result
+        return [dict(result, sequence=text) for text in sequences]
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def timed(samples, stage, fn):
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            samples[stage].append((time.perf_counter() - started) * 1000)
+    return wrapper
+
+
+def instrument(step, samples, stub_category):
+    step.sentiment_backend = StubSentimentBackend()
+
+    if stub_category:
+        step.classifier_model = LazyModel('category', StubZeroShot)
+
+    step.analyze_category = timed(samples, 'category', step.analyze_category)
+    step.analyze_urgency = timed(samples, 'urgency', step.analyze_urgency)
+    step.analyze_importance = timed(samples, 'importance', step.analyze_importance)
+
+    log_class = step.AnalysisLog
+
+    class TimedAnalysisLog(log_class):
+        async def append(self, record, timestamp=None):
+            started = time.perf_counter()
+            try:
+                return await super().append(record, timestamp)
+            finally:
+                samples['state_write'].append((time.perf_counter() - started) * 1000)
+
+    step.AnalysisLog = TimedAnalysisLog
+
+
+async def replay(step, emails, concurrency, samples):
+    state = InMemoryState()
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def run(email):
+        nonlocal errors
+        ctx = FakeContext(state)
+        async with semaphore:
+            started = time.perf_counter()
+            await step.handler(SimpleNamespace(**email), ctx)
+            samples['handler'].append((time.perf_counter() - started) * 1000)
+        errors += sum(1 for event in ctx.emitted if event['topic'] == 'gmail.email.analysis.error')
+
+    started = time.perf_counter()
+    await asyncio.gather(*[run(email) for email in emails])
+    return time.perf_counter() - started, errors
+
+
+def build_report(emails, elapsed, errors, samples, step):
+    return {
+        'emails': len(emails),
+        'errors': errors,
+        'elapsed_seconds': elapsed,
+        'emails_per_second': len(emails) / elapsed if elapsed else 0,
+        'latency_ms': {
+            stage: {
+                'p50': percentile(samples[stage], 0.50),
+                'p95': percentile(samples[stage], 0.95),
+                'p99': percentile(samples[stage], 0.99)
+            }
+            for stage in STAGES
+        },
+        # ru_maxrss is reported in KB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'model_load_ms': step.classifier_model.timings()['load_ms']
+    }
+
+
+def check_regression(report, baseline_path, max_regression, min_throughput):
+    failures = []
+
+    if min_throughput is not None and report['emails_per_second'] < min_throughput:
+        failures.append(f"throughput {report['emails_per_second']:.2f}/s is below the minimum {min_throughput:.2f}/s")
+
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        floor = baseline['emails_per_second'] * (1 - max_regression)
+        if report['emails_per_second'] < floor:
+            failures.append(
+                f"throughput {report['emails_per_second']:.2f}/s regressed more than {max_regression:.0%} "
+                f"from the baseline {baseline['emails_per_second']:.2f}/s"
+            )
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', default=LABELLED_EMAILS, help='JSONL file of EmailResponse-shaped records')
+    parser.add_argument('--repeat', type=int, default=1, help='Replay the corpus this many times')
+    parser.add_argument('--concurrency', type=int, default=8, help='Handlers running at the same time')
+    parser.add_argument('--stub-category', action='store_true', help='Replace the category model with a stub')
+    parser.add_argument('--output', default=None, help='Write the JSON report to this file')
+    parser.add_argument('--baseline', default=None, help='Previous JSON report to compare throughput against')
+    parser.add_argument('--max-regression', type=float, default=0.1, help='Allowed throughput drop vs the baseline')
+    parser.add_argument('--min-throughput', type=float, default=None, help='Minimum emails/sec')
+    args = parser.parse_args()
+
+    corpus = list(read_jsonl(args.corpus))
+    emails = [
+        dict(email, messageId=f"{email.get('messageId', index)}-{round_index}")
+        for round_index in range(args.repeat)
+        for index, email in enumerate(corpus)
+    ]
+
+    if args.stub_category:
+        # The stub replaces the in-process model, so keep inference in-process
+        os.environ['ANALYZER_CPU_WORKERS'] = '0'
+
+    step = load_analyzer_step()
+    samples = {stage: [] for stage in STAGES}
+    instrument(step, samples, args.stub_category)
+
+    elapsed, errors = asyncio.run(replay(step, emails, args.concurrency, samples))
+    report = build_report(emails, elapsed, errors, samples, step)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    failures = check_regression(report, args.baseline, args.max_regression, args.min_throughput)
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
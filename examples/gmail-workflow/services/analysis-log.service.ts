@@ -0,0 +1,94 @@
+import { FlowContext } from "@motiadev/core";
+
+export interface ProcessedEmail {
+  messageId: string;
+  threadId: string;
+  category: string;
+  urgency: string;
+  importance: string;
+  shouldArchive?: boolean;
+  processingTime: string;
+}
+
+export const ANALYSIS_SCOPE = 'email_analysis';
+const LOG_PREFIX = 'analysis_log';
+
+/**
+ * State layout of the analysis log written by steps/analyze-email.step.py
+ * (see email_analysis/analysis_log.py, which must use the same layout).
+ * Records live in the log's scope (email_analysis for live traffic); every
+ * index entry is a key of its own in an index group named after that scope,
+ * so concurrent appends never rewrite a list and logs never share an index.
+ */
+export const analysisLogKeys = {
+  record: (messageId: string) => `${LOG_PREFIX}:record:${messageId}`
+};
+
+export const analysisLogGroups = {
+  days: (scope: string) => `${scope}:${LOG_PREFIX}_days`,
+  day: (scope: string, day: string) => `${scope}:${LOG_PREFIX}_hours:${day}`,
+  bucket: (scope: string, day: string, hour: string) => `${scope}:${LOG_PREFIX}_bucket:${day}:${hour}`
+};
+
+/**
+ * Reads the append-only email analysis log bucket by bucket, so consumers
+ * never need to hold a whole day of records in memory
+ */
+export class AnalysisLogService {
+  constructor(
+    private readonly state: FlowContext['state'],
+    private readonly scope: string = ANALYSIS_SCOPE
+  ) {}
+
+  private async getList(group: string): Promise<string[]> {
+    const values = await this.state.getGroup<string>(group);
+    return Array.isArray(values) ? [...values].sort() : [];
+  }
+
+  async getDays(): Promise<string[]> {
+    return this.getList(analysisLogGroups.days(this.scope));
+  }
+
+  async *records(day?: string): AsyncGenerator<ProcessedEmail> {
+    const days = day ? [day] : await this.getDays();
+
+    for (const currentDay of days) {
+      const hours = await this.getList(analysisLogGroups.day(this.scope, currentDay));
+
+      for (const hour of hours) {
+        const messageIds = await this.getList(analysisLogGroups.bucket(this.scope, currentDay, hour));
+
+        for (const messageId of messageIds) {
+          const record = await this.state.get<ProcessedEmail>(this.scope, analysisLogKeys.record(messageId));
+          if (record) {
+            yield record;
+          }
+        }
+      }
+    }
+  }
+
+  /**
+   * Deletes every record and index group of this scope's log, leaving the
+   * logs of other scopes alone
+   *
+   * @returns Number of records deleted
+   */
+  async clear(): Promise<number> {
+    let deleted = 0;
+
+    for (const day of await this.getDays()) {
+      for (const hour of await this.getList(analysisLogGroups.day(this.scope, day))) {
+        for (const messageId of await this.getList(analysisLogGroups.bucket(this.scope, day, hour))) {
+          await this.state.delete(this.scope, analysisLogKeys.record(messageId));
+          deleted++;
+        }
+        await this.state.clear(analysisLogGroups.bucket(this.scope, day, hour));
+      }
+      await this.state.clear(analysisLogGroups.day(this.scope, day));
+    }
+
+    await this.state.clear(analysisLogGroups.days(this.scope));
+    return deleted;
+  }
+}
@@ -1,6 +1,7 @@
 import { FlowContext, Logger } from "@motiadev/core";
 import axios, { AxiosInstance } from "axios";
 import { appConfig } from "../config/default";
+import { AnalysisLogService } from "./analysis-log.service";
 
 export interface EmailSummary {
   totalEmails: number;
@@ -9,15 +10,6 @@ export interface EmailSummary {
   autoRespondedCount: number;
 }
 
-interface ProcessedEmail {
-  messageId: string;
-  threadId: string;
-  category: string;
-  urgency: string;
-  importance: string;
-  processingTime: string;
-}
-
 export class DiscordService {
   private axios: AxiosInstance;
 
@@ -35,16 +27,15 @@ export class DiscordService {
       autoRespondedCount: 0
     };
 
-    const processedEmailsRaw = await this.state.get<ProcessedEmail[]>('email_analysis', 'processed_emails') || [];
-    const processedEmails: ProcessedEmail[] = Array.isArray(processedEmailsRaw) ? processedEmailsRaw : [];
     const autoResponses = await this.state.get<string[]>('email_analysis', 'auto_responded_emails') || [];
+    const autoResponded = new Set(autoResponses);
 
     this.logger.info(`Auto-responses: ${JSON.stringify(autoResponses)}`);
-    this.logger.info(`Processed emails: ${JSON.stringify(processedEmails)}`);
 
-    summary.totalEmails = processedEmails.length;
+    // Stream the analysis log instead of loading every processed email at once
+    for await (const email of new AnalysisLogService(this.state).records()) {
+      summary.totalEmails++;
 
-    processedEmails.forEach(email => {
       if (email.category) {
         summary.categoryCounts[email.category] = (summary.categoryCounts[email.category] || 0) + 1;
       }
@@ -52,12 +43,11 @@ export class DiscordService {
       if (email.urgency) {
         summary.urgencyCounts[email.urgency] = (summary.urgencyCounts[email.urgency] || 0) + 1;
       }
-    });
 
-    summary.autoRespondedCount = autoResponses.filter((messageId: string) => {
-      const email = processedEmails.find(e => e.messageId === messageId);
-      return email != null;
-    }).length;
+      if (autoResponded.has(email.messageId)) {
+        summary.autoRespondedCount++;
+      }
+    }
 
     this.logger.info(`Summary: ${JSON.stringify(summary)}`);
 
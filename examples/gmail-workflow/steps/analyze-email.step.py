@@ -10,11 +10,33 @@ config = {
     'flows': ['gmail-flow']
 }
 
+import time
+
+MODULE_STARTED = time.perf_counter()
+
+import asyncio
 import os
-import re
+import sys
 from huggingface_hub import InferenceClient
 from datetime import datetime, timedelta
-from transformers import pipeline
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from email_analysis.analysis_log import AnalysisLog
+from email_analysis.batching import MicroBatcher
+from email_analysis.executors import AnalysisExecutors
+from email_analysis.fast_path import RuleClassifier
+from email_analysis.lexicon import KeywordMatcher
+from email_analysis.result_cache import AnalysisResultCache, config_fingerprint
+from email_analysis.scoring import HeuristicScorer
+from email_analysis.inference import (
+    build_category_model, classify_texts, classify_in_worker, init_classifier_worker, transformers_import_ms
+)
+from email_analysis.models import LazyModel
+from email_analysis.priority import realtime_gate
+from email_analysis.sentiment import create_sentiment_backend
+from email_analysis.threads import ThreadSummaries, known_thread
+from step_metrics import metrics
 
 HF_TOKEN = os.environ.get('HUGGINGFACE_API_TOKEN')
 if not HF_TOKEN:
@@ -26,8 +48,68 @@ client = InferenceClient(token=HF_TOKEN)
 CATEGORY_MODEL = "facebook/bart-large-mnli"  # For zero-shot classification
 URGENCY_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"  # For sentiment analysis
 
-classifier = pipeline("zero-shot-classification",
-                      model=CATEGORY_MODEL)
+# Blocking inference and HTTP calls run on bounded executors so the handler
+# never stalls the event loop. ANALYZER_CPU_WORKERS > 0 moves category
+# inference into a process pool where each worker loads its own model.
+ANALYZER_IO_WORKERS = int(os.environ.get('ANALYZER_IO_WORKERS', '4'))
+ANALYZER_CPU_WORKERS = int(os.environ.get('ANALYZER_CPU_WORKERS', '0'))
+
+# Inference backend of the category model: 'torch' (fp32), 'torch-int8'
+# (dynamic quantization) or 'onnx' (onnxruntime). Compare them with
+# benchmarks/category_backends.py before switching.
+CATEGORY_BACKEND = os.environ.get('CATEGORY_BACKEND', 'torch')
+
+# 'zero-shot' runs one NLI pass per (email, category) pair; 'embedding' encodes
+# each email once and scores it against cached category embeddings
+CATEGORY_ENGINE = os.environ.get('CATEGORY_ENGINE', 'zero-shot')
+CATEGORY_EMBEDDING_MODEL = os.environ.get('CATEGORY_EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+CATEGORY_MODEL_ARGS = (CATEGORY_ENGINE, CATEGORY_MODEL, CATEGORY_BACKEND, CATEGORY_EMBEDDING_MODEL)
+
+executors = AnalysisExecutors(
+    io_workers=ANALYZER_IO_WORKERS,
+    cpu_workers=ANALYZER_CPU_WORKERS,
+    cpu_initializer=init_classifier_worker,
+    cpu_initargs=CATEGORY_MODEL_ARGS
+)
+
+# The ~1.6 GB category model is loaded on first use (on the inference thread,
+# so the event loop stays responsive) rather than at import. Set
+# ANALYZER_WARMUP=true to start loading it in the background at process start.
+ANALYZER_WARMUP = os.environ.get('ANALYZER_WARMUP', 'false').lower() == 'true'
+
+classifier_model = LazyModel('category', lambda: build_category_model(*CATEGORY_MODEL_ARGS))
+
+# 'local' runs the sentiment model in-process (batched), falling back to the
+# Inference API on failure; 'remote' always calls the Inference API
+SENTIMENT_BACKEND = os.environ.get('SENTIMENT_BACKEND', 'remote')
+SENTIMENT_BATCH_SIZE = int(os.environ.get('SENTIMENT_BATCH_SIZE', '32'))
+SENTIMENT_BATCH_WINDOW_MS = int(os.environ.get('SENTIMENT_BATCH_WINDOW_MS', '20'))
+
+sentiment_backend = create_sentiment_backend(
+    SENTIMENT_BACKEND,
+    client=client,
+    model=URGENCY_MODEL,
+    executors=executors,
+    max_batch_size=SENTIMENT_BATCH_SIZE,
+    max_wait_ms=SENTIMENT_BATCH_WINDOW_MS
+)
+
+# Emails whose labels, sender and keywords already make the category obvious
+# skip the zero-shot model
+rule_classifier = RuleClassifier(threshold=float(os.environ.get('CATEGORY_FAST_PATH_THRESHOLD', '0.8')))
+
+# Thread-aware mode: follow-ups in a known thread reuse its category unless
+# their snippet drifts away from the thread's vocabulary
+THREAD_AWARE_ANALYSIS = os.environ.get('THREAD_AWARE_ANALYSIS', 'false').lower() == 'true'
+thread_summaries = ThreadSummaries(
+    max_threads=int(os.environ.get('THREAD_SUMMARY_SIZE', '10000')) if THREAD_AWARE_ANALYSIS else 0,
+    ttl_seconds=int(os.environ.get('THREAD_SUMMARY_TTL_SECONDS', '604800')),
+    similarity_threshold=float(os.environ.get('THREAD_SIMILARITY_THRESHOLD', '0.3'))
+)
+
+# Emails arriving within the window are classified together in one padded batch
+CATEGORY_BATCH_SIZE = int(os.environ.get('CATEGORY_BATCH_SIZE', '16'))
+CATEGORY_BATCH_WINDOW_MS = int(os.environ.get('CATEGORY_BATCH_WINDOW_MS', '20'))
 
 # Refined email categories with subcategories for better classification
 EMAIL_CATEGORIES = [
@@ -39,6 +121,19 @@ EMAIL_CATEGORIES = [
     "spam"
 ]
 
+# Category, sentiment and (when keyed by sender) importance results are cached
+# by a hash of the normalized subject and snippet. Set ANALYSIS_CACHE_PATH to
+# keep results across worker restarts, ANALYSIS_CACHE_SIZE=0 disables caching.
+# Keys include a fingerprint of the models, backends and categories, so a
+# changed configuration never reuses results of the previous one.
+result_cache = AnalysisResultCache(
+    max_entries=int(os.environ.get('ANALYSIS_CACHE_SIZE', '2048')),
+    ttl_seconds=int(os.environ.get('ANALYSIS_CACHE_TTL_SECONDS', '86400')),
+    include_sender=os.environ.get('ANALYSIS_CACHE_INCLUDE_SENDER', 'false').lower() == 'true',
+    path=os.environ.get('ANALYSIS_CACHE_PATH') or None,
+    fingerprint=config_fingerprint(CATEGORY_MODEL_ARGS, EMAIL_CATEGORIES, SENTIMENT_BACKEND, URGENCY_MODEL)
+)
+
 # Enhanced keywords specifically for detecting promotional emails with higher precision
 PROMOTION_KEYWORDS = {
     "discount": 1.0, "sale": 1.0, "offer": 0.9, "promo": 0.9,
@@ -70,7 +165,72 @@ LOW_URGENCY_PHRASES = [
 # Keywords that might indicate message importance
 VIP_SENDERS = ["boss", "ceo", "director", "manager", "supervisor", "client"]
 
+# Phrases that tie the email to a near-term point in time
+TIME_PHRASES = ["today", "tomorrow", "this week", "by end of day", "by eod", "by morning"]
+
+# Lexicons are compiled once and matched in a single pass per text
+text_matcher = KeywordMatcher({
+    'promotion': PROMOTION_KEYWORDS,
+    'urgency': URGENCY_KEYWORDS,
+    'low_urgency': LOW_URGENCY_PHRASES,
+    'time': TIME_PHRASES
+})
+
+sender_matcher = KeywordMatcher({
+    'vip': VIP_SENDERS,
+    'promotional_sender': PROMOTIONAL_DOMAINS
+})
+
+# Urgency and importance heuristics, batch-capable for bulk re-scoring
+scorer = HeuristicScorer(
+    URGENCY_KEYWORDS, LOW_URGENCY_PHRASES, TIME_PHRASES, VIP_SENDERS,
+    text_matcher, sender_matcher
+)
 
+
+def run_classifier(texts):
+    model = classifier_model.get()
+    started = time.perf_counter()
+    results = classify_texts(model, texts, EMAIL_CATEGORIES)
+    classifier_model.record_inference((time.perf_counter() - started) * 1000)
+    return results
+
+
+async def classify_batch(texts):
+    """
+    Runs the zero-shot classifier over a batch of texts on the inference executor
+
+    Arguments:
+        texts: List of combined email subject and content strings
+
+    Returns:
+        List of pipeline results ({labels, scores}) in the same order
+    """
+    if executors.uses_processes:
+        return await executors.run_cpu(classify_in_worker, texts, EMAIL_CATEGORIES)
+
+    return await executors.run_cpu(run_classifier, texts)
+
+
+category_batcher = MicroBatcher(
+    classify_batch,
+    max_batch_size=CATEGORY_BATCH_SIZE,
+    max_wait_ms=CATEGORY_BATCH_WINDOW_MS,
+    name='category'
+)
+
+if ANALYZER_WARMUP:
+    if executors.uses_processes:
+        # Spawns a worker, which loads its model in the pool initializer
+        executors.cpu.submit(classify_in_worker, ['warm up'], EMAIL_CATEGORIES)
+    else:
+        classifier_model.warm_up(lambda model: classify_texts(model, ['warm up'], EMAIL_CATEGORIES))
+
+MODULE_IMPORT_MS = (time.perf_counter() - MODULE_STARTED) * 1000
+
+
+@metrics.instrument('Email Analyzer')
+@realtime_gate.realtime
 async def handler(args, ctx):
     try:
         ctx.logger.info('Analyzing email' + str(args))
@@ -89,17 +249,19 @@ async def handler(args, ctx):
         # Combine subject and content for better analysis
         full_text = f"{subject}\n\n{content}"
 
+        # 'unknown' is a placeholder, not a thread to aggregate on
+        thread_key = known_thread(thread_id)
+
+        # Match every text lexicon in one pass, shared by the analyzers below
+        text_hits = text_matcher.scan(full_text.lower())
+
+        # Resent and templated emails reuse cached model results
+        cache_key = result_cache.key_for(subject, content, sender)
+
         # Check sender domain for promotional patterns
-        sender_domain = ""
-        if '@' in sender:
-            sender_domain = sender.split('@')[1].lower() if '@' in sender else ""
-            sender_local = sender.split('@')[0].lower() if '@' in sender else ""
-            
-            # Check if sender appears to be a promotional source
-            is_promo_sender = any(promo_term in sender_local for promo_term in PROMOTIONAL_DOMAINS)
-            
-            if is_promo_sender:
-                ctx.logger.info(f"Detected promotional sender: {sender}")
+        sender_terms = promotional_sender_terms(sender)
+        if sender_terms:
+            ctx.logger.info(f"Detected promotional sender: {sender}")
 
         ctx.logger.info('Processing email: ' +
                         f"messageId={message_id}, " +
@@ -108,27 +270,35 @@ async def handler(args, ctx):
                         f"from={sender}, " +
                         f"labels={label_ids}")
 
-        # Analyze email category
-        category_result = await analyze_category(full_text, ctx)
+        # Analyze category, urgency and importance concurrently
+        category_result, urgency_result, importance_result = await asyncio.gather(
+            metrics.track('category', analyze_category(
+                full_text, ctx, text_hits, cache_key, label_ids, sender_terms, thread_key
+            )),
+            metrics.track('urgency', analyze_urgency(full_text, subject, sender, date_str, ctx, text_hits, cache_key)),
+            metrics.track('importance', analyze_importance(sender, subject, content, ctx, cache_key))
+        )
         ctx.logger.info('Category analysis complete' + str(category_result))
-
-        # Analyze email urgency
-        urgency_result = await analyze_urgency(full_text, subject, sender, date_str, ctx)
         ctx.logger.info('Urgency analysis complete' + str(urgency_result))
-
-        # Analyze email importance
-        importance_result = await analyze_importance(sender, subject, content, ctx)
         ctx.logger.info('Importance analysis complete' + str(importance_result))
 
-        # Should email be archived? Default to false
-        should_archive = False
-        
-        # Set archive flag for promotional emails with low urgency and importance
-        if (category_result['category'].startswith('promotion.') or 
-            (category_result.get('promotion_score', 0) > 0.7)):
-            if urgency_result['urgency'] == 'low' and importance_result['importance'] == 'low':
-                should_archive = True
-                ctx.logger.info(f"Marking promotional email for archiving: {message_id}")
+        thread_urgency = thread_summaries.update(thread_key, full_text, category_result, urgency_result['score'])
+        if thread_urgency is not None:
+            urgency_result['thread_score'] = thread_urgency
+        ctx.logger.info('Analysis stats', {
+            'cache': result_cache.stats(),
+            'fastPath': rule_classifier.stats(),
+            'threads': thread_summaries.stats(),
+            'coldStart': {
+                'moduleImportMs': MODULE_IMPORT_MS,
+                'transformersImportMs': transformers_import_ms(),
+                'categoryModel': classifier_model.timings()
+            }
+        })
+
+        should_archive = is_archivable(category_result, urgency_result, importance_result)
+        if should_archive:
+            ctx.logger.info(f"Marking promotional email for archiving: {message_id}")
 
         # Emit the results
         await ctx.emit({
@@ -145,24 +315,20 @@ async def handler(args, ctx):
                 'shouldArchive': should_archive
             }
         })
-        state = await ctx.state.get('email_analysis', 'processed_emails')
-        
-        if state is None:
-            state = []
-
-        state.append({
-            'messageId': message_id,
-            'threadId': thread_id,
-            'category': category_result['category'],
-            'urgency': urgency_result['urgency'],
-            'importance': importance_result['importance'],
-            'shouldArchive': should_archive,
-            'processingTime': datetime.now().isoformat()
-        })
-        # Save analysis results to state
-        await ctx.state.set('email_analysis', 'processed_emails', state)
+        # Save analysis results to the append-only analysis log
+        with metrics.span('state_write'):
+            await AnalysisLog(ctx.state).append({
+                'messageId': message_id,
+                'threadId': thread_id,
+                'category': category_result['category'],
+                'urgency': urgency_result['urgency'],
+                'importance': importance_result['importance'],
+                'shouldArchive': should_archive,
+                'processingTime': datetime.now().isoformat()
+            })
     except Exception as e:
         ctx.logger.error(f"Error analyzing email: {str(e)}")
+        metrics.mark_error()
 
         # Emit error event for monitoring
         await ctx.emit({
@@ -183,43 +349,150 @@ async def handler(args, ctx):
         }
 
 
-async def analyze_category(text, ctx):
+def promotional_sender_terms(sender):
+    """
+    Returns the promotional terms (noreply, newsletter, ...) in the local part
+    of the sender address
+    """
+    if '@' not in sender:
+        return []
+    sender_local = sender.split('@')[0].lower()
+    return list(sender_matcher.scan(sender_local)['promotional_sender'])
+
+
+def is_archivable(category_result, urgency_result, importance_result):
+    # Promotional emails with low urgency and importance get archived
+    is_promotional = (category_result['category'].startswith('promotion.') or
+                      category_result.get('promotion_score', 0) > 0.7)
+    return is_promotional and urgency_result['urgency'] == 'low' and importance_result['importance'] == 'low'
+
+
+async def analyze_batch(emails, ctx):
+    """
+    Analyzes many EmailResponse-shaped records at once for bulk backfills.
+    Category inference goes through the same micro-batcher as live traffic,
+    and urgency and importance are scored as one batch.
+
+    Arguments:
+        emails: List of dicts with messageId, threadId, subject, snippet,
+            from, date and labelIds
+
+    Returns:
+        List of analysis records in the analysis log format, in input order
+    """
+    subjects = [email.get('subject', '') for email in emails]
+    contents = [email.get('snippet', '') for email in emails]
+    senders = [email.get('from', '') for email in emails]
+    dates = [email.get('date') or datetime.now().isoformat() for email in emails]
+    texts = [f"{subject}\n\n{content}" for subject, content in zip(subjects, contents)]
+    thread_keys = [known_thread(email.get('threadId')) for email in emails]
+    hits = [text_matcher.scan(text.lower()) for text in texts]
+    cache_keys = [result_cache.key_for(*fields) for fields in zip(subjects, contents, senders)]
+
+    category_results, sentiment_scores = await asyncio.gather(
+        asyncio.gather(*[
+            analyze_category(
+                text, ctx, text_hits, cache_key, email.get('labelIds', []), promotional_sender_terms(sender),
+                thread_key
+            )
+            for text, text_hits, cache_key, email, sender, thread_key
+            in zip(texts, hits, cache_keys, emails, senders, thread_keys)
+        ]),
+        asyncio.gather(*[score_sentiment(text, cache_key) for text, cache_key in zip(texts, cache_keys)])
+    )
+    urgency_results = scorer.score_urgency(texts, subjects, dates, sentiment_scores, hits=hits)
+    importance_results = scorer.score_importance(senders, subjects, contents)
+
+    for thread_key, text, category_result, urgency_result in zip(thread_keys, texts, category_results, urgency_results):
+        thread_summaries.update(thread_key, text, category_result, urgency_result['score'])
+
+    processing_time = datetime.now().isoformat()
+    return [
+        {
+            'messageId': email.get('messageId', 'unknown'),
+            'threadId': email.get('threadId', 'unknown'),
+            'category': category_result['category'],
+            'urgency': urgency_result['urgency'],
+            'importance': importance_result['importance'],
+            'shouldArchive': is_archivable(category_result, urgency_result, importance_result),
+            'processingTime': processing_time
+        }
+        for email, category_result, urgency_result, importance_result
+        in zip(emails, category_results, urgency_results, importance_results)
+    ]
+
+
+async def analyze_category(text, ctx, hits=None, cache_key=None, label_ids=None, sender_terms=None, thread_id=None):
     """
     Perform zero-shot classification to determine the email category
     
     Arguments:
         text: Combined email subject and content
+        hits: Optional text_matcher.scan() result for the lowercased text
+        cache_key: Optional result_cache key of the email
+        label_ids: Optional Gmail labelIds, used by the rule-based fast path
+        sender_terms: Optional promotional terms found in the sender local-part
+        thread_id: Optional Gmail threadId, used by the thread-aware mode
         
     Returns:
         Dictionary with category and confidence score
     """
     try:
-        # Use zero-shot classification to categorize the email
-        result = classifier(
-            text,
-            EMAIL_CATEGORIES,
-        )
-
-        # Get the top category and its score
-        top_category = result['labels'][0]
-        confidence = result['scores'][0]
-
-        # Get second-best category for potential refinement
-        second_category = result['labels'][1] if len(result['labels']) > 1 else -1
-        second_confidence = result['scores'][1] if len(result['scores']) > 1 else 0
-
         # Enhanced promotional email detection: Check for promotional signals in addition to classification
         # This helps catch promotional emails that might be misclassified
         promo_score = 0
         
         # Check for promotional keywords
-        text_lower = text.lower()
+        if hits is None:
+            hits = text_matcher.scan(text.lower())
+        promotion_hits = hits['promotion']
         for keyword, weight in PROMOTION_KEYWORDS.items():
-            if keyword in text_lower:
+            if keyword in promotion_hits:
                 promo_score += weight
         
         # Normalize the promo score
         promo_score = min(promo_score / 3.0, 1.0)  # Cap at 1.0
+
+        # Confident rule-based classification skips the model
+        fast_result = rule_classifier.classify(label_ids, sender_terms, promo_score)
+        if fast_result is not None:
+            fast_category, fast_confidence = fast_result
+            ctx.logger.info(f"Fast path category {fast_category} (confidence: {fast_confidence})")
+            return {
+                'category': fast_category,
+                'confidence': fast_confidence,
+                'alternative': -1,
+                'promotion_score': promo_score if promo_score > 0.3 else -1
+            }
+
+        # Follow-ups reuse the category of their thread
+        thread, thread_outcome = thread_summaries.match(thread_id, text)
+        if thread_outcome is not None:
+            metrics.increment(f"thread_{thread_outcome}")
+        if thread is not None:
+            return {
+                'category': thread['category'],
+                'confidence': thread['confidence'],
+                'alternative': -1,
+                'promotion_score': promo_score if promo_score > 0.3 else -1
+            }
+
+        cached = result_cache.get('category', cache_key)
+        if cached is not None:
+            return cached
+
+        # Use zero-shot classification to categorize the email, batched with
+        # any other emails being analyzed at the same time
+        result = await category_batcher.submit(text)
+        ctx.logger.info('Category batch stats', category_batcher.stats())
+
+        # Get the top category and its score
+        top_category = result['labels'][0]
+        confidence = result['scores'][0]
+
+        # Get second-best category for potential refinement
+        second_category = result['labels'][1] if len(result['labels']) > 1 else -1
+        second_confidence = result['scores'][1] if len(result['scores']) > 1 else 0
         
         # If strong promotional signals are detected, override classification
         if promo_score > 0.7 and not top_category.startswith("promotion."):
@@ -240,12 +513,15 @@ async def analyze_category(text, ctx):
                 # Potentially ambiguous, keep original top category but note low confidence
                 pass
 
-        return {
+        category_result = {
             'category': top_category,
             'confidence': confidence,
             'alternative': second_category if second_confidence > 0.3 else -1,
             'promotion_score': promo_score if promo_score > 0.3 else -1
         }
+        result_cache.set('category', cache_key, category_result)
+
+        return category_result
     except Exception as e:
         ctx.logger.error(f"Error in category analysis: {str(e)}")
         return {
@@ -254,7 +530,7 @@ async def analyze_category(text, ctx):
         }
 
 
-async def analyze_urgency(text, subject, sender, date_str, ctx):
+async def analyze_urgency(text, subject, sender, date_str, ctx, hits=None, cache_key=None):
     """
     Determines the urgency of the email using multiple signals:
     - Sentiment analysis
@@ -268,124 +544,22 @@ async def analyze_urgency(text, subject, sender, date_str, ctx):
         subject: Email subject line for special urgency keywords
         sender: Email sender for sender-based urgency signals
         date_str: Email date string for recency-based urgency
+        hits: Optional text_matcher.scan() result for the lowercased text
+        cache_key: Optional result_cache key; only the sentiment score is cached,
+            time-dependent factors are always recomputed
         
     Returns:
         Dictionary with urgency classification, score, and contributing factors
     """
     try:
-        urgency_factors = {}
-
-        # 1. Check for urgent keywords with weighted importance
-        subject_lower = subject.lower()
-        text_lower = text.lower()
-
-        # Check keywords in subject (weighted higher)
-        keyword_subject_score = 0
-        for keyword, weight in URGENCY_KEYWORDS.items():
-            if keyword in subject_lower:
-                keyword_subject_score += weight
-                urgency_factors[f"subject_keyword_{keyword}"] = weight
-
-        # Check keywords in body (weighted lower)
-        keyword_body_score = 0
-        for keyword, weight in URGENCY_KEYWORDS.items():
-            if keyword in text_lower and keyword not in subject_lower:  # Don't double-count
-                keyword_body_score += weight * 0.5  # Half weight for body
-                urgency_factors[f"body_keyword_{keyword}"] = weight * 0.5
-
-        # Combine keyword scores (capped at 1.0)
-        keyword_score = min(keyword_subject_score + (keyword_body_score * 0.5), 1.0)
-        urgency_factors["keyword_score"] = keyword_score
-
-        # 2. Check for low urgency phrases that might override
-        low_urgency_signals = 0
-        for phrase in LOW_URGENCY_PHRASES:
-            if phrase in text_lower:
-                low_urgency_signals += 1
-                urgency_factors[f"low_urgency_phrase_{phrase}"] = -0.2
-
-        low_urgency_modifier = min(low_urgency_signals * -0.2, -0.6)  # Cap negative effect
-        urgency_factors["low_urgency_modifier"] = low_urgency_modifier if low_urgency_signals > 0 else 0
-
-        # 3. Use sentiment analysis as part of urgency detection
-        result = client.text_classification(
-            text,
-            model=URGENCY_MODEL
-        )
-
-        # Extract the sentiment score
-        sentiment_score = 0.3  # Default moderate urgency
-        for item in result:
-            if item['label'] == 'NEGATIVE':
-                sentiment_score = item['score']
-                break
-
-        urgency_factors["sentiment_score"] = sentiment_score
-
-        # 4. Time-related urgency signals
-        time_urgency = 0
-
-        # Check for time-specific phrases
-        time_phrases = ["today", "tomorrow", "this week", "by end of day", "by eod", "by morning"]
-        for phrase in time_phrases:
-            if phrase in text_lower:
-                time_urgency += 0.15
-                urgency_factors[f"time_phrase_{phrase}"] = 0.15
-
-        # Check for dates and deadlines
-        date_patterns = [
-            r'\b(?:due|by|before)(?:\s+the)?\s+(\d{1,2}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec))',
-            r'\b(?:due|by|before)(?:\s+the)?\s+(\d{1,2}/\d{1,2}(?:/\d{2,4})?)',
-            r'\b(?:due|by|before)(?:\s+the)?\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
-        ]
-
-        for pattern in date_patterns:
-            if re.search(pattern, text_lower):
-                time_urgency += 0.2
-                urgency_factors["deadline_mentioned"] = 0.2
-                break
-
-        # 5. Recency factor - newer emails might be more urgent
-        recency_score = 0
-        try:
-            # Parse the date
-            email_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            now = datetime.now()
-
-            # Calculate recency (within last 12 hours is more urgent)
-            hours_old = (now - email_date).total_seconds() / 3600
-            if hours_old < 12:
-                recency_score = max(0, 0.2 - (hours_old / 60))  # Decay over time
-                urgency_factors["recency"] = recency_score
-        except Exception as e:
-            print(f"Error parsing date: {e}")
-
-        # 6. Combine all signals with appropriate weighting
-        # Formula priorities: keywords > time signals > sentiment > recency
-        urgency_score = (
-                (keyword_score * 0.5) +
-                (sentiment_score * 0.2) +
-                (time_urgency * 0.2) +
-                (recency_score * 0.1) +
-                (low_urgency_modifier)  # This can reduce urgency
-        )
-
-        # Clamp the final score
-        urgency_score = max(0, min(urgency_score, 1.0))
-
-        # Classify urgency level
-        if urgency_score > 0.7:
-            urgency = "high"
-        elif urgency_score > 0.4:
-            urgency = "medium"
-        else:
-            urgency = "low"
-
-        return {
-            'urgency': urgency,
-            'score': urgency_score,
-            'factors': urgency_factors
-        }
+        # Only the sentiment model call differs per email; all other signals
+        # are scored by the shared heuristic scorer
+        sentiment_score = await score_sentiment(text, cache_key)
+
+        return scorer.score_urgency(
+            [text], [subject], [date_str], [sentiment_score],
+            hits=[hits], breakdown=True
+        )[0]
     except Exception as e:
         ctx.logger.error(f"Error in urgency analysis: {str(e)}")
         return {
@@ -394,7 +568,16 @@ async def analyze_urgency(text, subject, sender, date_str, ctx):
         }
 
 
-async def analyze_importance(sender, subject, content, ctx):
+async def score_sentiment(text, cache_key=None):
+    # NEGATIVE label score, 0.3 (moderate urgency) when absent
+    sentiment_score = result_cache.get('sentiment', cache_key)
+    if sentiment_score is None:
+        sentiment_score = await sentiment_backend.score(text)
+        result_cache.set('sentiment', cache_key, sentiment_score)
+    return sentiment_score
+
+
+async def analyze_importance(sender, subject, content, ctx, cache_key=None):
     """
     Determines the importance of the email based on sender, subject patterns,
     and content analysis
@@ -403,70 +586,24 @@ async def analyze_importance(sender, subject, content, ctx):
         sender: Email sender address and name
         subject: Email subject line
         content: Email body content
+        cache_key: Optional result_cache key, only used when the key includes
+            the sender since importance depends on it
         
     Returns:
         Dictionary with importance classification and score
     """
     try:
-        importance_score = 0.5  # Default medium importance
-        factors = {}
-
-        # 1. Check sender importance
-        sender_lower = sender.lower()
-
-        # Check for VIP senders
-        for vip in VIP_SENDERS:
-            if vip in sender_lower:
-                importance_score += 0.2
-                factors["vip_sender"] = 0.2
-                break
-
-        # 2. Check for direct addressing
-        # Emails addressed directly to the recipient tend to be more important
-        if "dear" in content.lower()[:100] or "hi " in content.lower()[:50]:
-            importance_score += 0.1
-            factors["direct_addressing"] = 0.1
-
-        # 3. Check email length
-        # Very short or very long emails may have different importance characteristics
-        content_length = len(content)
-        if 100 <= content_length <= 1500:  # "Goldilocks" length - not too short, not too long
-            importance_score += 0.1
-            factors["optimal_length"] = 0.1
-        elif content_length < 50:  # Very short emails might be less important
-            importance_score -= 0.1
-            factors["very_short"] = -0.1
-
-        # 4. Subject line indicators
-        subject_lower = subject.lower()
-        if "re:" in subject_lower:  # Part of a thread
-            importance_score += 0.1
-            factors["is_reply"] = 0.1
-
-        # 5. Question detection
-        # Emails with questions often require action
-        question_count = content.count('?')
-        if question_count > 0:
-            question_factor = min(question_count * 0.05, 0.2)  # Cap at 0.2
-            importance_score += question_factor
-            factors["questions"] = question_factor
-
-        # Clamp the final score
-        importance_score = max(0, min(importance_score, 1.0))
-
-        # Classify importance level
-        if importance_score > 0.7:
-            importance = "high"
-        elif importance_score > 0.4:
-            importance = "medium"
-        else:
-            importance = "low"
+        if not result_cache.include_sender:
+            cache_key = None
 
-        return {
-            'importance': importance,
-            'score': importance_score,
-            'factors': factors
-        }
+        cached = result_cache.get('importance', cache_key)
+        if cached is not None:
+            return cached
+
+        importance_result = scorer.score_importance([sender], [subject], [content], breakdown=True)[0]
+        result_cache.set('importance', cache_key, importance_result)
+
+        return importance_result
     except Exception as e:
         ctx.logger.error(f"Error in importance analysis: {str(e)}")
         return {
@@ -0,0 +1,44 @@
+import { ApiRouteConfig, StepHandler } from 'motia';
+import { randomUUID } from 'crypto';
+import { z } from 'zod';
+
+const schema = z.object({
+  source: z.string(),
+  format: z.enum(['jsonl', 'mbox']).optional(),
+  backfillId: z.string().optional(),
+})
+
+export const config: ApiRouteConfig = {
+  type: 'api',
+  name: 'Gmail Backfill',
+  description: 'Starts or resumes analyzing a historical mailbox export',
+  path: '/api/backfill',
+  method: 'POST',
+  emits: [{
+    topic: 'gmail.backfill.requested',
+    label: 'Backfill Requested',
+  }],
+  bodySchema: schema,
+  flows: ['gmail-flow'],
+}
+
+export const handler: StepHandler<typeof config> = async (req, {logger, emit}) => {
+  const payload = schema.parse(req.body)
+  // Re-using an id resumes that backfill from its checkpoint
+  const backfillId = payload.backfillId ?? randomUUID()
+
+  logger.info(`Requesting backfill ${backfillId} of ${payload.source}`)
+
+  await emit({
+    topic: 'gmail.backfill.requested',
+    data: {backfillId, source: payload.source, format: payload.format}
+  })
+
+  return {
+    status: 202,
+    body: {
+      message: 'Backfill started',
+      backfillId
+    },
+  }
+}
@@ -0,0 +1,98 @@
+config = {
+    'type': 'event',
+    'name': 'Mailbox Backfill',
+    'description': 'Analyzes a historical mailbox export (JSONL or mbox) in checkpointed batches',
+    'subscribes': ['gmail.backfill.requested'],
+    'emits': [{
+        'topic': 'gmail.backfill.requested',
+        'label': 'Backfill Continued',
+    }, {
+        'topic': 'gmail.backfill.completed',
+        'label': 'Backfill Completed',
+    }],
+    'flows': ['gmail-flow']
+}
+
+import importlib.util
+import os
+import sys
+
+STEPS_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(STEPS_DIR)
+
+from email_analysis.backfill import MailboxBackfill
+from email_analysis.priority import realtime_gate
+from step_metrics import metrics
+
+# Emails read and analyzed together; bounds the memory held per batch
+BACKFILL_BATCH_SIZE = int(os.environ.get('BACKFILL_BATCH_SIZE', '64'))
+# Emails processed per event before the job re-queues itself
+BACKFILL_CHUNK_SIZE = int(os.environ.get('BACKFILL_CHUNK_SIZE', '1000'))
+
+ANALYZER_MODULE = 'analyze_email_step'
+
+
+def load_analyzer():
+    """
+    Imports steps/analyze-email.step.py once per process (its file name is
+    not a valid module name), so the backfill shares its models, caches and
+    scoring code
+    """
+    module = sys.modules.get(ANALYZER_MODULE)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(ANALYZER_MODULE, os.path.join(STEPS_DIR, 'analyze-email.step.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[ANALYZER_MODULE] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+@metrics.instrument('Mailbox Backfill')
+async def handler(args, ctx):
+    backfill_id = getattr(args, 'backfillId', None)
+    source = getattr(args, 'source', None)
+    source_format = getattr(args, 'format', None)
+
+    if not backfill_id or not source:
+        ctx.logger.error('Backfill requests need a backfillId and a source path', {'args': str(args)})
+        return
+
+    analyzer = load_analyzer()
+    backfill = MailboxBackfill(
+        ctx.state,
+        lambda emails: analyzer.analyze_batch(emails, ctx),
+        realtime_gate,
+        batch_size=BACKFILL_BATCH_SIZE,
+        chunk_size=BACKFILL_CHUNK_SIZE,
+        logger=ctx.logger
+    )
+
+    try:
+        checkpoint = await backfill.run_chunk(backfill_id, source, source_format)
+    except Exception as e:
+        # The checkpoint still points after the last written batch; re-sending
+        # the same request resumes from there
+        ctx.logger.error(f"Backfill {backfill_id} stopped: {str(e)}")
+        metrics.mark_error()
+        return
+
+    ctx.logger.info('Backfill progress', {
+        'backfillId': backfill_id,
+        'processed': checkpoint['processed'],
+        'skipped': checkpoint.get('skipped', 0),
+        'status': checkpoint['status'],
+        'priorityWaitMs': realtime_gate.stats()['waited_ms']
+    })
+
+    if checkpoint['status'] == 'completed':
+        await ctx.emit({
+            'topic': 'gmail.backfill.completed',
+            'data': {'backfillId': backfill_id, 'processed': checkpoint['processed']}
+        })
+        return
+
+    # Re-queue instead of looping, so real-time events are handled between chunks
+    await ctx.emit({
+        'topic': 'gmail.backfill.requested',
+        'data': {'backfillId': backfill_id, 'source': source, 'format': checkpoint['format']}
+    })
@@ -1,5 +1,6 @@
 import { CronConfig, StepHandler } from 'motia';
 import { DiscordService } from "../services/discord.service";
+import { AnalysisLogService } from "../services/analysis-log.service";
 
 export const config: CronConfig = {
   type: 'cron',
@@ -19,7 +20,8 @@ export const handler: StepHandler<typeof config> = async ({emit, logger, state})
     const summary = await discordService.send();
 
     await state.set('email_analysis', 'auto_responded_emails', []);
-    await state.set('email_analysis', 'processed_emails', []);
+    const clearedRecords = await new AnalysisLogService(state).clear();
+    logger.info(`Cleared ${clearedRecords} analysis records`);
 
     await emit({
       topic: 'gmail.summary.sent',
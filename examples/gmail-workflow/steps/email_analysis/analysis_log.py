@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+
+ANALYSIS_SCOPE = 'email_analysis'
+LOG_PREFIX = 'analysis_log'
+
+
+def record_key(message_id):
+    return f"{LOG_PREFIX}:record:{message_id}"
+
+
+def index_group(scope, day=None, hour=None):
+    """
+    Builds the state groups indexing the analysis log of a scope. Kept in
+    sync with services/analysis-log.service.ts, which reads the same layout:
+
+        <scope> / analysis_log:record:<id>                     -> analysis record
+        <scope>:analysis_log_days / <day>                      -> '2025-03-10'
+        <scope>:analysis_log_hours:<day> / <hour>              -> '09'
+        <scope>:analysis_log_bucket:<day>:<hour> / <messageId> -> messageId
+
+    Every index entry is a key of its own, listed with get_group, so no
+    writer ever reads or rewrites a list. The groups carry the scope, so
+    logs of different scopes (e.g. the backfill's) never share an index.
+    """
+    if hour is not None:
+        return f"{scope}:{LOG_PREFIX}_bucket:{day}:{hour}"
+    if day is not None:
+        return f"{scope}:{LOG_PREFIX}_hours:{day}"
+    return f"{scope}:{LOG_PREFIX}_days"
+
+
+class AnalysisLog:
+    """
+    Append-only log of email analysis records kept in Motia state.
+
+    Every record is written under its own key and marked in its hour bucket
+    group with a key of its own, so an append is a constant number of blind
+    writes, whatever the volume of the hour, and concurrent appends never
+    overwrite each other.
+    """
+
+    def __init__(self, state, scope=ANALYSIS_SCOPE):
+        self.state = state
+        self.scope = scope
+
+    async def append(self, record, timestamp=None):
+        """
+        Stores one analysis record and indexes it under its hour bucket
+
+        Arguments:
+            record: Analysis record, must contain messageId
+            timestamp: Time used for bucketing, defaults to now (UTC)
+        """
+        timestamp = timestamp or datetime.now(timezone.utc)
+        day = timestamp.strftime('%Y-%m-%d')
+        hour = timestamp.strftime('%H')
+        message_id = record['messageId']
+
+        await self.state.set(self.scope, record_key(message_id), record)
+        await self._index(day, hour, [message_id])
+
+    async def extend(self, records, timestamps=None):
+        """
+        Stores many analysis records, marking each touched day and hour once
+
+        Arguments:
+            records: Analysis records, each must contain messageId
+            timestamps: Time per record used for bucketing, defaults to now (UTC)
+        """
+        now = datetime.now(timezone.utc)
+        timestamps = timestamps or [now] * len(records)
+        buckets = {}
+
+        for record, timestamp in zip(records, timestamps):
+            day = timestamp.strftime('%Y-%m-%d')
+            hour = timestamp.strftime('%H')
+            buckets.setdefault((day, hour), []).append(record['messageId'])
+            await self.state.set(self.scope, record_key(record['messageId']), record)
+
+        for (day, hour), message_ids in buckets.items():
+            await self._index(day, hour, message_ids)
+
+    async def _index(self, day, hour, message_ids):
+        for message_id in message_ids:
+            await self.state.set(index_group(self.scope, day, hour), message_id, message_id)
+        await self.state.set(index_group(self.scope, day), hour, hour)
+        await self.state.set(index_group(self.scope), day, day)
+
+    async def _list(self, group):
+        return sorted(await self.state.get_group(group) or [])
+
+    async def days(self):
+        return await self._list(index_group(self.scope))
+
+    async def records(self, day=None):
+        """
+        Streams analysis records bucket by bucket without loading the whole log
+
+        Arguments:
+            day: Only read this day ('YYYY-MM-DD'), defaults to every logged day
+
+        Yields:
+            Analysis records in bucket order
+        """
+        days = [day] if day is not None else await self.days()
+
+        for current_day in days:
+            for hour in await self._list(index_group(self.scope, current_day)):
+                for message_id in await self._list(index_group(self.scope, current_day, hour)):
+                    record = await self.state.get(self.scope, record_key(message_id))
+                    if record is not None:
+                        yield record
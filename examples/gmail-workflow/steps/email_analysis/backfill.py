@@ -0,0 +1,253 @@
+import json
+import re
+from datetime import datetime, timezone
+from email import message_from_bytes
+from email.header import decode_header, make_header
+from email.utils import parsedate_to_datetime
+
+from .analysis_log import AnalysisLog
+from .temporal import parse_email_date
+
+# Backfilled records are kept apart from the live analysis log, so a
+# historical import does not end up in the daily summary
+BACKFILL_SCOPE = 'email_backfill'
+
+# Gmail snippets are roughly this long
+SNIPPET_LENGTH = 200
+
+
+def checkpoint_key(backfill_id):
+    return f"backfill:{backfill_id}"
+
+
+def detect_format(source):
+    return 'jsonl' if source.endswith(('.jsonl', '.ndjson')) else 'mbox'
+
+
+def read_jsonl_messages(source, position=0):
+    """
+    Streams EmailResponse-shaped records from a JSONL export. Records
+    without a messageId get one from their thread id and byte offset, so
+    they don't overwrite each other in the analysis log.
+
+    Arguments:
+        source: Path of the JSONL file
+        position: Byte offset to resume from
+
+    Yields:
+        (position after the record, email) tuples; email is None for a line
+        that isn't a JSON object, so the caller can skip past it
+    """
+    with open(source, 'rb') as f:
+        f.seek(position)
+        for line in iter(f.readline, b''):
+            offset = position
+            position += len(line)
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                email = json.loads(line)
+            except ValueError:
+                email = None
+            if not isinstance(email, dict):
+                yield position, None
+                continue
+            if not email.get('messageId'):
+                email['messageId'] = f"{email.get('threadId') or 'jsonl'}-{offset}"
+            yield position, email
+
+
+def read_mbox_messages(source, position=0):
+    """
+    Streams messages from an mbox export (e.g. Google Takeout) as
+    EmailResponse-shaped records, in one pass from `position`: messages
+    start at lines beginning with 'From ' (as in mailbox.mbox), and only the
+    lines of the current message are held in memory. Resuming seeks to the
+    offset instead of rescanning the file.
+
+    Arguments:
+        source: Path of the mbox file
+        position: Byte offset of the message to resume from
+
+    Yields:
+        (byte offset of the next message, email) tuples
+    """
+    with open(source, 'rb') as f:
+        f.seek(position)
+        start, lines = position, []
+        for line in iter(f.readline, b''):
+            if line.startswith(b'From ') and lines:
+                yield position, message_to_email(parse_mbox_message(lines), start)
+                start, lines = position, []
+            lines.append(line)
+            position += len(line)
+        if lines:
+            yield position, message_to_email(parse_mbox_message(lines), start)
+
+
+def parse_mbox_message(lines):
+    # The 'From ' separator line is not part of the message
+    if lines[0].startswith(b'From '):
+        lines = lines[1:]
+    return message_from_bytes(b''.join(lines))
+
+
+def header_text(message, name):
+    value = message.get(name)
+    if value is None:
+        return ''
+    return str(make_header(decode_header(value)))
+
+
+def message_snippet(message):
+    for part in message.walk():
+        if part.get_content_type() != 'text/plain' or part.get_filename():
+            continue
+        payload = part.get_payload(decode=True) or b''
+        text = payload.decode(part.get_content_charset() or 'utf-8', errors='replace')
+        return re.sub(r'\s+', ' ', text).strip()[:SNIPPET_LENGTH]
+    return ''
+
+
+def message_to_email(message, offset):
+    message_id = header_text(message, 'Message-ID').strip('<> ') or f"mbox-{offset}"
+
+    try:
+        date = parsedate_to_datetime(message['Date']).isoformat()
+    except (TypeError, ValueError):
+        date = ''
+
+    # Takeout exports list label names ("Category Promotions"), label ids
+    # are the upper-cased form (CATEGORY_PROMOTIONS)
+    labels = header_text(message, 'X-Gmail-Labels')
+    label_ids = [label.strip().upper().replace(' ', '_') for label in labels.split(',') if label.strip()]
+
+    return {
+        'messageId': message_id,
+        'threadId': header_text(message, 'X-GM-THRID') or message_id,
+        'subject': header_text(message, 'Subject'),
+        'from': header_text(message, 'From'),
+        'date': date,
+        'labelIds': label_ids,
+        'snippet': message_snippet(message)
+    }
+
+
+def bucket_time(date_str):
+    """
+    Buckets backfilled records by the email's own date (UTC), falling back to now
+    """
+    timestamp = parse_email_date(date_str)
+    if timestamp is None:
+        return datetime.now(timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+class MailboxBackfill:
+    """
+    Analyzes a mailbox export in bounded batches and records progress in a
+    checkpoint after every batch, so an interrupted run resumes after the
+    last written batch. One call to `run_chunk` processes at most
+    `chunk_size` messages; the caller re-queues the job until it completes,
+    which lets real-time events in between.
+
+    Arguments:
+        state: Motia state
+        analyze_batch: Coroutine taking a list of emails and returning one
+            analysis record (with messageId) per email
+        gate: PriorityGate to yield to before every batch
+        batch_size: Emails read into memory and analyzed together
+        chunk_size: Emails processed per run_chunk call
+        logger: Optional Motia logger, warned about skipped records
+    """
+
+    def __init__(self, state, analyze_batch, gate, batch_size=64, chunk_size=1000, scope=BACKFILL_SCOPE,
+                 logger=None):
+        self.state = state
+        self.analyze_batch = analyze_batch
+        self.gate = gate
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.scope = scope
+        self.logger = logger
+        self.log = AnalysisLog(state, scope)
+
+    async def checkpoint(self, backfill_id):
+        return await self.state.get(self.scope, checkpoint_key(backfill_id))
+
+    async def run_chunk(self, backfill_id, source, source_format=None):
+        """
+        Processes the next chunk of a backfill
+
+        Arguments:
+            backfill_id: Identifies the job and its checkpoint
+            source: Path of the JSONL or mbox export
+            source_format: 'jsonl' or 'mbox', detected from the extension by default
+
+        Returns:
+            The updated checkpoint, with status 'running' or 'completed'
+        """
+        source_format = source_format or detect_format(source)
+        now = datetime.now(timezone.utc).isoformat()
+        checkpoint = await self.checkpoint(backfill_id) or {
+            'source': source,
+            'format': source_format,
+            'position': 0,
+            'processed': 0,
+            'skipped': 0,
+            'status': 'running',
+            'startedAt': now
+        }
+        if checkpoint['status'] == 'completed':
+            return checkpoint
+
+        reader = read_jsonl_messages if checkpoint['format'] == 'jsonl' else read_mbox_messages
+        messages = reader(checkpoint['source'], checkpoint['position'])
+        processed = 0
+        exhausted = False
+
+        try:
+            while processed < self.chunk_size:
+                batch = []
+                skipped = 0
+                position = checkpoint['position']
+                for position, email in messages:
+                    if email is None:
+                        skipped += 1
+                        if self.logger:
+                            self.logger.warn('Skipping malformed backfill record', {
+                                'backfillId': backfill_id,
+                                'source': checkpoint['source'],
+                                'position': position
+                            })
+                        continue
+                    batch.append(email)
+                    if len(batch) == min(self.batch_size, self.chunk_size - processed):
+                        break
+                if skipped:
+                    checkpoint['skipped'] = checkpoint.get('skipped', 0) + skipped
+                if not batch:
+                    checkpoint['position'] = position
+                    exhausted = True
+                    break
+
+                await self.gate.idle()
+                records = await self.analyze_batch(batch)
+                await self.log.extend(records, [bucket_time(email.get('date')) for email in batch])
+
+                processed += len(batch)
+                checkpoint.update(
+                    position=position,
+                    processed=checkpoint['processed'] + len(batch),
+                    updatedAt=datetime.now(timezone.utc).isoformat()
+                )
+                await self.state.set(self.scope, checkpoint_key(backfill_id), checkpoint)
+        finally:
+            messages.close()
+
+        if exhausted:
+            checkpoint.update(status='completed', completedAt=datetime.now(timezone.utc).isoformat())
+            await self.state.set(self.scope, checkpoint_key(backfill_id), checkpoint)
+
+        return checkpoint
@@ -0,0 +1,113 @@
+import asyncio
+import inspect
+import time
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by concurrent handlers and runs them through
+    `batch_fn` as one batch, resolving each caller with its own result.
+
+    A batch is flushed as soon as `max_batch_size` items are queued or
+    `max_wait_ms` has elapsed since the first item of the batch arrived,
+    whichever happens first.
+
+    Arguments:
+        batch_fn: Callable taking a list of items and returning a list of
+            results in the same order. May be sync or async.
+        max_batch_size: Maximum number of items per batch
+        max_wait_ms: Maximum time an item waits for the batch to fill up
+        name: Label used in the reported stats
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=20, name='batcher'):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0) / 1000
+        self.name = name
+
+        self._pending = []
+        self._timer = None
+        self._batches = 0
+        self._items = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._last_batch_size = 0
+
+    async def submit(self, item):
+        """
+        Queues a single item and waits for the result of the batch it lands in
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        # submit() flushes as soon as the cap is reached, so everything queued
+        # fits in a single batch here
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch):
+        started = time.perf_counter()
+        items = [item for item, _, _ in batch]
+
+        for _, _, enqueued_at in batch:
+            waited = started - enqueued_at
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+        self._batches += 1
+        self._items += len(batch)
+        self._last_batch_size = len(batch)
+
+        try:
+            results = self.batch_fn(items)
+            if inspect.isawaitable(results):
+                results = await results
+
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name} returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        """
+        Returns batch fill and queueing statistics accumulated so far
+
+        Returns:
+            Dictionary with batch counts, average fill ratio and wait times in ms
+        """
+        return {
+            'name': self.name,
+            'batches': self._batches,
+            'items': self._items,
+            'last_batch_size': self._last_batch_size,
+            'avg_batch_size': self._items / self._batches if self._batches else 0,
+            'avg_fill_ratio': (self._items / self._batches) / self.max_batch_size if self._batches else 0,
+            'avg_wait_ms': (self._wait_total / self._items) * 1000 if self._items else 0,
+            'max_wait_ms': self._wait_max * 1000,
+            'queued': len(self._pending)
+        }
@@ -0,0 +1,86 @@
+import numpy as np
+
+# Short natural-language descriptions embed much better than dotted label ids
+LABEL_DESCRIPTIONS = {
+    "work.task": "a work email asking me to do a task or review something",
+    "work.meeting": "a work email about scheduling or attending a meeting",
+    "work.update": "a work email with a status update or announcement",
+    "personal.finance": "a personal email about bills, banking, payments or money",
+    "personal.health": "a personal email about doctors, appointments or health",
+    "personal.family": "a personal email from family members about family life",
+    "social.event": "an invitation to a social event or party",
+    "social.networking": "a social network notification or connection request",
+    "promotion.marketing": "a marketing email advertising a product or service",
+    "promotion.discount": "a promotional email with a sale, discount or coupon",
+    "promotion.newsletter": "a promotional newsletter from a brand or business",
+    "update.newsletter": "a news or content newsletter digest",
+    "update.notification": "an automated account, shipping or security notification",
+    "spam": "spam, a scam or unsolicited junk email"
+}
+
+
+class EmbeddingCategoryEngine:
+    """
+    Category engine that scores emails by cosine similarity between the email
+    embedding and cached label embeddings, instead of running one NLI forward
+    pass per (email, label) pair.
+
+    Label embeddings are computed once per label set. Each email is encoded
+    once and all labels are scored with a single matrix product. Calls use
+    the same signature and return the same {labels, scores} shape as the
+    transformers zero-shot pipeline, so it is a drop-in replacement.
+
+    Arguments:
+        model: sentence-transformers model id
+        descriptions: Optional label -> description mapping used for encoding
+        temperature: Softmax temperature turning similarities into scores
+    """
+
+    def __init__(self, model, descriptions=None, temperature=0.05):
+        from sentence_transformers import SentenceTransformer
+
+        self.encoder = SentenceTransformer(model)
+        self.descriptions = descriptions or LABEL_DESCRIPTIONS
+        self.temperature = temperature
+        self._label_embeddings = {}
+
+    def _encode(self, texts, batch_size=32):
+        return self.encoder.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ).astype(np.float32)
+
+    def label_embeddings(self, labels):
+        key = tuple(labels)
+        embeddings = self._label_embeddings.get(key)
+        if embeddings is None:
+            texts = [self.descriptions.get(label, label.replace('.', ' ')) for label in labels]
+            embeddings = self._encode(texts)
+            self._label_embeddings[key] = embeddings
+        return embeddings
+
+    def __call__(self, sequences, candidate_labels, batch_size=None):
+        single = isinstance(sequences, str)
+        texts = [sequences] if single else list(sequences)
+
+        label_matrix = self.label_embeddings(candidate_labels)
+        email_matrix = self._encode(texts, batch_size=batch_size or 32)
+
+        # (emails x dim) @ (dim x labels) -> cosine similarities
+        logits = (email_matrix @ label_matrix.T) / self.temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        results = []
+        for text, row in zip(texts, probabilities):
+            order = np.argsort(-row)
+            results.append({
+                'sequence': text,
+                'labels': [candidate_labels[i] for i in order],
+                'scores': [float(row[i]) for i in order]
+            })
+
+        return results[0] if single else results
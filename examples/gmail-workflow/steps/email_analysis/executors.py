@@ -0,0 +1,54 @@
+import asyncio
+import functools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class AnalysisExecutors:
+    """
+    Bounded executors that keep blocking work off the event loop.
+
+    Remote calls (HTTP inference endpoints) go to a thread pool sized by
+    `io_workers`. Local model inference goes to a single dedicated thread by
+    default, or to a pool of `cpu_workers` processes when that is greater than
+    zero, each initialized once with `cpu_initializer(*cpu_initargs)`.
+    """
+
+    def __init__(self, io_workers=4, cpu_workers=0, cpu_initializer=None, cpu_initargs=()):
+        self.io_workers = max(io_workers, 1)
+        self.cpu_workers = max(cpu_workers, 0)
+
+        self.io = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix='analyzer-io')
+
+        if self.cpu_workers > 0:
+            self.cpu = ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                initializer=cpu_initializer,
+                initargs=cpu_initargs
+            )
+        else:
+            # Torch already parallelizes a single forward pass across cores,
+            # so in-process inference is serialized on one thread
+            self.cpu = ThreadPoolExecutor(max_workers=1, thread_name_prefix='analyzer-cpu')
+
+    @property
+    def uses_processes(self):
+        return self.cpu_workers > 0
+
+    async def run_io(self, fn, *args, **kwargs):
+        """
+        Runs a blocking I/O call on the thread pool and awaits its result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io, functools.partial(fn, *args, **kwargs))
+
+    async def run_cpu(self, fn, *args, **kwargs):
+        """
+        Runs CPU-bound inference on the inference executor and awaits its result.
+        With a process pool `fn` and its arguments must be picklable.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.cpu, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        self.io.shutdown(wait=wait)
+        self.cpu.shutdown(wait=wait)
@@ -0,0 +1,79 @@
+# Gmail's own tab classification, used as evidence for our categories
+LABEL_CATEGORIES = {
+    'SPAM': 'spam',
+    'CATEGORY_PROMOTIONS': 'promotion.marketing',
+    'CATEGORY_UPDATES': 'update.notification',
+    'CATEGORY_SOCIAL': 'social.networking',
+    'CATEGORY_FORUMS': 'social.networking'
+}
+
+# Sender local-part terms that point at notifications rather than marketing
+NOTIFICATION_SENDER_TERMS = {'updates', 'notifications'}
+
+LABEL_WEIGHTS = {'SPAM': 0.95}
+DEFAULT_LABEL_WEIGHT = 0.7
+SENDER_WEIGHT = 0.3
+KEYWORD_WEIGHT = 0.5
+
+
+class RuleClassifier:
+    """
+    Cheap pre-classification from Gmail labels, sender local-part and
+    promotional keyword score. When the combined evidence for one category
+    reaches `threshold` the caller can skip the zero-shot model entirely.
+    """
+
+    def __init__(self, threshold=0.8):
+        self.threshold = threshold
+        self._evaluated = 0
+        self._fast_path = 0
+        self._by_category = {}
+
+    def classify(self, label_ids, sender_terms, promo_score):
+        """
+        Scores each category from rule signals
+
+        Arguments:
+            label_ids: Gmail labelIds of the email
+            sender_terms: Promotional terms found in the sender local-part
+            promo_score: Normalized promotional keyword score (0 to 1)
+
+        Returns:
+            (category, confidence) when confident enough, otherwise None
+        """
+        self._evaluated += 1
+        scores = {}
+
+        for label in label_ids or []:
+            category = LABEL_CATEGORIES.get(label)
+            if category:
+                scores[category] = max(scores.get(category, 0), LABEL_WEIGHTS.get(label, DEFAULT_LABEL_WEIGHT))
+
+        # The sender counts once, however many promotional terms it contains
+        for term in sender_terms or []:
+            category = 'update.notification' if term in NOTIFICATION_SENDER_TERMS else 'promotion.marketing'
+            scores[category] = scores.get(category, 0) + SENDER_WEIGHT
+            break
+
+        if promo_score > 0:
+            scores['promotion.marketing'] = scores.get('promotion.marketing', 0) + promo_score * KEYWORD_WEIGHT
+
+        if not scores:
+            return None
+
+        category, confidence = max(scores.items(), key=lambda item: item[1])
+        confidence = min(confidence, 1.0)
+        if confidence < self.threshold:
+            return None
+
+        self._fast_path += 1
+        self._by_category[category] = self._by_category.get(category, 0) + 1
+        return category, confidence
+
+    def stats(self):
+        return {
+            'evaluated': self._evaluated,
+            'fast_path': self._fast_path,
+            'fast_path_rate': self._fast_path / self._evaluated if self._evaluated else 0,
+            'by_category': dict(self._by_category)
+        }
@@ -0,0 +1,166 @@
+import time
+
+# transformers is imported on first model load, not when the step is imported
+_import_ms = None
+
+
+def _pipeline(*args, **kwargs):
+    global _import_ms
+    started = time.perf_counter()
+    from transformers import pipeline
+    if _import_ms is None:
+        _import_ms = (time.perf_counter() - started) * 1000
+    return pipeline(*args, **kwargs)
+
+
+def transformers_import_ms():
+    """
+    Returns how long the first `import transformers` took, or None before any load
+    """
+    return _import_ms
+
+
+CATEGORY_BACKENDS = ('torch', 'torch-int8', 'onnx')
+
+
+def build_classifier(model, backend='torch'):
+    """
+    Loads the zero-shot classification pipeline for the given model
+
+    Arguments:
+        model: Hugging Face model id of an NLI model
+        backend: 'torch' (fp32), 'torch-int8' (dynamic int8 quantization of the
+            Linear layers) or 'onnx' (ONNX export run by onnxruntime, needs
+            `optimum[onnxruntime]`)
+
+    Returns:
+        Zero-shot classification pipeline
+    """
+    if backend == 'torch':
+        return _pipeline("zero-shot-classification", model=model)
+
+    if backend == 'torch-int8':
+        import torch
+
+        classifier = _pipeline("zero-shot-classification", model=model)
+        classifier.model = torch.quantization.quantize_dynamic(
+            classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return classifier
+
+    if backend == 'onnx':
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError as e:
+            raise ImportError("The onnx category backend requires `pip install optimum[onnxruntime]`") from e
+        from transformers import AutoTokenizer
+
+        ort_model = ORTModelForSequenceClassification.from_pretrained(model, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model)
+        return _pipeline("zero-shot-classification", model=ort_model, tokenizer=tokenizer)
+
+    raise ValueError(f"Unknown category backend: {backend}. Expected one of {', '.join(CATEGORY_BACKENDS)}")
+
+
+CATEGORY_ENGINES = ('zero-shot', 'embedding')
+
+
+def build_category_model(engine='zero-shot', model=None, backend='torch', embedding_model=None):
+    """
+    Builds the category model for the selected engine
+
+    Arguments:
+        engine: 'zero-shot' (NLI pipeline) or 'embedding' (similarity against
+            cached label embeddings)
+        model: NLI model id used by the zero-shot engine
+        backend: Inference backend of the zero-shot engine, see build_classifier
+        embedding_model: sentence-transformers model id used by the embedding engine
+
+    Returns:
+        Callable with the zero-shot pipeline signature and result shape
+    """
+    if engine == 'zero-shot':
+        return build_classifier(model, backend)
+
+    if engine == 'embedding':
+        from .embedding_engine import EmbeddingCategoryEngine
+        return EmbeddingCategoryEngine(embedding_model)
+
+    raise ValueError(f"Unknown category engine: {engine}. Expected one of {', '.join(CATEGORY_ENGINES)}")
+
+
+def classify_texts(classifier, texts, labels):
+    """
+    Runs the zero-shot classifier over a batch of texts in a single call
+
+    Arguments:
+        classifier: Zero-shot classification pipeline or category engine
+        texts: List of combined email subject and content strings
+        labels: Candidate labels
+
+    Returns:
+        List of pipeline results ({labels, scores}) in the same order as texts
+    """
+    results = classifier(texts, labels, batch_size=len(texts))
+
+    # The pipeline returns a bare dict when given a single sequence
+    if isinstance(results, dict):
+        results = [results]
+
+    return results
+
+
+# Process pool workers load their own copy of the model once at startup
+_worker_classifier = None
+
+
+def init_classifier_worker(*args):
+    global _worker_classifier
+    _worker_classifier = build_category_model(*args)
+
+
+def classify_in_worker(texts, labels):
+    return classify_texts(_worker_classifier, texts, labels)
+
+
+# Sentiment pipelines are cached per process so the same function works on
+# the in-process inference thread and inside process pool workers
+_sentiment_pipelines = {}
+
+
+def negative_score(result, default=0.3):
+    """
+    Extracts the NEGATIVE label score from a text classification result
+
+    Arguments:
+        result: List of {label, score} items for one text
+        default: Score used when the NEGATIVE label is missing
+
+    Returns:
+        The NEGATIVE score, or `default`
+    """
+    for item in result:
+        if item['label'] == 'NEGATIVE':
+            return item['score']
+    return default
+
+
+def score_sentiment(texts, model):
+    """
+    Runs a local text classification model over a batch of texts
+
+    Arguments:
+        texts: List of texts
+        model: Hugging Face model id of the sentiment classifier
+
+    Returns:
+        List of NEGATIVE scores in the same order as texts
+    """
+    sentiment = _sentiment_pipelines.get(model)
+    if sentiment is None:
+        sentiment = _pipeline("text-classification", model=model)
+        _sentiment_pipelines[model] = sentiment
+
+    # top_k=None returns every label like the Inference API does
+    results = sentiment(texts, top_k=None, truncation=True, batch_size=len(texts))
+    return [negative_score(result) for result in results]
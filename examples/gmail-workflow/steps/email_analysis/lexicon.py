@@ -0,0 +1,116 @@
+import re
+
+# Up to this many distinct keywords, one str.find scan per keyword beats the
+# single regex pass (benchmarks/lexicon_scan.py: 1.3-2.2x faster at 5-70
+# keywords, even at 100, the regex pulls ahead beyond)
+SUBSTRING_SCAN_MAX_KEYWORDS = 100
+
+
+class KeywordMatcher:
+    """
+    Matches several keyword lexicons against a text.
+
+    Small lexicons (the analyzer's have a few dozen keywords) are scanned
+    with one `str.find` loop per distinct keyword. Larger ones are compiled
+    into one trie-shaped regex, so the regex engine skips ahead in C to the
+    next possible keyword start and tries at most one branch per character;
+    that single pass resumes one character after each hit, which also
+    reports overlapping hits (e.g. both "off" and "offer"). Either way
+    keywords are matched as plain substrings, the same semantics as
+    `keyword in text`, and every start position is reported.
+
+    Arguments:
+        lexicons: Mapping of lexicon name to a dict of keyword -> weight or a
+            list of keywords. The same keyword may appear in several lexicons.
+        max_substring_keywords: Largest number of distinct keywords scanned
+            with str.find instead of the regex
+    """
+
+    def __init__(self, lexicons, max_substring_keywords=SUBSTRING_SCAN_MAX_KEYWORDS):
+        self.lexicons = {
+            name: dict(entries) if isinstance(entries, dict) else {keyword: 1.0 for keyword in entries}
+            for name, entries in lexicons.items()
+        }
+
+        # keyword -> lexicons it belongs to
+        self._owners = {}
+        for name, entries in self.lexicons.items():
+            for keyword in entries:
+                self._owners.setdefault(keyword, []).append(name)
+
+        self._pattern = None
+        if len(self._owners) > max_substring_keywords:
+            # Longest first so the regex reports the longest keyword at a
+            # position; shorter keywords starting at the same position are
+            # always prefixes of it and are recovered from this table
+            keywords = sorted(self._owners, key=len, reverse=True)
+            self._prefixes = {
+                keyword: [other for other in keywords if keyword.startswith(other)]
+                for keyword in keywords
+            }
+            self._pattern = re.compile(_trie_pattern(_build_trie(keywords)))
+
+    def scan(self, text):
+        """
+        Finds every lexicon keyword in the text
+
+        Arguments:
+            text: Text to scan, already lowercased
+
+        Returns:
+            Dictionary of lexicon name -> {keyword: [start positions]}
+        """
+        hits = {name: {} for name in self.lexicons}
+        if self._pattern is None:
+            return self._scan_substrings(text, hits)
+
+        search = self._pattern.search
+        match = search(text)
+        while match is not None:
+            position = match.start()
+            for keyword in self._prefixes[match.group()]:
+                for name in self._owners[keyword]:
+                    hits[name].setdefault(keyword, []).append(position)
+
+            # Resume one character later so overlapping keywords are found too
+            match = search(text, position + 1)
+
+        return hits
+
+    def _scan_substrings(self, text, hits):
+        find = text.find
+        for keyword, names in self._owners.items():
+            position = find(keyword)
+            if position < 0:
+                continue
+            positions = []
+            while position >= 0:
+                positions.append(position)
+                position = find(keyword, position + 1)
+            for name in names:
+                hits[name][keyword] = list(positions)
+        return hits
+
+
+def _build_trie(keywords):
+    # Each node is {char: child}; the '' key marks the end of a keyword
+    root = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return root
+
+
+def _trie_pattern(node):
+    terminal = '' in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+
+    if not branches:
+        return ''
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+
+    # Greedy optional group, so the longest keyword at a position wins
+    return '(?:' + '|'.join(branches) + ')' + ('?' if terminal else '')
@@ -0,0 +1,86 @@
+import threading
+import time
+
+
+class LazyModel:
+    """
+    Holds a model that is loaded on first use instead of at import time.
+
+    `get()` is thread-safe and is meant to be called from an executor thread,
+    so the event loop keeps serving other events while the model loads.
+    `warm_up()` starts the load in a background thread right away. Load and
+    first-inference timings are recorded for cold-start reporting.
+
+    Arguments:
+        name: Label used in the reported timings
+        loader: Zero-argument callable returning the loaded model
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self._model = None
+        self._error = None
+        self._lock = threading.Lock()
+        self._timings = {'load_ms': None, 'first_inference_ms': None, 'warm_up': False}
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    def get(self):
+        """
+        Returns the model, loading it first if needed (blocks the calling thread)
+        """
+        if self._model is not None:
+            return self._model
+
+        with self._lock:
+            if self._model is None:
+                started = time.perf_counter()
+                try:
+                    self._model = self.loader()
+                except Exception as e:
+                    self._error = str(e)
+                    raise
+                self._timings['load_ms'] = (time.perf_counter() - started) * 1000
+                self._error = None
+
+        return self._model
+
+    def warm_up(self, first_call=None):
+        """
+        Loads the model in a background daemon thread
+
+        Arguments:
+            first_call: Optional callable run with the loaded model to also pay
+                the first-inference cost ahead of real traffic
+        """
+        self._timings['warm_up'] = True
+
+        def run():
+            try:
+                model = self.get()
+                if first_call is not None:
+                    started = time.perf_counter()
+                    first_call(model)
+                    self.record_inference((time.perf_counter() - started) * 1000)
+            except Exception:
+                # The error is kept in timings; the next get() retries the load
+                pass
+
+        thread = threading.Thread(target=run, name=f"warm-up-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def record_inference(self, duration_ms):
+        if self._timings['first_inference_ms'] is None:
+            self._timings['first_inference_ms'] = duration_ms
+
+    def timings(self):
+        return {
+            'name': self.name,
+            'loaded': self.loaded,
+            'error': self._error,
+            **self._timings
+        }
@@ -0,0 +1,129 @@
+import asyncio
+import functools
+import os
+import time
+
+# Root of the example (two levels above steps/email_analysis), shared by every step process
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+# Where processes running real-time handlers publish their activity; relative
+# paths are resolved against the project root, not each process's working
+# directory, so every step process uses the same directory
+ACTIVITY_DIR = os.path.join(PROJECT_ROOT, os.environ.get('REALTIME_ACTIVITY_DIR', '.motia/realtime-activity'))
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class PriorityGate:
+    """
+    Lets real-time handlers run ahead of bulk work, across step processes.
+
+    Motia runs every step in its own process, so the gate cannot be an
+    in-memory counter: each process running real-time handlers (wrapped with
+    `realtime`) keeps a small file of its own in `directory` with the number
+    of handlers in flight and the time the last one finished. Bulk jobs
+    await `idle()` between batches, which polls those files and returns
+    once no live process has a handler in flight and none finished within
+    the last `quiet_ms`.
+
+    Arguments:
+        directory: Activity files, one per process; must be shared by the step processes
+        quiet_ms: Quiet time required after the last real-time handler
+        poll_ms: Interval between checks while waiting
+    """
+
+    def __init__(self, directory=ACTIVITY_DIR, quiet_ms=200, poll_ms=50):
+        self.directory = directory
+        self.quiet_ms = quiet_ms
+        self.poll_ms = poll_ms
+        self._active = 0
+        self._last_finished = 0.0
+        self._waited_ms = 0.0
+
+    def _publish(self):
+        path = os.path.join(self.directory, str(os.getpid()))
+        temporary = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary, 'w') as f:
+                f.write(f"{self._active} {self._last_finished}")
+            os.replace(temporary, path)
+        except OSError:
+            # Bulk work merely stops waiting for this process; the handler
+            # itself must not fail over it
+            pass
+
+    def realtime(self, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            self._active += 1
+            self._publish()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                self._active -= 1
+                self._last_finished = time.time()
+                self._publish()
+        return wrapper
+
+    def activity(self):
+        """
+        Returns:
+            (real-time handlers in flight, time the last one finished) over
+            every live process
+        """
+        active, last_finished = 0, 0.0
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return active, last_finished
+
+        for name in names:
+            if not name.isdigit():
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path) as f:
+                    count, finished = f.read().split()
+            except (OSError, ValueError):
+                continue
+
+            if not process_alive(int(name)):
+                # A process that died mid-handler would block bulk work forever
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            active += int(count)
+            last_finished = max(last_finished, float(finished))
+        return active, last_finished
+
+    @property
+    def busy(self):
+        active, last_finished = self.activity()
+        return active > 0 or (time.time() - last_finished) * 1000 < self.quiet_ms
+
+    async def idle(self):
+        """
+        Waits until real-time traffic has been quiet for quiet_ms
+        """
+        started = time.perf_counter()
+        while self.busy:
+            await asyncio.sleep(self.poll_ms / 1000)
+        self._waited_ms += (time.perf_counter() - started) * 1000
+
+    def stats(self):
+        return {'active': self.activity()[0], 'waited_ms': self._waited_ms}
+
+
+# Wraps the real-time handlers and is awaited by the backfill, each in its own process
+realtime_gate = PriorityGate()
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    return _WHITESPACE.sub(' ', (text or '').lower()).strip()
+
+
+def config_fingerprint(*settings):
+    """
+    Short digest of the settings cached results depend on (engines, model
+    ids, label sets), to be passed as AnalysisResultCache's fingerprint
+    """
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+class AnalysisResultCache:
+    """
+    Caches expensive analysis results keyed on a normalized hash of the email
+    subject and snippet (optionally the sender too).
+
+    An in-memory LRU tier with TTL eviction sits in front of an optional
+    sqlite tier that survives worker restarts. Results are stored per kind
+    (e.g. 'category', 'sentiment') so callers only cache the parts that do not
+    depend on time.
+
+    Arguments:
+        max_entries: Capacity of the in-memory tier, 0 disables the cache
+        ttl_seconds: Time after which an entry is treated as missing
+        include_sender: Whether the sender is part of the cache key
+        path: Optional sqlite file for the persistent tier
+        fingerprint: Optional config_fingerprint() of the analysis settings,
+            part of every key, so results of another model or label set
+            (e.g. left in the sqlite tier) are never served
+    """
+
+    def __init__(self, max_entries=2048, ttl_seconds=86400, include_sender=False, path=None, fingerprint=''):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.include_sender = include_sender
+        self.fingerprint = fingerprint
+        self._memory = OrderedDict()
+        self._counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        self._db = None
+
+        if path and self.enabled:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS analysis_cache ('
+                'kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL, '
+                'PRIMARY KEY (kind, key))'
+            )
+            self._db.execute('DELETE FROM analysis_cache WHERE expires_at < ?', (time.time(),))
+            self._db.commit()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def key_for(self, subject, snippet, sender=None):
+        """
+        Builds the cache key for an email
+
+        Returns:
+            Hex digest of the fingerprint and the normalized subject,
+            snippet and (if enabled) sender
+        """
+        parts = [self.fingerprint, normalize(subject), normalize(snippet)]
+        if self.include_sender:
+            parts.append(normalize(sender))
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, kind, key):
+        """
+        Returns the cached value for (kind, key), or None on a miss
+        """
+        if not self.enabled or key is None:
+            return None
+
+        now = time.time()
+        entry = self._memory.get((kind, key))
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at >= now:
+                self._memory.move_to_end((kind, key))
+                self._counters['hits'] += 1
+                return json.loads(value)
+            del self._memory[(kind, key)]
+
+        if self._db is not None:
+            row = self._db.execute(
+                'SELECT value, expires_at FROM analysis_cache WHERE kind = ? AND key = ?',
+                (kind, key)
+            ).fetchone()
+            if row is not None and row[1] >= now:
+                self._remember(kind, key, row[0], row[1])
+                self._counters['hits'] += 1
+                self._counters['disk_hits'] += 1
+                return json.loads(row[0])
+
+        self._counters['misses'] += 1
+        return None
+
+    def set(self, kind, key, value):
+        """
+        Stores a JSON-serializable value for (kind, key) in every tier
+        """
+        if not self.enabled or key is None:
+            return
+
+        # Values are kept serialized so callers can never mutate a cached entry
+        serialized = json.dumps(value)
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(kind, key, serialized, expires_at)
+
+        if self._db is not None:
+            self._db.execute(
+                'INSERT OR REPLACE INTO analysis_cache (kind, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                (kind, key, serialized, expires_at)
+            )
+            self._db.commit()
+
+    def _remember(self, kind, key, serialized, expires_at):
+        self._memory[(kind, key)] = (expires_at, serialized)
+        self._memory.move_to_end((kind, key))
+
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def stats(self):
+        lookups = self._counters['hits'] + self._counters['misses']
+        return {
+            **self._counters,
+            'hit_rate': self._counters['hits'] / lookups if lookups else 0,
+            'entries': len(self._memory)
+        }
@@ -0,0 +1,83 @@
+from .batching import MicroBatcher
+from .inference import negative_score, score_sentiment
+
+
+class RemoteSentimentBackend:
+    """
+    Scores sentiment through the Hugging Face Inference API, one request per text
+    """
+
+    name = 'remote'
+
+    def __init__(self, client, model, executors):
+        self.client = client
+        self.model = model
+        self.executors = executors
+
+    async def score(self, text):
+        result = await self.executors.run_io(
+            self.client.text_classification,
+            text,
+            model=self.model
+        )
+        return negative_score(result)
+
+
+class LocalSentimentBackend:
+    """
+    Scores sentiment with the same model loaded in-process, batching texts that
+    arrive together. Falls back to `fallback` when local inference fails.
+    """
+
+    name = 'local'
+
+    def __init__(self, model, executors, max_batch_size=32, max_wait_ms=20, fallback=None):
+        self.model = model
+        self.executors = executors
+        self.fallback = fallback
+        self.batcher = MicroBatcher(
+            self._score_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name='sentiment'
+        )
+
+    async def _score_batch(self, texts):
+        return await self.executors.run_cpu(score_sentiment, texts, self.model)
+
+    async def score(self, text):
+        try:
+            return await self.batcher.submit(text)
+        except Exception:
+            if self.fallback is None:
+                raise
+            return await self.fallback.score(text)
+
+
+def create_sentiment_backend(backend, client, model, executors, max_batch_size=32, max_wait_ms=20):
+    """
+    Builds the sentiment backend selected by name
+
+    Arguments:
+        backend: 'local' to run the model in-process or 'remote' for the Inference API
+        client: Hugging Face InferenceClient used by the remote backend and as fallback
+        model: Sentiment model id, shared by both backends
+        executors: AnalysisExecutors running the blocking calls
+
+    Returns:
+        Backend exposing `async score(text) -> float` (NEGATIVE score)
+    """
+    remote = RemoteSentimentBackend(client, model, executors)
+
+    if backend == 'remote':
+        return remote
+    if backend == 'local':
+        return LocalSentimentBackend(
+            model,
+            executors,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            fallback=remote
+        )
+
+    raise ValueError(f"Unknown sentiment backend: {backend}")
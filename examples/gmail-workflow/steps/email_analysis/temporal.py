@@ -0,0 +1,124 @@
+import re
+from datetime import date, datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Deadline mentions such as "due 5th of may", "by 12/31" or "before friday",
+# compiled once into a single pattern so each text is scanned once
+DEADLINE_PATTERN = re.compile(
+    r'\b(?:due|by|before)(?:\s+the)?\s+(?:'
+    r'(?P<day>\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<month>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)'
+    r'|(?P<first>\d{1,2})/(?P<second>\d{1,2})(?:/(?P<year>\d{2,4}))?'
+    r'|(?P<weekday>monday|tuesday|wednesday|thursday|friday|saturday|sunday)'
+    r')'
+)
+
+RECENCY_WINDOW_HOURS = 12
+RECENCY_MAX_SCORE = 0.2
+
+
+def parse_email_date(value):
+    """
+    Parses an ISO 8601 or RFC 2822 email date into an aware datetime.
+    Naive values are taken as local time, like datetime.now() produces them.
+
+    Returns:
+        Aware datetime, or None when the value cannot be parsed
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            try:
+                parsed = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+    return parsed if parsed.tzinfo is not None else parsed.astimezone()
+
+
+def recency_score(value, now=None):
+    """
+    Scores emails received within the last 12 hours, decaying with age
+
+    Arguments:
+        value: Email date (ISO 8601 / RFC 2822 string or datetime)
+        now: Reference time, defaults to the current time
+
+    Returns:
+        Recency score between 0 and 0.2, 0 for unparseable dates
+    """
+    email_date = parse_email_date(value)
+    if email_date is None:
+        return 0
+
+    now = parse_email_date(now) or datetime.now(timezone.utc)
+    # Clock skew can put an email slightly in the future
+    hours_old = max((now - email_date).total_seconds() / 3600, 0)
+    if hours_old < RECENCY_WINDOW_HOURS:
+        return max(0, RECENCY_MAX_SCORE - (hours_old / 60))
+    return 0
+
+
+def nearest_year(month, day, reference):
+    """
+    Picks the year that puts month/day closest to the reference date, so
+    "by 3 jan" sent in late December means next January
+    """
+    candidates = []
+    for year in (reference.year - 1, reference.year, reference.year + 1):
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:
+            continue
+    if not candidates:
+        return None
+    return min(candidates, key=lambda candidate: abs((candidate - reference).days))
+
+
+def find_deadline(text_lower, reference=None):
+    """
+    Finds the first valid deadline mentioned in a lowercased text
+
+    Arguments:
+        text_lower: Lowercased email text
+        reference: Date the email was sent, used to resolve weekdays and
+            missing years; defaults to today
+
+    Returns:
+        The deadline as a date, or None when no valid deadline is mentioned
+    """
+    reference = reference or date.today()
+
+    for match in DEADLINE_PATTERN.finditer(text_lower):
+        deadline = resolve_deadline(match, reference)
+        if deadline is not None:
+            return deadline
+
+    return None
+
+
+def resolve_deadline(match, reference):
+    if match.group('month'):
+        return nearest_year(MONTHS.index(match.group('month')) + 1, int(match.group('day')), reference)
+
+    if match.group('first'):
+        first, second, year = int(match.group('first')), int(match.group('second')), match.group('year')
+        # Month first, unless the first number cannot be a month
+        month, day = (second, first) if first > 12 else (first, second)
+        if year is None:
+            return nearest_year(month, day, reference)
+        year = int(year) + 2000 if len(year) == 2 else int(year)
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+
+    # The next such weekday, or the same day when it matches the reference
+    days_ahead = (WEEKDAYS.index(match.group('weekday')) - reference.weekday()) % 7
+    return reference + timedelta(days=days_ahead)
@@ -0,0 +1,150 @@
+import re
+import time
+from collections import OrderedDict
+
+_TOKEN = re.compile(r'[a-z0-9]{3,}')
+
+# Category of a result the model couldn't produce, also the placeholder
+# threadId of emails that came without one
+UNKNOWN = 'unknown'
+
+
+def tokens(text):
+    return set(_TOKEN.findall((text or '').lower()))
+
+
+def known_thread(thread_id):
+    """
+    Returns the threadId to aggregate on, or None for a missing or
+    placeholder ('unknown') id, which would otherwise put unrelated emails
+    in one thread
+    """
+    return thread_id if thread_id and thread_id != UNKNOWN else None
+
+
+class ThreadSummaries:
+    """
+    Compact per-thread summaries (last category and confidence, running
+    urgency and a bounded vocabulary profile) so follow-ups in a thread can
+    reuse its category instead of running the model again.
+
+    A follow-up reuses the thread's category when at least
+    `similarity_threshold` of its tokens already occur in the thread's
+    profile. Summaries are evicted LRU beyond `max_threads` and after
+    `ttl_seconds` without a new message.
+
+    Arguments:
+        max_threads: Number of threads kept, 0 disables thread reuse
+        ttl_seconds: Time after the last message when a summary expires
+        similarity_threshold: Minimum token overlap (0 to 1) for reuse
+        profile_size: Most recent distinct tokens kept per thread
+        urgency_decay: Weight of the newest message in the running urgency
+    """
+
+    def __init__(self, max_threads=10000, ttl_seconds=604800, similarity_threshold=0.3, profile_size=64,
+                 urgency_decay=0.5):
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.profile_size = profile_size
+        self.urgency_decay = urgency_decay
+        self._threads = OrderedDict()
+        self._counters = {'reused': 0, 'diverged': 0, 'new': 0, 'evictions': 0}
+
+    @property
+    def enabled(self):
+        return self.max_threads > 0
+
+    def get(self, thread_id):
+        if not self.enabled or not thread_id:
+            return None
+
+        summary = self._threads.get(thread_id)
+        if summary is None:
+            return None
+        if time.time() - summary['updated_at'] > self.ttl_seconds:
+            del self._threads[thread_id]
+            self._counters['evictions'] += 1
+            return None
+
+        self._threads.move_to_end(thread_id)
+        return summary
+
+    def match(self, thread_id, text):
+        """
+        Looks up the thread of a new message
+
+        Arguments:
+            thread_id: Gmail threadId of the message
+            text: Combined subject and snippet of the message
+
+        Returns:
+            (summary, outcome): the summary when its category can be reused,
+            otherwise None; outcome is 'reused', 'diverged' or 'new', or None
+            when thread reuse is disabled
+        """
+        if not self.enabled or not thread_id:
+            return None, None
+
+        summary = self.get(thread_id)
+        if summary is None:
+            self._counters['new'] += 1
+            return None, 'new'
+
+        message_tokens = tokens(text)
+        overlap = len(message_tokens & summary['profile'].keys()) / len(message_tokens) if message_tokens else 1.0
+        if overlap < self.similarity_threshold:
+            self._counters['diverged'] += 1
+            return None, 'diverged'
+
+        self._counters['reused'] += 1
+        return summary, 'reused'
+
+    def update(self, thread_id, text, category_result, urgency_score):
+        """
+        Folds a message's analysis into its thread summary. 'unknown'
+        category results (also what a failed analysis returns) are left
+        out, so later messages of the thread don't reuse them for the whole
+        TTL.
+
+        Returns:
+            The thread's running urgency score, or None when disabled or the
+            result was left out
+        """
+        if not self.enabled or not thread_id:
+            return None
+        if category_result['category'] == UNKNOWN:
+            return None
+
+        summary = self.get(thread_id)
+        if summary is None:
+            summary = {'profile': OrderedDict(), 'urgency': urgency_score, 'messages': 0}
+            self._threads[thread_id] = summary
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+                self._counters['evictions'] += 1
+        else:
+            summary['urgency'] += self.urgency_decay * (urgency_score - summary['urgency'])
+
+        profile = summary['profile']
+        for token in tokens(text):
+            profile.pop(token, None)
+            profile[token] = None
+        while len(profile) > self.profile_size:
+            profile.popitem(last=False)
+
+        summary.update(
+            category=category_result['category'],
+            confidence=category_result.get('confidence', 0),
+            messages=summary['messages'] + 1,
+            updated_at=time.time()
+        )
+        return summary['urgency']
+
+    def stats(self):
+        looked_up = self._counters['reused'] + self._counters['diverged'] + self._counters['new']
+        return {
+            **self._counters,
+            'threads': len(self._threads),
+            'reuse_rate': self._counters['reused'] / looked_up if looked_up else 0
+        }
@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# Step helpers import each other as the email_analysis package, as in the steps
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'steps'))
+
+
+class MemoryState:
+    """
+    Motia state in a dict, with the get/set/get_group calls the steps use
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, scope, key):
+        return self.values.get((scope, key))
+
+    async def set(self, scope, key, value):
+        self.values[(scope, key)] = value
+
+    async def delete(self, scope, key):
+        self.values.pop((scope, key), None)
+
+    async def get_group(self, group):
+        return [value for (scope, _), value in self.values.items() if scope == group]
+
+
+@pytest.fixture
+def state():
+    return MemoryState()
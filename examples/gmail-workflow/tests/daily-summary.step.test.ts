@@ -19,18 +19,32 @@ describe('Daily Email Summary Step', () => {
 
   it('should generate summary, clear state, and emit event', async () => {
     const autoRespondedEmails = [{ id: '1', subject: 'Test email' }];
-    const processedEmails = [{ id: '2', subject: 'Another email' }];
+    const analysisLog: Record<string, unknown> = {
+      'analysis_log:record:msg-1': { messageId: 'msg-1', category: 'work.task' },
+      'analysis_log:record:msg-2': { messageId: 'msg-2', category: 'spam' }
+    };
+    const analysisLogGroups: Record<string, string[]> = {
+      'email_analysis:analysis_log_days': ['2025-03-10'],
+      'email_analysis:analysis_log_hours:2025-03-10': ['09'],
+      'email_analysis:analysis_log_bucket:2025-03-10:09': ['msg-1', 'msg-2'],
+      'email_backfill:analysis_log_days': ['2019-01-01'],
+      'email_backfill:analysis_log_hours:2019-01-01': ['10'],
+      'email_backfill:analysis_log_bucket:2019-01-01:10': ['old-1']
+    };
     
     const { emit, logger, state, traceId, done } = createTestContext({
       stateGetImplementation: jest.fn().mockImplementation((scope, key) => {
         if (scope === 'email_analysis' && key === 'auto_responded_emails') {
           return Promise.resolve(autoRespondedEmails);
         }
-        if (scope === 'email_analysis' && key === 'processed_emails') {
-          return Promise.resolve(processedEmails);
+        if (scope === 'email_analysis' && key in analysisLog) {
+          return Promise.resolve(analysisLog[key]);
         }
         return Promise.resolve(null);
-      })
+      }),
+      state: {
+        getGroup: jest.fn().mockImplementation((group) => Promise.resolve(analysisLogGroups[group] ?? []))
+      }
     });
 
     await handler({ emit, logger, state, traceId } as unknown as FlowContext);
@@ -39,7 +53,14 @@ describe('Daily Email Summary Step', () => {
     expect(mockDiscordService.send).toHaveBeenCalledTimes(1);
 
     expect(state.set).toHaveBeenCalledWith('email_analysis', 'auto_responded_emails', []);
-    expect(state.set).toHaveBeenCalledWith('email_analysis', 'processed_emails', []);
+    expect(state.delete).toHaveBeenCalledWith('email_analysis', 'analysis_log:record:msg-1');
+    expect(state.delete).toHaveBeenCalledWith('email_analysis', 'analysis_log:record:msg-2');
+    expect(state.clear).toHaveBeenCalledWith('email_analysis:analysis_log_bucket:2025-03-10:09');
+    expect(state.clear).toHaveBeenCalledWith('email_analysis:analysis_log_hours:2025-03-10');
+    expect(state.clear).toHaveBeenCalledWith('email_analysis:analysis_log_days');
+    // The backfill's log is left alone
+    expect(state.delete).not.toHaveBeenCalledWith('email_backfill', 'analysis_log:record:old-1');
+    expect(state.clear).not.toHaveBeenCalledWith(expect.stringMatching(/^email_backfill:/));
 
     expect(emit).toHaveBeenCalledWith({
       topic: 'gmail.summary.sent',
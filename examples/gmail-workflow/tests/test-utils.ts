@@ -30,6 +30,7 @@ export function createTestContext(options: TestContextOptions = {}): TestContext
     set: jest.fn().mockResolvedValue(undefined),
     delete: jest.fn().mockResolvedValue(undefined),
     clear: jest.fn().mockResolvedValue(undefined),
+    getGroup: jest.fn().mockResolvedValue([]),
     cleanup: jest.fn().mockResolvedValue(undefined),
     ...options.state
   };
@@ -173,6 +174,7 @@ export interface TestContext {
     set: jest.Mock;
     delete: jest.Mock;
     clear: jest.Mock;
+    getGroup: jest.Mock;
     cleanup: jest.Mock;
     [key: string]: jest.Mock;
   };
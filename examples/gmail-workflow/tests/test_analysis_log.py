@@ -0,0 +1,41 @@
+import asyncio
+from datetime import datetime, timezone
+
+from email_analysis.analysis_log import AnalysisLog
+from email_analysis.backfill import BACKFILL_SCOPE
+
+
+def collect(log, day=None):
+    async def run():
+        return [record async for record in log.records(day)]
+    return asyncio.run(run())
+
+
+def test_backfill_appends_stay_out_of_the_live_log(state):
+    live = AnalysisLog(state)
+    backfill = AnalysisLog(state, BACKFILL_SCOPE)
+    today = datetime(2025, 3, 10, 9, tzinfo=timezone.utc)
+
+    asyncio.run(live.append({'messageId': 'live-1'}, today))
+    live_groups = {key: value for key, value in state.values.items() if key[0] != BACKFILL_SCOPE}
+
+    asyncio.run(backfill.append({'messageId': 'old-1'}, datetime(2019, 1, 1, 10, tzinfo=timezone.utc)))
+    asyncio.run(backfill.extend([{'messageId': 'old-2'}], [today]))
+
+    assert asyncio.run(live.days()) == ['2025-03-10']
+    assert [record['messageId'] for record in collect(live)] == ['live-1']
+    assert {key: value for key, value in state.values.items() if key[0].startswith('email_analysis')} == live_groups
+
+    assert asyncio.run(backfill.days()) == ['2019-01-01', '2025-03-10']
+    assert [record['messageId'] for record in collect(backfill)] == ['old-1', 'old-2']
+
+
+def test_concurrent_appends_keep_every_record(state):
+    log = AnalysisLog(state)
+    hour = datetime(2025, 3, 10, 9, tzinfo=timezone.utc)
+
+    async def run():
+        await asyncio.gather(*[log.append({'messageId': f"m-{i:02d}"}, hour) for i in range(20)])
+
+    asyncio.run(run())
+    assert [record['messageId'] for record in collect(log, '2025-03-10')] == [f"m-{i:02d}" for i in range(20)]
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import mailbox
+from email.message import EmailMessage
+
+from email_analysis.backfill import MailboxBackfill, read_mbox_messages
+
+
+class Gate:
+    async def idle(self):
+        pass
+
+
+async def analyze(emails):
+    return [{'messageId': email['messageId'], 'subject': email['subject']} for email in emails]
+
+
+def write_mbox(path, count):
+    box = mailbox.mbox(str(path))
+    for index in range(count):
+        message = EmailMessage()
+        message['Subject'] = f"Subject {index}"
+        message['From'] = 'sender@example.com'
+        if index != 1:
+            message['Message-ID'] = f"<id-{index}@example.com>"
+        message.set_content(f"Body {index}\nFrom the team\n")
+        box.add(message)
+    box.close()
+
+
+def test_mbox_reader_resumes_from_offsets(tmp_path):
+    path = tmp_path / 'export.mbox'
+    write_mbox(path, 4)
+
+    messages = list(read_mbox_messages(str(path)))
+    assert [email['subject'] for _, email in messages] == [f"Subject {index}" for index in range(4)]
+    assert messages[1][1]['messageId'] == f"mbox-{messages[0][0]}"
+    assert messages[-1][0] == path.stat().st_size
+
+    resumed = list(read_mbox_messages(str(path), messages[1][0]))
+    assert [email['subject'] for _, email in resumed] == ['Subject 2', 'Subject 3']
+
+
+def test_backfill_chunks_cover_the_export_once(tmp_path, state):
+    path = tmp_path / 'export.mbox'
+    write_mbox(path, 5)
+    backfill = MailboxBackfill(state, analyze, Gate(), batch_size=2, chunk_size=2)
+
+    async def run():
+        checkpoints = []
+        while not checkpoints or checkpoints[-1]['status'] != 'completed':
+            checkpoints.append(dict(await backfill.run_chunk('job', str(path))))
+        return checkpoints, [record['subject'] async for record in backfill.log.records()]
+
+    checkpoints, subjects = asyncio.run(run())
+    assert checkpoints[-1]['processed'] == 5
+    assert sorted(subjects) == [f"Subject {index}" for index in range(5)]
+
+
+def test_backfill_skips_malformed_jsonl_lines(tmp_path, state):
+    path = tmp_path / 'export.jsonl'
+    path.write_text('\n'.join([
+        json.dumps({'messageId': 'a', 'subject': 'first'}),
+        '{not json',
+        json.dumps({'threadId': 't-1', 'subject': 'no id'}),
+        '[1, 2]'
+    ]) + '\n')
+    backfill = MailboxBackfill(state, analyze, Gate(), batch_size=8, chunk_size=8)
+
+    checkpoint = asyncio.run(backfill.run_chunk('job', str(path)))
+    assert (checkpoint['status'], checkpoint['processed'], checkpoint['skipped']) == ('completed', 2, 2)
+    assert asyncio.run(state.get(backfill.scope, 'analysis_log:record:a')) is not None
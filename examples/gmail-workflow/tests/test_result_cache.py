@@ -0,0 +1,23 @@
+from email_analysis.result_cache import AnalysisResultCache, config_fingerprint
+
+ZERO_SHOT = config_fingerprint(('zero-shot', 'facebook/bart-large-mnli', 'torch'), ['work.task', 'spam'])
+EMBEDDING = config_fingerprint(('embedding', 'facebook/bart-large-mnli', 'onnx'), ['work.task', 'spam'])
+
+
+def test_fingerprints_differ_per_setting():
+    assert ZERO_SHOT != EMBEDDING
+    assert ZERO_SHOT != config_fingerprint(('zero-shot', 'facebook/bart-large-mnli', 'torch'), ['work.task'])
+    assert ZERO_SHOT == config_fingerprint(('zero-shot', 'facebook/bart-large-mnli', 'torch'), ['work.task', 'spam'])
+
+
+def test_caches_with_other_fingerprints_do_not_share_hits(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    old = AnalysisResultCache(path=path, fingerprint=ZERO_SHOT)
+    old.set('category', old.key_for('Invoice', 'Please pay'), {'category': 'work.task', 'confidence': 0.9})
+
+    new = AnalysisResultCache(path=path, fingerprint=EMBEDDING)
+    assert new.get('category', new.key_for('Invoice', 'Please pay')) is None
+
+    same = AnalysisResultCache(path=path, fingerprint=ZERO_SHOT)
+    assert same.get('category', same.key_for('Invoice', 'Please pay'))['category'] == 'work.task'
+    assert same.stats()['disk_hits'] == 1
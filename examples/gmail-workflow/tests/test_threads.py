@@ -0,0 +1,64 @@
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+from email_analysis.threads import ThreadSummaries, known_thread
+
+ANALYZER_STEP = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'steps', 'analyze-email.step.py')
+
+FIRST = {'messageId': 'm-1', 'threadId': 'unknown', 'subject': 'Quarterly budget review', 'snippet': 'numbers attached'}
+SECOND = {'messageId': 'm-2', 'threadId': 'unknown', 'subject': 'Quarterly budget review', 'snippet': 'numbers attached again'}
+
+
+class Logger:
+    def info(self, *args):
+        pass
+
+    def error(self, *args):
+        pass
+
+
+def test_placeholder_thread_ids_are_not_threads():
+    assert known_thread('unknown') is None
+    assert known_thread('') is None
+    assert known_thread(None) is None
+    assert known_thread('18c2f') == '18c2f'
+
+
+def test_unknown_thread_ids_never_share_a_summary():
+    summaries = ThreadSummaries()
+    first, second = (f"{email['subject']}\n\n{email['snippet']}" for email in (FIRST, SECOND))
+
+    summaries.update(known_thread(FIRST['threadId']), first, {'category': 'work.task', 'confidence': 0.9}, 0.5)
+    assert summaries.match(known_thread(SECOND['threadId']), second) == (None, None)
+    assert summaries.stats()['threads'] == 0
+
+
+def test_analyze_batch_does_not_reuse_categories_of_unknown_threads():
+    pytest.importorskip('huggingface_hub')
+    spec = importlib.util.spec_from_file_location('analyze_email_step_test', ANALYZER_STEP)
+    step = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(step)
+
+    step.thread_summaries = ThreadSummaries(max_threads=100)
+    step.result_cache = step.AnalysisResultCache(max_entries=0)
+    categories = iter(['work.task', 'spam'])
+
+    async def classify(text):
+        return {'labels': [next(categories), 'update.notification'], 'scores': [0.9, 0.05]}
+
+    async def sentiment(text, cache_key=None):
+        return 0.3
+
+    step.category_batcher.submit = classify
+    step.score_sentiment = sentiment
+    ctx = type('Context', (), {'logger': Logger()})()
+
+    async def run():
+        return await step.analyze_batch([FIRST], ctx) + await step.analyze_batch([SECOND], ctx)
+
+    first, second = asyncio.run(run())
+    assert (first['category'], second['category']) == ('work.task', 'spam')
+    assert step.thread_summaries.stats()['threads'] == 0
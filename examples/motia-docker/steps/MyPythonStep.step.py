@@ -1,3 +1,10 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from step_metrics import metrics
+
 config = {
     "type": "event",
     "name": "MyPythonStep",
@@ -8,11 +15,13 @@ config = {
     "input": None,  # Replace with Pydantic model for validation
 }
 
+@metrics.instrument('MyPythonStep')
 async def handler(input, ctx):
     ctx.logger.info('Processing MyPythonStep', input)
     ctx.logger.info('[MyPythonStep] key', input.get('key'))
 
-    value = await ctx.state.get(ctx.trace_id, input.get('key'))
+    with metrics.span('state_get'):
+        value = await ctx.state.get(ctx.trace_id, input.get('key'))
     
     ctx.logger.info('State change detected using Python: ', {
         'key': input.get('key'),
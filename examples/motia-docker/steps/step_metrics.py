@@ -0,0 +1,305 @@
+"""
+Lightweight timing and counter instrumentation for Python Motia steps.
+
+    from step_metrics import metrics
+
+    @metrics.instrument('process-pdfs')
+    async def handler(input, ctx):
+        with metrics.span('convert'):
+            ...
+
+Each instrumented handler records invocation counts, error counts, wall time
+and input payload size, plus wall time and errors of every named span opened
+while it runs, and any named counters bumped with `metrics.increment()`.
+Totals are rendered in the Prometheus text exposition format and written to
+a file per step process next to STEP_METRICS_FILE and/or served on
+STEP_METRICS_PORT (GET /metrics) when those environment variables are set.
+When the handler receives a Motia ctx, a 'Step timings' log line with the
+per-stage durations of that invocation is also emitted on ctx.logger.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds, from sub-millisecond lookups to slow model calls
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_current = contextvars.ContextVar('step_metrics_invocation', default=None)
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.total += value
+        self.count += 1
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in labels.items()) + '}'
+
+
+def payload_size(payload):
+    """
+    Approximate size in bytes of a handler input once serialized as JSON
+    """
+    if payload is None:
+        return 0
+    if not isinstance(payload, (dict, list, str)) and hasattr(payload, '__dict__'):
+        payload = vars(payload)
+    try:
+        return len(json.dumps(payload, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class StepMetrics:
+    def __init__(self, file_path=None, dump_interval=10.0):
+        self.file_path = file_path
+        self.dump_interval = dump_interval
+        self._lock = threading.Lock()
+        self._invocations = {}
+        self._errors = {}
+        self._durations = {}
+        self._payload_bytes = {}
+        self._stage_durations = {}
+        self._stage_errors = {}
+        self._events = {}
+        self._steps = set()
+        self._last_dump = 0.0
+        self._server = None
+
+    def instrument(self, step, measure_payload=True):
+        """
+        Decorates an async Motia handler `(input, ctx)` so every call is
+        recorded under `step`
+        """
+        self._steps.add(step)
+
+        def decorator(handler):
+            @functools.wraps(handler)
+            async def wrapper(*args, **kwargs):
+                invocation = {'step': step, 'stages': {}, 'failed': False}
+                stages = invocation['stages']
+                token = _current.set(invocation)
+                started = time.perf_counter()
+                try:
+                    return await handler(*args, **kwargs)
+                except BaseException:
+                    invocation['failed'] = True
+                    raise
+                finally:
+                    duration = time.perf_counter() - started
+                    failed = invocation['failed']
+                    _current.reset(token)
+                    size = payload_size(args[0]) if measure_payload and args else None
+                    self._record_invocation(step, duration, failed, size)
+
+                    ctx = args[1] if len(args) > 1 else kwargs.get('ctx') or kwargs.get('context')
+                    logger = getattr(ctx, 'logger', None)
+                    if logger is not None:
+                        logger.info('Step timings', {
+                            'step': step,
+                            'durationMs': round(duration * 1000, 3),
+                            'stagesMs': {name: round(value * 1000, 3) for name, value in stages.items()},
+                            'payloadBytes': size,
+                            'error': failed
+                        })
+
+                    self.maybe_dump()
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def span(self, stage, step=None):
+        """
+        Times a named stage of the current handler invocation (works around
+        awaits too, measuring wall time)
+        """
+        current = _current.get()
+        step = step or (current['step'] if current else 'unknown')
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            if current is not None:
+                current['stages'][stage] = current['stages'].get(stage, 0.0) + duration
+            self._record_stage(step, stage, duration, failed)
+
+    def mark_error(self):
+        """
+        Counts the current invocation as failed, for handlers that catch
+        their own exceptions instead of raising
+        """
+        current = _current.get()
+        if current is not None:
+            current['failed'] = True
+
+    def increment(self, event, amount=1, step=None):
+        """
+        Adds to a named counter (e.g. cache hits) of the current handler's step
+        """
+        current = _current.get()
+        step = step or (current['step'] if current else 'unknown')
+        with self._lock:
+            self._events[(step, event)] = self._events.get((step, event), 0) + amount
+
+    async def track(self, stage, awaitable):
+        """
+        Awaits `awaitable` inside a span, handy with asyncio.gather
+        """
+        with self.span(stage):
+            return await awaitable
+
+    def _record_invocation(self, step, duration, failed, size):
+        with self._lock:
+            self._invocations[step] = self._invocations.get(step, 0) + 1
+            if failed:
+                self._errors[step] = self._errors.get(step, 0) + 1
+            self._durations.setdefault(step, _Histogram()).observe(duration)
+            if size is not None:
+                self._payload_bytes.setdefault(step, _Histogram()).observe(size)
+
+    def _record_stage(self, step, stage, duration, failed):
+        key = (step, stage)
+        with self._lock:
+            self._stage_durations.setdefault(key, _Histogram()).observe(duration)
+            if failed:
+                self._stage_errors[key] = self._stage_errors.get(key, 0) + 1
+
+    def render(self):
+        """
+        Renders every metric in the Prometheus text exposition format
+        """
+        lines = []
+
+        def histogram(name, help_text, series, with_buckets=True):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {'histogram' if with_buckets else 'summary'}")
+            for labels, hist in series:
+                if with_buckets:
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+                lines.append(f"{name}_sum{_labels(**labels)} {hist.total}")
+                lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+
+        def counter(name, help_text, series):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in series:
+                lines.append(f"{name}{_labels(**labels)} {value}")
+
+        with self._lock:
+            counter('motia_step_invocations_total', 'Handler invocations',
+                    [({'step': step}, value) for step, value in self._invocations.items()])
+            counter('motia_step_errors_total', 'Handler invocations that raised',
+                    [({'step': step}, value) for step, value in self._errors.items()])
+            histogram('motia_step_duration_seconds', 'Handler wall time',
+                      [({'step': step}, hist) for step, hist in self._durations.items()])
+            histogram('motia_step_payload_bytes', 'Approximate JSON size of handler inputs',
+                      [({'step': step}, hist) for step, hist in self._payload_bytes.items()], with_buckets=False)
+            histogram('motia_step_stage_duration_seconds', 'Wall time of named handler stages',
+                      [({'step': step, 'stage': stage}, hist) for (step, stage), hist in self._stage_durations.items()])
+            counter('motia_step_stage_errors_total', 'Handler stages that raised',
+                    [({'step': step, 'stage': stage}, value) for (step, stage), value in self._stage_errors.items()])
+            counter('motia_step_events_total', 'Named counters bumped by handlers',
+                    [({'step': step, 'event': event}, value) for (step, event), value in self._events.items()])
+
+        return '\n'.join(lines) + '\n'
+
+    def output_path(self):
+        """
+        File this process writes: every step runs in its own process, so
+        the steps instrumented here (or the pid when there are none yet) are
+        added to the name, e.g. metrics.prom -> metrics.process-pdfs.prom.
+        Point a textfile collector at the directory to scrape them all.
+        """
+        root, extension = os.path.splitext(self.file_path)
+        name = re.sub(r'[^\w.+-]', '_', '+'.join(sorted(self._steps)) or str(os.getpid()))
+        return f"{root}.{name}{extension}"
+
+    def maybe_dump(self, force=False):
+        """
+        Writes the metrics file if configured and the dump interval has passed
+        """
+        if not self.file_path:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_dump < self.dump_interval:
+            return
+        self._last_dump = now
+
+        # Write then rename, so scrapers never read a half-written file; the
+        # temporary name is per process, so writers never share one
+        path = self.output_path()
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
+
+    def serve(self, port, host='127.0.0.1'):
+        """
+        Serves GET /metrics on a background thread
+        """
+        if self._server is not None:
+            return self._server
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name='step-metrics', daemon=True).start()
+        return self._server
+
+
+metrics = StepMetrics(
+    file_path=os.environ.get('STEP_METRICS_FILE') or None,
+    dump_interval=float(os.environ.get('STEP_METRICS_DUMP_INTERVAL', '10'))
+)
+
+if os.environ.get('STEP_METRICS_PORT'):
+    try:
+        metrics.serve(int(os.environ['STEP_METRICS_PORT']))
+    except OSError:
+        # Another step process in this environment already serves the port
+        pass
+
+atexit.register(lambda: metrics.maybe_dump(force=True))
@@ -0,0 +1,87 @@
+"""
+Measures query latency and recall of the local vector index
+(steps/event-steps/pdf_ingest/vector_index.py) with exact search and with
+IVF, on synthetic clustered unit vectors the size of all-MiniLM-L6-v2
+embeddings. Recall@k is measured against exact search.
+
+Usage:
+    python benchmarks/local_index.py [--rows 200000] [--lists 256] [--probe 8,16,32]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'steps', 'event-steps'))
+
+from pdf_ingest.vector_index import LocalVectorIndex
+
+
+def unit(vectors):
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def corpus(rng, rows, dimensions, topics=1000):
+    """
+    Chunks of the same document cluster around a topic vector
+    """
+    centers = unit(rng.standard_normal((topics, dimensions)))
+    noise = rng.standard_normal((rows, dimensions)) / np.sqrt(dimensions)
+    return unit(centers[rng.integers(0, topics, rows)] + 0.5 * noise)
+
+
+def timed_search(index, queries, k):
+    results = []
+    started = time.perf_counter()
+    for query in queries:
+        results.append({chunk['text'] for chunk, _ in index.search(query, k)})
+    return results, (time.perf_counter() - started) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--dimensions', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--lists', type=int, default=256, help='IVF lists')
+    parser.add_argument('--probe', default='8,16,32', help='Comma-separated IVF lists probed per query')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = corpus(rng, args.rows, args.dimensions)
+    queries = unit(vectors[rng.integers(0, args.rows, args.queries)] + 0.02 * rng.standard_normal((args.queries, args.dimensions)))
+
+    with tempfile.TemporaryDirectory() as directory:
+        index = LocalVectorIndex(directory, args.dimensions)
+        started = time.perf_counter()
+        for start in range(0, args.rows, 10000):
+            block = vectors[start:start + 10000]
+            records = [
+                {'text': str(start + i), 'title': 'synthetic', 'metadata': {'source': 'synthetic.pdf', 'page': 1}}
+                for i in range(len(block))
+            ]
+            index.add(block, records, 'synthetic')
+        print(f"indexed {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+        exact, exact_ms = timed_search(index, queries, args.k)
+
+        started = time.perf_counter()
+        index.build_ivf(args.lists)
+        print(f"built {args.lists} IVF lists in {time.perf_counter() - started:.1f}s")
+
+        print(f"{'search':>10} {'ms/query':>9} {'recall@' + str(args.k):>9}")
+        print(f"{'exact':>10} {exact_ms:>9.2f} {1:>9.3f}")
+        for probe in [int(p) for p in args.probe.split(',')]:
+            index.ivf_probe = probe
+            approximate, ivf_ms = timed_search(index, queries, args.k)
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(approximate, exact)])
+            print(f"{'ivf/' + str(probe):>10} {ivf_ms:>9.2f} {recall:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import { ApiRouteConfig, Handlers } from 'motia';
 import { z } from 'zod';
+import { PdfProfile } from '../../types/index';
 
 export const config: ApiRouteConfig = {
   type: 'api',
@@ -10,6 +11,8 @@ export const config: ApiRouteConfig = {
   flows: ['rag-workflow'],
   bodySchema: z.object({
     folderPath: z.string(),
+    // Overrides PDF_PROFILE for this run
+    profile: PdfProfile.optional(),
   }),
 };
 
@@ -17,13 +20,13 @@ export const handler: Handlers['api-process-pdfs'] = async (
   req,
   { emit, logger }
 ) => {
-  const { folderPath } = req.body;
+  const { folderPath, profile } = req.body;
 
-  logger.info('Starting PDF processing workflow', { folderPath });
+  logger.info('Starting PDF processing workflow', { folderPath, profile });
 
   await emit({
     topic: 'rag.read.pdfs',
-    data: { folderPath },
+    data: { folderPath, profile },
   });
 
   return {
@@ -31,6 +34,7 @@ export const handler: Handlers['api-process-pdfs'] = async (
     body: {
       message: 'PDF processing workflow started',
       folderPath,
+      profile,
     },
   };
 };
@@ -0,0 +1,81 @@
+import os
+import sys
+import time
+
+# The local index lives with the other PDF ingest helpers
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'event-steps'))
+
+from pdf_ingest.embedding import get_embedder
+from pdf_ingest.vector_index import LocalVectorIndex
+from step_metrics import metrics
+
+# Must match embed-chunks
+LOCAL_INDEX_DIR = os.environ.get("LOCAL_INDEX_DIR", ".motia/local-index")
+EMBED_MODEL_ID = os.environ.get("EMBED_MODEL_ID", "sentence-transformers/all-MiniLM-L6-v2")
+LOCAL_INDEX_IVF_PROBE = int(os.environ.get("LOCAL_INDEX_IVF_PROBE", "8"))
+
+config = {
+    "type": "api",
+    "name": "api-query-local",
+    "path": "/api/rag/local/query",
+    "method": "POST",
+    "emits": [],
+    "flows": ["rag-workflow"]
+    # body: { query: str, limit?: int }
+}
+
+_index = None
+
+
+def local_index():
+    global _index
+    if _index is None:
+        _index = LocalVectorIndex(LOCAL_INDEX_DIR, get_embedder(EMBED_MODEL_ID).dimensions, ivf_probe=LOCAL_INDEX_IVF_PROBE)
+    return _index
+
+
+@metrics.instrument('api-query-local')
+async def handler(req, context):
+    body = req.get('body') or {}
+    query = body.get('query')
+    limit = int(body.get('limit', 5))
+    if not query:
+        return {"status": 400, "body": {"error": "query is required"}}
+
+    embedder = get_embedder(EMBED_MODEL_ID)
+    index = local_index()
+
+    started = time.perf_counter()
+    with metrics.span('embed'):
+        vector = embedder.embed([query])[0]
+    embedded = time.perf_counter()
+    with metrics.span('search'):
+        results = index.search(vector, limit)
+    finished = time.perf_counter()
+
+    # Same chunk shape as api-query-rag, plus the cosine similarity
+    chunks = [
+        {
+            "text": chunk['text'],
+            "title": chunk['title'],
+            "metadata": {
+                "source": chunk['source'],
+                "page": chunk['page']
+            },
+            "score": score
+        }
+        for chunk, score in results
+    ]
+    context.logger.info("Local RAG query", {'query': query, 'results': len(chunks), **index.stats()})
+
+    return {
+        "status": 200,
+        "body": {
+            "query": query,
+            "chunks": chunks,
+            "timings": {
+                "embed_ms": (embedded - started) * 1000,
+                "search_ms": (finished - embedded) * 1000
+            }
+        }
+    }
@@ -0,0 +1,96 @@
+import os
+import sys
+from itertools import islice
+
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from pdf_ingest.chunk_store import iter_chunks
+from pdf_ingest.embedding import get_embedder
+from pdf_ingest.vector_index import LocalVectorIndex
+from step_metrics import metrics
+
+# Where chunk vectors go: 'weaviate' (Weaviate Cloud, OpenAI vectorizer),
+# 'local' (embedded here into an on-disk index) or 'both'
+VECTOR_STORE = os.environ.get("VECTOR_STORE", "weaviate").lower()
+LOCAL_INDEX_DIR = os.environ.get("LOCAL_INDEX_DIR", ".motia/local-index")
+EMBED_MODEL_ID = os.environ.get("EMBED_MODEL_ID", "sentence-transformers/all-MiniLM-L6-v2")
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", "32"))
+
+# LOCAL_INDEX_IVF_LISTS > 0 builds an IVF index once the index holds
+# LOCAL_INDEX_IVF_MIN_ROWS rows, and rebuilds it whenever the index doubled
+LOCAL_INDEX_IVF_LISTS = int(os.environ.get("LOCAL_INDEX_IVF_LISTS", "0"))
+LOCAL_INDEX_IVF_MIN_ROWS = int(os.environ.get("LOCAL_INDEX_IVF_MIN_ROWS", "50000"))
+
+config = {
+    "type": "event",
+    "name": "embed-chunks",
+    "flows": ["rag-workflow"],
+    # rag.chunks.ready: { stateKey, chunkSet }, rag.chunks.removed: { source, keepChunkSet? }
+    "subscribes": ["rag.chunks.ready", "rag.chunks.removed"],
+    "emits": [{ "topic": "rag.chunks.indexed", "label": "Chunks indexed locally" }],
+    "input": None # No schema validation for Python right now
+}
+
+_index = None
+
+
+def local_index():
+    global _index
+    if _index is None:
+        _index = LocalVectorIndex(LOCAL_INDEX_DIR, get_embedder(EMBED_MODEL_ID, EMBED_BATCH_SIZE).dimensions)
+    return _index
+
+
+@metrics.instrument('embed-chunks')
+async def handler(input, context):
+    if VECTOR_STORE not in ('local', 'both'):
+        return
+
+    index = local_index()
+
+    if 'stateKey' not in input:
+        removed = index.remove(input['source'], input.get('keepChunkSet'))
+        context.logger.info(f"Removed {removed} chunks of {input['source']} from the local index")
+        return
+
+    stored = await context.state.get('rag-workflow', input['stateKey'])
+    if not stored:
+        raise Exception('No chunks found in state')
+
+    # Loading a batch again (e.g. a file processed again after failing part
+    # way) replaces its rows instead of adding them a second time
+    replaced = index.remove_batch(input['stateKey'])
+    if replaced:
+        context.logger.info(f"Replacing {replaced} chunks of {input['stateKey']} in the local index")
+
+    # Chunk files are read a group at a time instead of all at once
+    embedder = get_embedder(EMBED_MODEL_ID, EMBED_BATCH_SIZE)
+    chunks = iter_chunks(stored)
+    count = 0
+    while True:
+        group = list(islice(chunks, EMBED_BATCH_SIZE * 8))
+        if not group:
+            break
+
+        with metrics.span('embed'):
+            vectors = embedder.embed([chunk['text'] for chunk in group])
+
+        with metrics.span('index_write'):
+            index.add(vectors, group, input.get('chunkSet', input['stateKey']), input['stateKey'])
+        count += len(group)
+
+    stats = index.stats()
+    if LOCAL_INDEX_IVF_LISTS and stats['rows'] >= LOCAL_INDEX_IVF_MIN_ROWS and stats['rows'] >= 2 * stats['ivf_rows']:
+        with metrics.span('ivf_build'):
+            built = index.build_ivf(LOCAL_INDEX_IVF_LISTS)
+        context.logger.info("Rebuilt local IVF index", built)
+
+    context.logger.info(f"Indexed {count} chunks locally", {**stats, 'embedder': embedder.timings})
+
+    await context.emit({
+        "topic": "rag.chunks.indexed",
+        "data": {
+            "count": count,
+            "rows": stats['rows']
+        }
+    })
@@ -43,6 +43,10 @@ const WEAVIATE_SCHEMA = {
       name: 'page',
       dataType: 'number' as const,
     },
+    {
+      name: 'chunkSet',
+      dataType: 'text' as const,
+    },
   ],
 };
 
@@ -53,6 +57,11 @@ export const handler: Handlers['init-weaviate'] = async (
   _input,
   { logger }
 ) => {
+  // Chunks only go to the local index (embed-chunks)
+  if (process.env.VECTOR_STORE?.toLowerCase() === 'local') {
+    return;
+  }
+
   logger.info('Initializing Weaviate client');
 
   // Initialize Weaviate client
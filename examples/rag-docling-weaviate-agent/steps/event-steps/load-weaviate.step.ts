@@ -1,10 +1,13 @@
-import weaviate from 'weaviate-client';
+import weaviate, { generateUuid5 } from 'weaviate-client';
 import { DocumentChunkType } from '../../types/index';
+import { iterateChunks, isStoredChunks, StoredChunks } from '../../utils/chunk-store';
 import { z } from 'zod';
 import { EventConfig, Handlers } from 'motia';
 
 const InputSchema = z.object({
   stateKey: z.string(),
+  // Chunk set of the file the batch belongs to; older events carry only stateKey
+  chunkSet: z.string().optional(),
 });
 
 export const config: EventConfig = {
@@ -20,13 +23,21 @@ export const handler: Handlers['load-weaviate'] = async (
   input,
   { emit, logger, state }
 ) => {
-  // Get chunks from state
-  const chunks = await state.get<DocumentChunkType[]>('rag-workflow', input.stateKey);
-  if (!chunks) {
+  // Chunks only go to the local index (embed-chunks)
+  if (process.env.VECTOR_STORE?.toLowerCase() === 'local') {
+    return;
+  }
+
+  // Get chunks from state, or the chunk file state points to
+  const stored = await state.get<StoredChunks | DocumentChunkType[]>('rag-workflow', input.stateKey);
+  if (!stored) {
     throw new Error('No chunks found in state');
   }
 
-  logger.info('Retrieved chunks from state', { count: chunks.length });
+  logger.info('Retrieved chunks from state', {
+    count: isStoredChunks(stored) ? stored.chunks : stored.length,
+    ...(isStoredChunks(stored) && { file: stored.path, bytes: stored.bytes }),
+  });
 
   // Initialize Weaviate client
   logger.info('Initializing Weaviate client');
@@ -39,25 +50,47 @@ export const handler: Handlers['load-weaviate'] = async (
   });
 
   try {
-    // Process chunks in batches
+    // Insert chunks in batches as they are read
+    const collection = client.collections.get('Books');
     const batchSize = 100;
-    for (let i = 0; i < chunks.length; i += batchSize) {
-      const batch = chunks.slice(i, i + batchSize).map((chunk: DocumentChunkType) => ({
-        properties: {
-          text: chunk.text,
-          title: chunk.title,
-          source: chunk.metadata.source,
-          page: chunk.metadata.page,
-        },
-      }));
+    let batch: DocumentChunkType[] = [];
+    let batches = 0;
+    let count = 0;
 
-      // Insert batch
-      const collection = client.collections.get('Books');
-      await collection.data.insertMany(batch);
-      logger.info(`Inserted batch ${i / batchSize + 1}`, { count: batch.length });
+    const insert = async () => {
+      await collection.data.insertMany(
+        batch.map((chunk, index) => ({
+          // Ids derived from the state key and position make loading a batch
+          // again (e.g. a file processed again after failing part way)
+          // overwrite its objects instead of inserting duplicates
+          id: generateUuid5(`${input.stateKey}:${count + index}`),
+          properties: {
+            text: chunk.text,
+            title: chunk.title,
+            source: chunk.metadata.source,
+            page: chunk.metadata.page,
+            // Lets remove-weaviate drop the chunks of a file's previous content
+            chunkSet: input.chunkSet ?? input.stateKey,
+          },
+        }))
+      );
+      batches += 1;
+      count += batch.length;
+      logger.info(`Inserted batch ${batches}`, { count: batch.length });
+      batch = [];
+    };
+
+    for await (const chunk of iterateChunks(stored)) {
+      batch.push(chunk);
+      if (batch.length === batchSize) {
+        await insert();
+      }
+    }
+    if (batch.length) {
+      await insert();
     }
 
-    await emit({ topic: 'rag.chunks.loaded', data: { count: chunks.length } });
+    await emit({ topic: 'rag.chunks.loaded', data: { count } });
   } catch (error) {
     logger.error('Error in load-weaviate step', { error });
     throw error;
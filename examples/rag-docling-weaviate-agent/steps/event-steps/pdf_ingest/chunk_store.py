@@ -0,0 +1,154 @@
+"""
+Compact on-disk format of a batch of chunks (read by utils/chunk-store.ts on
+the TypeScript side):
+
+    header  b'RAGC', u8 version
+    string  u8 1, u32 byte length, UTF-8 bytes
+            appends to the string dictionary, whose ids count from 0
+    chunk   u8 2, u32 title id, u32 source id, u32 page, u32 text byte length, UTF-8 text
+
+All integers are little-endian. A string is written right before the first
+chunk that uses it, so files are written and read front to back in one pass
+without holding the chunks in memory; titles and sources are stored once per
+file instead of once per chunk.
+"""
+import os
+import struct
+
+MAGIC = b'RAGC'
+VERSION = 1
+CHUNK_FORMAT = f"ragc/{VERSION}"
+
+STRING = 1
+CHUNK = 2
+
+_TAG = struct.Struct('<B')
+_LENGTH = struct.Struct('<I')
+_CHUNK = struct.Struct('<IIII')
+
+
+def write_chunks(path, chunks):
+    """
+    Writes chunk dicts to `path`, atomically
+
+    Returns:
+        Number of chunks written
+    """
+    strings = {}
+    count = 0
+    temporary = path + '.tmp'
+
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC + _TAG.pack(VERSION))
+
+        def string_id(value):
+            if value not in strings:
+                encoded = value.encode('utf-8')
+                f.write(_TAG.pack(STRING) + _LENGTH.pack(len(encoded)) + encoded)
+                strings[value] = len(strings)
+            return strings[value]
+
+        for chunk in chunks:
+            title = string_id(chunk['title'])
+            source = string_id(chunk['metadata']['source'])
+            text = chunk['text'].encode('utf-8')
+            f.write(_TAG.pack(CHUNK) + _CHUNK.pack(title, source, chunk['metadata']['page'], len(text)) + text)
+            count += 1
+
+    os.replace(temporary, path)
+    return count
+
+
+def _read(f, size, path):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError(f"Truncated chunk file: {path}")
+    return data
+
+
+def read_chunks(path):
+    """
+    Yields the chunk dicts of a file one at a time
+
+    Raises:
+        ValueError: The file is not a chunk file or ends inside a record
+    """
+    strings = []
+    with open(path, 'rb') as f:
+        header = f.read(len(MAGIC) + 1)
+        if len(header) != len(MAGIC) + 1 or header[:len(MAGIC)] != MAGIC or header[len(MAGIC)] != VERSION:
+            raise ValueError(f"Not a {CHUNK_FORMAT} chunk file: {path}")
+
+        while True:
+            tag = f.read(1)
+            if not tag:
+                return
+            if tag[0] == STRING:
+                (length,) = _LENGTH.unpack(_read(f, _LENGTH.size, path))
+                strings.append(_read(f, length, path).decode('utf-8'))
+            elif tag[0] == CHUNK:
+                title, source, page, length = _CHUNK.unpack(_read(f, _CHUNK.size, path))
+                yield {
+                    "text": _read(f, length, path).decode('utf-8'),
+                    "title": strings[title],
+                    "metadata": {
+                        "source": strings[source],
+                        "page": page
+                    }
+                }
+            else:
+                raise ValueError(f"Corrupt chunk file {path}: unknown record {tag[0]}")
+
+
+class ChunkStore:
+    """
+    Chunk files in a directory, one per state key. State holds a small
+    reference to the file instead of the chunks:
+
+        {"format": "ragc/1", "path": <absolute path>, "chunks": <count>, "bytes": <file size>}
+
+    Arguments:
+        directory: Where the chunk files live; must be readable by the TypeScript steps too
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.ragc")
+
+    def save(self, key, chunks):
+        """
+        Returns:
+            The reference to store in state under `key`
+        """
+        path = self.path(key)
+        count = write_chunks(path, chunks)
+        return {"format": CHUNK_FORMAT, "path": path, "chunks": count, "bytes": os.path.getsize(path)}
+
+    def delete(self, key):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+def iter_chunks(value):
+    """
+    Chunks of a state value, either a chunk file reference or a plain list
+    of chunk dicts (CHUNK_STORE=state and chunks saved before chunk files)
+    """
+    if isinstance(value, dict) and value.get('format') == CHUNK_FORMAT:
+        return _counted(read_chunks(value['path']), value['chunks'], value['path'])
+    return iter(value)
+
+
+def _counted(chunks, expected, path):
+    # A file cut at a record boundary still parses, the reference has the count
+    count = 0
+    for chunk in chunks:
+        count += 1
+        yield chunk
+    if count != expected:
+        raise ValueError(f"Truncated chunk file: {path} has {count} of {expected} chunks")
@@ -0,0 +1,334 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+
+ENTRIES_FILE = 'entries.jsonl'
+SIGNATURES_FILE = 'signatures.u32'
+REMOVED_FILE = 'removed.json'
+MERGED_FILE = 'merged.jsonl'
+LOCK_FILE = '.lock'
+
+# Mersenne prime of the MinHash permutations (a * x + b) mod p
+_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    return ' '.join(_WORD.findall(text.lower()))
+
+
+def lsh_params(threshold, num_perm):
+    """
+    Picks the band count whose LSH S-curve midpoint (1/b)^(1/r) is the
+    highest one not above the similarity threshold: pairs at the threshold
+    almost always become candidates, and the signature comparison rejects
+    the extra ones
+    """
+    bands = [b for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [b for b in bands if (1 / b) ** (b / num_perm) <= threshold] or [num_perm]
+    best = min(below)
+    return best, num_perm // best
+
+
+class ChunkDeduplicator:
+    """
+    Drops chunks whose text repeats a chunk already in the corpus: exact
+    repeats by hash of the normalized text, near repeats by MinHash over
+    word shingles, with LSH banding to find candidates and the estimated
+    Jaccard similarity to confirm them.
+
+    The corpus is persisted in `directory`, so chunks are matched across the
+    files of a run and against every earlier run:
+
+        entries.jsonl   one canonical chunk per row: exact hash, source, page, chunkSet
+        signatures.u32  MinHash signature of every row
+        removed.json    rows of replaced or deleted files
+        merged.jsonl    dropped duplicates with their full chunk and the row they were merged into
+
+    Merged duplicates keep their source and page. When the file holding a
+    canonical chunk is removed, one of its duplicates is promoted back
+    into the corpus, so no text is lost.
+
+    Chunks of the file being ingested never match rows of the same source
+    from another chunk set, since those are about to be replaced. Rows of
+    its own chunk set left by an earlier attempt that failed part way are
+    dropped with `discard` before it starts again.
+
+    Arguments:
+        directory: Where the dedup files live
+        threshold: Minimum estimated Jaccard similarity to merge two chunks
+        num_perm: MinHash permutations
+        shingle_size: Words per shingle
+    """
+
+    def __init__(self, directory, threshold=0.85, num_perm=128, shingle_size=5, seed=1):
+        self.directory = directory
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.band_rows = lsh_params(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        # Drawn over the whole field; a * x wraps around 2^64 before the modulo,
+        # as in datasketch, which mixes better than keeping a * x exact
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+
+        self._entries = []
+        self._entries_end = 0
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._exact = {}
+        self._buckets = [{} for _ in range(self.bands)]
+        self._removed = set()
+        self._removed_mtime = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self):
+        with open(self._path(LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def signature(self, normalized):
+        words = normalized.split()
+        shingles = {
+            ' '.join(words[i:i + self.shingle_size])
+            for i in range(max(1, len(words) - self.shingle_size + 1))
+        }
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        permuted = (hashes[:, None] * self._a + self._b) % _PRIME
+        return (permuted.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.band_rows:(i + 1) * self.band_rows].tobytes() for i in range(self.bands)]
+
+    def _index(self, row, entry, signature):
+        self._exact.setdefault(entry['exact'], row)
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(key, []).append(row)
+
+    def _refresh(self):
+        """
+        Loads rows appended by other processes since the last call
+        """
+        path = self._path(ENTRIES_FILE)
+        if os.path.exists(path):
+            new = []
+            with open(path, 'rb') as f:
+                f.seek(self._entries_end)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    new.append(json.loads(line))
+                    self._entries_end += len(line)
+
+            if new:
+                rows = len(self._entries) + len(new)
+                signatures = np.fromfile(self._path(SIGNATURES_FILE), dtype=np.uint32)
+                signatures = signatures[:rows * self.num_perm].reshape(-1, self.num_perm)
+                for row, entry in enumerate(new, start=len(self._entries)):
+                    self._index(row, entry, signatures[row])
+                self._entries.extend(new)
+                self._signatures = signatures
+
+        removed_path = self._path(REMOVED_FILE)
+        mtime = os.stat(removed_path).st_mtime_ns if os.path.exists(removed_path) else None
+        if mtime != self._removed_mtime:
+            with open(removed_path) as f:
+                self._removed = set(json.load(f))
+            self._removed_mtime = mtime
+
+    def _match(self, exact, signature, source, chunk_set, pending):
+        """
+        Returns:
+            (canonical row, similarity) of the best live match, or (None, 0)
+        """
+        def live(row):
+            entry = self._entries[row]
+            return row not in self._removed and (entry['source'] != source or entry['chunkSet'] == chunk_set)
+
+        row = self._exact.get(exact)
+        if row is not None and live(row):
+            return row, 1.0
+
+        candidates = {row for band, key in zip(self._buckets, self._band_keys(signature)) for row in band.get(key, ())}
+        candidates = [row for row in candidates if live(row)]
+        if not candidates:
+            return None, 0
+
+        persisted = len(self._signatures)
+        signatures = np.stack([
+            self._signatures[row] if row < persisted else pending[row - persisted] for row in candidates
+        ])
+        similarities = (signatures == signature).mean(axis=1)
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.threshold:
+            return candidates[best], float(similarities[best])
+        return None, 0
+
+    def _append(self, entries, signatures):
+        """
+        Persists new rows after the rows loaded so far
+        """
+        rows = len(self._signatures)
+        # A writer that died between the two files leaves one of them longer
+        with open(self._path(SIGNATURES_FILE), 'ab') as f:
+            f.truncate(rows * self.num_perm * 4)
+            f.write(np.asarray(signatures, dtype=np.uint32).tobytes())
+        with open(self._path(ENTRIES_FILE), 'ab') as f:
+            f.truncate(self._entries_end)
+            for entry in entries:
+                f.write((json.dumps(entry) + '\n').encode('utf-8'))
+
+    def filter(self, chunks, chunk_set):
+        """
+        Removes the chunks that repeat the corpus (or an earlier chunk of
+        the same batch) and adds the rest to it
+
+        Arguments:
+            chunks: Chunk dicts of one batch
+            chunk_set: Chunk set the batch belongs to
+
+        Returns:
+            (unique chunks, {'chunks', 'exact', 'near', 'bytes_saved'})
+        """
+        unique = []
+        stats = {'chunks': len(chunks), 'exact': 0, 'near': 0, 'bytes_saved': 0}
+        new_entries, pending, merged = [], [], []
+
+        with self._locked():
+            self._refresh()
+            for chunk in chunks:
+                normalized = normalize(chunk['text'])
+                exact = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+                signature = self.signature(normalized)
+                source = chunk['metadata']['source']
+
+                row, similarity = self._match(exact, signature, source, chunk_set, pending)
+                if row is not None:
+                    stats['exact' if similarity == 1.0 else 'near'] += 1
+                    stats['bytes_saved'] += len(chunk['text'].encode('utf-8'))
+                    merged.append({'chunk': chunk, 'chunkSet': chunk_set, 'canonical': row, 'similarity': similarity})
+                    continue
+
+                # Indexed right away so later chunks of the batch match it
+                entry = {'exact': exact, 'source': source, 'page': chunk['metadata']['page'], 'chunkSet': chunk_set}
+                self._index(len(self._entries), entry, signature)
+                self._entries.append(entry)
+                new_entries.append(entry)
+                pending.append(signature)
+                unique.append(chunk)
+
+            if new_entries:
+                self._append(new_entries, pending)
+                self._entries_end = os.path.getsize(self._path(ENTRIES_FILE))
+                self._signatures = np.concatenate([self._signatures, np.asarray(pending, dtype=np.uint32)])
+            if merged:
+                with open(self._path(MERGED_FILE), 'a') as f:
+                    for item in merged:
+                        f.write(json.dumps(item) + '\n')
+
+        return unique, stats
+
+    def _read_merged(self):
+        path = self._path(MERGED_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.endswith('\n')]
+
+    def _write(self, name, lines=None, value=None):
+        temporary = self._path(name + '.tmp')
+        with open(temporary, 'w') as f:
+            if lines is not None:
+                f.writelines(json.dumps(line) + '\n' for line in lines)
+            else:
+                json.dump(value, f)
+        os.replace(temporary, self._path(name))
+
+    def remove(self, source, keep_chunk_set=None):
+        """
+        Removes the chunks of a source, except those of `keep_chunk_set`.
+        Duplicates that were merged into a removed chunk are matched again:
+        they are merged into another live chunk when one is similar enough,
+        otherwise the first of them becomes canonical again.
+
+        Returns:
+            {chunkSet: [promoted chunk dicts]}, to be saved again
+        """
+        return self._remove(lambda source_, chunk_set: source_ == source and chunk_set != keep_chunk_set)
+
+    def discard(self, source, chunk_set):
+        """
+        Removes the chunks of one chunk set of a source, e.g. the rows an
+        ingest that failed part way left behind, so a new attempt at the
+        same content doesn't match them and drop its own chunks
+
+        Returns:
+            {chunkSet: [promoted chunk dicts]}, as `remove`
+        """
+        return self._remove(lambda source_, chunk_set_: source_ == source and chunk_set_ == chunk_set)
+
+    def _remove(self, gone):
+        with self._locked():
+            self._refresh()
+            removed = {
+                row for row, entry in enumerate(self._entries)
+                if row not in self._removed and gone(entry['source'], entry['chunkSet'])
+            }
+            if not removed:
+                return {}
+            self._removed |= removed
+
+            merged = [
+                item for item in self._read_merged()
+                if not gone(item['chunk']['metadata']['source'], item['chunkSet'])
+            ]
+
+            new_entries, pending, kept, promoted = [], [], [], {}
+            for item in merged:
+                if item['canonical'] not in removed:
+                    kept.append(item)
+                    continue
+
+                chunk = item['chunk']
+                normalized = normalize(chunk['text'])
+                exact = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+                signature = self.signature(normalized)
+                row, similarity = self._match(exact, signature, chunk['metadata']['source'], item['chunkSet'], pending)
+                if row is not None:
+                    kept.append({**item, 'canonical': row, 'similarity': similarity})
+                    continue
+
+                entry = {
+                    'exact': exact,
+                    'source': chunk['metadata']['source'],
+                    'page': chunk['metadata']['page'],
+                    'chunkSet': item['chunkSet']
+                }
+                self._index(len(self._entries), entry, signature)
+                self._entries.append(entry)
+                new_entries.append(entry)
+                pending.append(signature)
+                promoted.setdefault(item['chunkSet'], []).append(chunk)
+
+            if new_entries:
+                self._append(new_entries, pending)
+                self._entries_end = os.path.getsize(self._path(ENTRIES_FILE))
+                self._signatures = np.concatenate([self._signatures, np.asarray(pending, dtype=np.uint32)])
+            self._write(REMOVED_FILE, value=sorted(self._removed))
+            self._removed_mtime = os.stat(self._path(REMOVED_FILE)).st_mtime_ns
+            self._write(MERGED_FILE, lines=kept)
+
+        return promoted
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import numpy as np
+import torch
+from transformers import AutoModel, AutoTokenizer
+
+
+class Embedder:
+    """
+    Sentence embeddings of a sentence-transformers model run through
+    transformers: mean pooling over the attention mask, then L2
+    normalization, which is what all-MiniLM-L6-v2 was trained with. The
+    vectors are unit length, so a dot product is the cosine similarity.
+
+    Arguments:
+        model_id: Hugging Face model id
+        batch_size: Texts per forward pass
+        max_length: Tokens kept per text; the model was trained on 256
+    """
+
+    def __init__(self, model_id, batch_size=32, max_length=256):
+        self.model_id = model_id
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.timings = {'load_ms': None}
+        self._model = None
+        self._tokenizer = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._model is None:
+                started = time.perf_counter()
+                self._tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+                model = AutoModel.from_pretrained(self.model_id)
+                model.eval()
+                self._model = model
+                self.timings['load_ms'] = (time.perf_counter() - started) * 1000
+        return self._tokenizer, self._model
+
+    @property
+    def dimensions(self):
+        _, model = self._load()
+        return model.config.hidden_size
+
+    def embed(self, texts):
+        """
+        Returns:
+            float32 array of shape (len(texts), dimensions) with unit-length rows
+        """
+        tokenizer, model = self._load()
+        vectors = np.empty((len(texts), model.config.hidden_size), dtype=np.float32)
+
+        with torch.inference_mode():
+            for start in range(0, len(texts), self.batch_size):
+                batch = texts[start:start + self.batch_size]
+                encoded = tokenizer(
+                    batch, padding=True, truncation=True, max_length=self.max_length, return_tensors='pt'
+                )
+                token_embeddings = model(**encoded).last_hidden_state
+                mask = encoded['attention_mask'].unsqueeze(-1).to(token_embeddings.dtype)
+                pooled = (token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+                vectors[start:start + len(batch)] = pooled.cpu().numpy()
+
+        return vectors
+
+
+_embedders = {}
+_embedders_lock = threading.Lock()
+
+
+def get_embedder(model_id, batch_size=32):
+    """
+    Process-wide Embedder per model, so the model is loaded once
+    """
+    with _embedders_lock:
+        embedder = _embedders.get(model_id)
+        if embedder is None:
+            embedder = _embedders[model_id] = Embedder(model_id, batch_size)
+        return embedder
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+from datetime import datetime, timezone
+
+MANIFEST_SCOPE = 'rag-workflow'
+MANIFEST_PREFIX = 'pdf_manifest'
+
+
+def manifest_key(folder):
+    return f"{MANIFEST_PREFIX}:{folder}"
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_fingerprint(settings):
+    """
+    Hash of the converter/chunker settings; changing any of them reprocesses every file
+    """
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def chunk_set_key(filename, content_hash, config):
+    """
+    Deterministic state key of a file's chunks: re-ingesting the same content
+    with the same settings lands on the same key instead of a new one
+    """
+    # Remove any non-alphanumeric characters and replace spaces with underscores
+    safe_name = re.sub(r'[^a-zA-Z0-9]', '_', os.path.splitext(filename)[0])
+    return f"chunks_{safe_name}_{content_hash[:12]}_{config[:8]}"
+
+
+def batch_key(chunk_set, index):
+    """
+    State key of one batch of a chunk set
+    """
+    return f"{chunk_set}_{index:04d}"
+
+
+def state_keys(entry):
+    """
+    State keys holding the chunks of a manifest entry
+    """
+    if 'batches' not in entry:
+        # Recorded before chunks were saved in batches
+        return [entry['chunkSet']]
+    return [batch_key(entry['chunkSet'], index) for index in range(entry['batches'])] + entry.get('extraKeys', [])
+
+
+class IngestManifest:
+    """
+    Records, per folder, which content was ingested with which settings:
+
+        pdf_manifest:<folder> -> {filePath: {hash, size, mtime, config, chunkSet, chunks, batches, extraKeys, processedAt}}
+
+    `plan()` compares a folder listing with it. Files with the same content
+    hash and settings are skipped, changed files are returned for
+    processing, and files that disappeared from the folder are returned for
+    tombstoning. Size and mtime are checked first, so unchanged files are
+    not re-hashed.
+
+    Arguments:
+        state: Motia state
+        settings: Converter/chunker settings that affect the chunks
+    """
+
+    def __init__(self, state, settings, scope=MANIFEST_SCOPE):
+        self.state = state
+        self.config = config_fingerprint(settings)
+        self.scope = scope
+        self._folders = {}
+
+    async def _entries(self, folder):
+        if folder not in self._folders:
+            self._folders[folder] = await self.state.get(self.scope, manifest_key(folder)) or {}
+        return self._folders[folder]
+
+    async def plan(self, files):
+        """
+        Arguments:
+            files: Folder listing as {filePath, fileName} dicts
+
+        Returns:
+            (files to process, number of unchanged files skipped, tombstoned entries)
+            Files to process carry their contentHash, chunkSet and, when
+            they replace earlier content, previousChunkSet and previousStateKeys.
+        """
+        to_process = []
+        skipped = 0
+        listed = {}
+
+        for file in files:
+            path = file['filePath']
+            folder = os.path.dirname(path)
+            paths = listed.setdefault(folder, set())
+            entry = (await self._entries(folder)).get(path)
+            previous = entry if entry and not entry.get('deleted') else None
+            current = previous if previous and previous['config'] == self.config else None
+
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # Deleted since the folder was listed: tombstoned below
+                continue
+            paths.add(path)
+            if current and current['size'] == stat.st_size and current['mtime'] == stat.st_mtime_ns:
+                skipped += 1
+                continue
+
+            try:
+                content_hash = file_hash(path)
+            except FileNotFoundError:
+                paths.discard(path)
+                continue
+            if current and current['hash'] == content_hash:
+                # Touched but not changed
+                current.update(size=stat.st_size, mtime=stat.st_mtime_ns)
+                await self._save(folder)
+                skipped += 1
+                continue
+
+            to_process.append({
+                **file,
+                'contentHash': content_hash,
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'chunkSet': chunk_set_key(file['fileName'], content_hash, self.config),
+                'previousChunkSet': previous['chunkSet'] if previous else None,
+                'previousStateKeys': state_keys(previous) if previous else []
+            })
+
+        removed = []
+        for folder, paths in listed.items():
+            entries = await self._entries(folder)
+            for path, entry in entries.items():
+                if path not in paths and not entry.get('deleted'):
+                    removed.append({'filePath': path, **entry})
+                    entry.update(deleted=True, deletedAt=datetime.now(timezone.utc).isoformat())
+            if removed:
+                await self._save(folder)
+
+        return to_process, skipped, removed
+
+    async def record(self, file, chunk_count, batch_count):
+        """
+        Marks a planned file as processed
+        """
+        folder = os.path.dirname(file['filePath'])
+        entries = await self._entries(folder)
+        entries[file['filePath']] = {
+            'fileName': file['fileName'],
+            'hash': file['contentHash'],
+            'size': file['size'],
+            'mtime': file['mtime'],
+            'config': self.config,
+            'chunkSet': file['chunkSet'],
+            'chunks': chunk_count,
+            'batches': batch_count,
+            'profile': file.get('profile'),
+            'processedAt': datetime.now(timezone.utc).isoformat()
+        }
+        await self._save(folder)
+
+    async def _save(self, folder):
+        await self.state.set(self.scope, manifest_key(folder), self._folders[folder])
+
+    async def add_state_keys(self, chunk_set, keys):
+        """
+        Tracks state keys saved for a file after it was processed, such as
+        chunks restored by deduplication, so they are removed with the file
+
+        Returns:
+            False when no loaded folder has a file with this chunk set
+        """
+        for folder, entries in self._folders.items():
+            for entry in entries.values():
+                if entry.get('chunkSet') == chunk_set and not entry.get('deleted'):
+                    entry['extraKeys'] = sorted(set(entry.get('extraKeys', [])) | set(keys))
+                    await self._save(folder)
+                    return True
+        return False
@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+
+import pypdfium2
+from docling.chunking import HybridChunker
+from docling.datamodel.base_models import InputFormat
+from docling.document_converter import DocumentConverter, PdfFormatOption
+from transformers import AutoTokenizer
+
+from .profiles import DEFAULT, pipeline_options
+
+
+def page_number(chunk):
+    """
+    First page a Docling chunk comes from, from the provenance of its document items
+    """
+    pages = [
+        prov.page_no
+        for item in getattr(getattr(chunk, 'meta', None), 'doc_items', None) or []
+        for prov in item.prov or []
+    ]
+    return min(pages) if pages else 1
+
+
+def page_count(file_path):
+    """
+    Number of pages of a PDF, read with pypdfium2 (a Docling dependency)
+    without converting it; None when the file can't be opened
+    """
+    try:
+        document = pypdfium2.PdfDocument(file_path)
+    except Exception:
+        return None
+    try:
+        return len(document)
+    finally:
+        document.close()
+
+
+def page_ranges(pages, shard_pages):
+    """
+    Splits a document into (first, last) page ranges of at most
+    `shard_pages` pages, 1-based and inclusive like Docling's page_range
+
+    Returns:
+        [None] (the whole document) when it is not larger than one shard
+    """
+    if not pages or not shard_pages or pages <= shard_pages:
+        return [None]
+    return [(first, min(first + shard_pages - 1, pages)) for first in range(1, pages + 1, shard_pages)]
+
+
+def chunk_records(chunks, filename):
+    """
+    Converts Docling chunks into the chunk dicts stored in state and loaded
+    into Weaviate, one at a time as the chunker produces them
+    """
+    title = os.path.splitext(filename)[0]
+    for chunk in chunks:
+        yield {
+            "text": chunk.text,
+            "title": title,
+            "metadata": {
+                "source": filename,
+                "page": page_number(chunk)
+            }
+        }
+
+
+def chunk_batches(records, max_chunks=0, max_bytes=0):
+    """
+    Groups chunk dicts into batches of at most `max_chunks` chunks and
+    about `max_bytes` bytes of text; 0 leaves that bound out
+
+    Yields:
+        Lists of chunk dicts; a single chunk larger than `max_bytes` gets a batch of its own
+    """
+    batch = []
+    size = 0
+    for record in records:
+        record_size = len(record['text'].encode('utf-8'))
+        if batch and max_bytes and size + record_size > max_bytes:
+            yield batch
+            batch, size = [], 0
+
+        batch.append(record)
+        size += record_size
+        if max_chunks and len(batch) >= max_chunks:
+            yield batch
+            batch, size = [], 0
+
+    if batch:
+        yield batch
+
+
+class PdfPipeline:
+    """
+    A Docling converter set up with the pipeline options of one profile
+    (see profiles.py) and a HybridChunker built for one embedding model
+    """
+
+    def __init__(self, model_id, max_tokens, profile=DEFAULT):
+        self.model_id = model_id
+        self.max_tokens = max_tokens
+        self.profile = profile
+        self.timings = {'tokenizer_ms': None, 'converter_ms': None, 'models_ms': None}
+
+        started = time.perf_counter()
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        self.chunker = HybridChunker(tokenizer=tokenizer, max_tokens=max_tokens)
+        self.timings['tokenizer_ms'] = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        self.converter = DocumentConverter(format_options={
+            InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options(profile))
+        })
+        self.timings['converter_ms'] = (time.perf_counter() - started) * 1000
+
+    def initialize(self):
+        """
+        Loads the layout and OCR models now instead of on the first conversion
+        """
+        started = time.perf_counter()
+        self.converter.initialize_pipeline(InputFormat.PDF)
+        self.timings['models_ms'] = (time.perf_counter() - started) * 1000
+
+    def convert(self, file_path, page_range=None):
+        """
+        Converts a PDF, or only the pages of `page_range`; page numbers in
+        the document stay those of the whole PDF
+        """
+        if page_range is None:
+            return self.converter.convert(file_path).document
+        return self.converter.convert(file_path, page_range=page_range).document
+
+    def chunk(self, document):
+        return self.chunker.chunk(dl_doc=document)
+
+
+class PipelineCache:
+    """
+    Process-wide cache of PdfPipelines keyed by embedding model, chunker
+    settings and profile. Building a pipeline loads a tokenizer and Docling's layout and
+    OCR models, so every file and event in the process shares one instance
+    per key. `get()` is thread-safe; only the first caller for a key pays
+    the load time, which is recorded for reporting.
+    """
+
+    def __init__(self):
+        self._pipelines = {}
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'loads': 0}
+
+    def get(self, model_id, max_tokens, profile=DEFAULT):
+        key = (model_id, max_tokens, profile)
+        pipeline = self._pipelines.get(key)
+        if pipeline is not None:
+            self._counters['hits'] += 1
+            return pipeline
+
+        with self._lock:
+            pipeline = self._pipelines.get(key)
+            if pipeline is None:
+                pipeline = PdfPipeline(model_id, max_tokens, profile)
+                pipeline.initialize()
+                self._pipelines[key] = pipeline
+                self._counters['loads'] += 1
+            else:
+                self._counters['hits'] += 1
+        return pipeline
+
+    def warm_up(self, model_id, max_tokens, profile=DEFAULT):
+        """
+        Builds the pipeline for a key on a background thread, so the first
+        event does not wait for the model load
+        """
+        thread = threading.Thread(
+            target=self.get, args=(model_id, max_tokens, profile), name='pdf-pipeline-warm-up', daemon=True
+        )
+        thread.start()
+        return thread
+
+    def stats(self):
+        return {
+            **self._counters,
+            'pipelines': {
+                f"{model_id}:{max_tokens}:{profile}": pipeline.timings
+                for (model_id, max_tokens, profile), pipeline in self._pipelines.items()
+            }
+        }
+
+
+# Shared by every step module that imports pdf_ingest in this process
+pipelines = PipelineCache()
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .pipeline import chunk_records, pipelines
+from .profiles import DEFAULT
+
+# Set in each worker by init_worker
+_worker_settings = {}
+
+
+def init_worker(model_id, max_tokens, profile):
+    """
+    Pool initializer: builds the worker's own converter and chunker up front,
+    for the profile most files are expected to use
+    """
+    _worker_settings.update(model_id=model_id, max_tokens=max_tokens)
+    pipelines.get(model_id, max_tokens, profile)
+
+
+def convert_in_worker(file_path, filename, page_range=None, profile=DEFAULT):
+    """
+    Converts and chunks one PDF, or one page range of it, inside a pool worker
+
+    Returns:
+        (chunk dicts, {'convert_ms', 'chunk_ms', 'pages'})
+    """
+    pipeline = pipelines.get(_worker_settings['model_id'], _worker_settings['max_tokens'], profile)
+
+    started = time.perf_counter()
+    document = pipeline.convert(file_path, page_range)
+    converted = time.perf_counter()
+    chunks = list(chunk_records(pipeline.chunk(document), filename))
+    finished = time.perf_counter()
+
+    return chunks, {
+        'convert_ms': (converted - started) * 1000,
+        'chunk_ms': (finished - converted) * 1000,
+        'pages': len(document.pages)
+    }
+
+
+class IngestPool:
+    """
+    Converts PDFs on a pool of worker processes, each holding its own warmed
+    Docling converter and chunker. The pool outlives events, so workers are
+    only warmed once.
+
+    At most `workers` files are in flight and results are yielded as they
+    finish. When a worker dies (segfault, OOM kill) every file in flight
+    fails with BrokenProcessPool; the pool is replaced and those files are
+    retried one at a time after the rest, so only the file that actually
+    crashes the worker is reported as failed.
+
+    Arguments:
+        workers: Number of worker processes
+        model_id: Embedding model whose tokenizer sizes the chunks
+        max_tokens: Maximum tokens per chunk
+        profile: Profile whose pipeline the workers build up front
+    """
+
+    def __init__(self, workers, model_id, max_tokens, profile=DEFAULT):
+        self.workers = workers
+        self.model_id = model_id
+        self.max_tokens = max_tokens
+        self.profile = profile
+        self._executor = None
+        self._counters = {'files': 0, 'failed': 0, 'crashes': 0}
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker,
+                initargs=(self.model_id, self.max_tokens, self.profile)
+            )
+        return self._executor
+
+    def _replace_pool(self):
+        self._counters['crashes'] += 1
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    async def process(self, files):
+        """
+        Converts files, or page ranges of files, concurrently
+
+        Arguments:
+            files: List of {filePath, fileName} dicts, with a (first, last)
+                pageRange to convert only those pages and the profile to
+                convert them with
+
+        Yields:
+            (file, chunks, timings, error) in completion order; chunks and
+            timings are None when error is set
+        """
+        loop = asyncio.get_running_loop()
+        pending = deque(files)
+        suspects = deque()
+        running = {}
+
+        while pending or suspects or running:
+            # Suspects of a crash run alone, once everything else is done
+            isolated = not pending
+            limit = 1 if isolated else self.workers
+            queue = suspects if isolated else pending
+            while queue and len(running) < limit:
+                file = queue.popleft()
+                future = loop.run_in_executor(
+                    self._pool(), convert_in_worker,
+                    file['filePath'], file['fileName'], file.get('pageRange'), file.get('profile', DEFAULT)
+                )
+                running[future] = (file, isolated)
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+            crashed = False
+            for future in done:
+                file, was_isolated = running.pop(future)
+                error = future.exception()
+                if isinstance(error, BrokenProcessPool):
+                    crashed = True
+                    if not was_isolated:
+                        suspects.append(file)
+                        continue
+
+                self._counters['files'] += 1
+                if error is not None:
+                    self._counters['failed'] += 1
+                    yield file, None, None, error
+                else:
+                    chunks, timings = future.result()
+                    yield file, chunks, timings, None
+
+            if crashed:
+                # Everything still running on the broken pool fails too
+                for future, (file, _) in list(running.items()):
+                    try:
+                        await future
+                    except BrokenProcessPool:
+                        del running[future]
+                        suspects.append(file)
+                    except Exception:
+                        # Handled with the other results on the next pass
+                        pass
+                self._replace_pool()
+
+    def stats(self):
+        return {'workers': self.workers, **self._counters}
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
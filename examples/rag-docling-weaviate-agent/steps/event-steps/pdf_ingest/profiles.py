@@ -0,0 +1,134 @@
+import pypdfium2
+from docling.datamodel.pipeline_options import PdfPipelineOptions, TableFormerMode
+
+AUTO = 'auto'
+DEFAULT = 'default'
+
+# Pages with at least this many characters in their text layer count as text-native
+MIN_TEXT_CHARS = 32
+
+
+def _fast_text():
+    # Text straight from the PDF's text layer, layout analysis only
+    return PdfPipelineOptions(do_ocr=False, do_table_structure=False)
+
+
+def _tables():
+    options = PdfPipelineOptions(do_ocr=False, do_table_structure=True)
+    options.table_structure_options.mode = TableFormerMode.ACCURATE
+    return options
+
+
+def _full_ocr():
+    options = PdfPipelineOptions(do_ocr=True, do_table_structure=True)
+    options.ocr_options.force_full_page_ocr = True
+    return options
+
+
+def _default():
+    # Docling's defaults: OCR of bitmap areas and the table structure model
+    return PdfPipelineOptions()
+
+
+PROFILES = {
+    'fast-text': _fast_text,
+    'tables': _tables,
+    'full-ocr': _full_ocr,
+    DEFAULT: _default
+}
+
+
+def pipeline_options(profile):
+    """
+    Docling PDF pipeline options of a profile
+    """
+    return PROFILES[profile]()
+
+
+def check_profile(profile):
+    """
+    Raises ValueError unless `profile` is a profile name or 'auto'
+    """
+    if profile != AUTO and profile not in PROFILES:
+        raise ValueError(f"Unknown PDF profile {profile!r}, expected {AUTO} or one of {', '.join(PROFILES)}")
+    return profile
+
+
+def sample_pages(pages, count):
+    """
+    Up to `count` page indexes spread evenly over the document, first page included
+    """
+    if pages <= count:
+        return list(range(pages))
+    return sorted({round(i * (pages - 1) / (count - 1)) for i in range(count)}) if count > 1 else [0]
+
+
+def text_layer(file_path, samples=8):
+    """
+    Samples pages of a PDF with pypdfium2 and counts those with an
+    extractable text layer, without converting anything
+
+    Returns:
+        (pages sampled, pages with text); (0, 0) when the file can't be opened
+    """
+    try:
+        document = pypdfium2.PdfDocument(file_path)
+    except Exception:
+        return 0, 0
+    try:
+        indexes = sample_pages(len(document), samples)
+        with_text = 0
+        for index in indexes:
+            page = document[index]
+            textpage = page.get_textpage()
+            try:
+                if textpage.count_chars() >= MIN_TEXT_CHARS:
+                    with_text += 1
+            finally:
+                textpage.close()
+                page.close()
+        return len(indexes), with_text
+    finally:
+        document.close()
+
+
+def detect_profile(file_path, samples=8):
+    """
+    Picks a profile from the text layer of a PDF: fast-text when every
+    sampled page has text, full-ocr when none has (scans), Docling's
+    defaults for a mix or a file that can't be sampled
+    """
+    sampled, with_text = text_layer(file_path, samples)
+    if not sampled:
+        return DEFAULT
+    if with_text == sampled:
+        return 'fast-text'
+    if with_text == 0:
+        return 'full-ocr'
+    return DEFAULT
+
+
+class ProfileStats:
+    """
+    Pages converted and conversion time per profile. Times are summed over
+    conversions, so with workers pagesPerSec is the rate of one worker.
+    """
+
+    def __init__(self):
+        self._totals = {}
+
+    def add(self, profile, pages, seconds):
+        totals = self._totals.setdefault(profile, {'conversions': 0, 'pages': 0, 'seconds': 0.0})
+        totals['conversions'] += 1
+        totals['pages'] += pages
+        totals['seconds'] += seconds
+
+    def report(self):
+        return {
+            profile: {
+                **totals,
+                'seconds': round(totals['seconds'], 3),
+                'pagesPerSec': round(totals['pages'] / totals['seconds'], 2) if totals['seconds'] else None
+            }
+            for profile, totals in self._totals.items()
+        }
@@ -0,0 +1,298 @@
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+VECTORS_FILE = 'vectors.f32'
+METADATA_FILE = 'chunks.jsonl'
+REMOVED_FILE = 'removed.json'
+BATCHES_FILE = 'batches.jsonl'
+IVF_FILE = 'ivf.npz'
+LOCK_FILE = '.lock'
+
+
+class LocalVectorIndex:
+    """
+    On-disk vector index standing in for the Weaviate 'Books' collection:
+
+        vectors.f32   row-major float32 matrix of unit-length embeddings, memory-mapped for search
+        chunks.jsonl  one chunk per row: text, title, source, page, chunkSet
+        removed.json  rows of replaced or deleted files
+        batches.jsonl rows added per state key, so a batch loaded again replaces its rows
+        ivf.npz       optional inverted file index (k-means centroids and their rows)
+
+    Rows are only ever appended, under an exclusive file lock, so several
+    step processes can add to the same index. Searches re-map the files
+    when they grew.
+
+    Search is an exact dot product over every row unless an IVF index was
+    built, in which case only the rows of the `ivf_probe` nearest centroids,
+    plus rows added since the build, are scored.
+
+    Arguments:
+        directory: Where the index files live
+        dimensions: Embedding size
+        ivf_probe: Centroids searched per query when an IVF index exists
+    """
+
+    def __init__(self, directory, dimensions, ivf_probe=8):
+        self.directory = directory
+        self.dimensions = dimensions
+        self.ivf_probe = ivf_probe
+        self._row_bytes = dimensions * 4
+        self._offsets = []
+        self._metadata_end = 0
+        self._matrix = None
+        self._removed = set()
+        self._removed_mtime = None
+        self._ivf = None
+        self._ivf_mtime = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self):
+        with open(self._path(LOCK_FILE), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _scan_metadata(self):
+        """
+        Indexes the byte offset of rows appended since the last scan
+        """
+        path = self._path(METADATA_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            f.seek(self._metadata_end)
+            position = self._metadata_end
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Partially written row
+                    break
+                self._offsets.append(position)
+                position += len(line)
+            self._metadata_end = position
+
+    def _vector_rows(self):
+        path = self._path(VECTORS_FILE)
+        return os.path.getsize(path) // self._row_bytes if os.path.exists(path) else 0
+
+    @property
+    def rows(self):
+        return min(len(self._offsets), self._vector_rows())
+
+    def _refresh(self):
+        self._scan_metadata()
+        rows = self.rows
+        if self._matrix is None or len(self._matrix) != rows:
+            self._matrix = (
+                np.memmap(self._path(VECTORS_FILE), dtype=np.float32, mode='r', shape=(rows, self.dimensions))
+                if rows else np.empty((0, self.dimensions), dtype=np.float32)
+            )
+
+        removed_path = self._path(REMOVED_FILE)
+        mtime = os.stat(removed_path).st_mtime_ns if os.path.exists(removed_path) else None
+        if mtime != self._removed_mtime:
+            with open(removed_path) as f:
+                self._removed = set(json.load(f))
+            self._removed_mtime = mtime
+
+        ivf_path = self._path(IVF_FILE)
+        mtime = os.stat(ivf_path).st_mtime_ns if os.path.exists(ivf_path) else None
+        if mtime != self._ivf_mtime:
+            self._ivf = dict(np.load(ivf_path)) if mtime else None
+            self._ivf_mtime = mtime
+
+    def add(self, vectors, records, chunk_set, batch=None):
+        """
+        Appends the embeddings of a batch of chunk dicts
+
+        Arguments:
+            vectors: float32 array, one unit-length row per record
+            records: Chunk dicts as saved by process-pdfs
+            chunk_set: Chunk set the batch belongs to
+            batch: Optional state key of the batch, for remove_batch
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._locked():
+            self._scan_metadata()
+            # A writer that died between the two files leaves one of them longer
+            rows = self.rows
+            with open(self._path(VECTORS_FILE), 'ab') as f:
+                f.truncate(rows * self._row_bytes)
+                f.write(vectors.tobytes())
+            with open(self._path(METADATA_FILE), 'ab') as f:
+                if len(self._offsets) > rows:
+                    self._metadata_end = self._offsets[rows]
+                    f.truncate(self._metadata_end)
+                    del self._offsets[rows:]
+                for record in records:
+                    f.write((json.dumps({
+                        'text': record['text'],
+                        'title': record['title'],
+                        'source': record['metadata']['source'],
+                        'page': record['metadata']['page'],
+                        'chunkSet': chunk_set
+                    }) + '\n').encode('utf-8'))
+            if batch is not None:
+                with open(self._path(BATCHES_FILE), 'a') as f:
+                    f.write(json.dumps({'batch': batch, 'start': rows, 'rows': len(records)}) + '\n')
+
+    def remove_batch(self, batch):
+        """
+        Marks the rows added for a state key as removed, before it is loaded
+        again (e.g. a file processed again after failing part way)
+
+        Returns:
+            Number of rows removed
+        """
+        with self._locked():
+            self._refresh()
+            path = self._path(BATCHES_FILE)
+            if not os.path.exists(path):
+                return 0
+            removed = set(self._removed)
+            with open(path) as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    entry = json.loads(line)
+                    if entry['batch'] == batch:
+                        removed.update(range(entry['start'], min(entry['start'] + entry['rows'], self.rows)))
+
+            count = len(removed) - len(self._removed)
+            if count:
+                self._write_json(REMOVED_FILE, sorted(removed))
+            return count
+
+    def remove(self, source, keep_chunk_set=None):
+        """
+        Marks the rows of a source as removed, except those of `keep_chunk_set`
+
+        Returns:
+            Number of rows removed
+        """
+        with self._locked():
+            self._refresh()
+            removed = set(self._removed)
+            with open(self._path(METADATA_FILE), 'rb') as f:
+                for row, line in enumerate(f):
+                    if row >= self.rows:
+                        break
+                    chunk = json.loads(line)
+                    if chunk['source'] == source and chunk['chunkSet'] != keep_chunk_set:
+                        removed.add(row)
+
+            count = len(removed) - len(self._removed)
+            if count:
+                self._write_json(REMOVED_FILE, sorted(removed))
+            return count
+
+    def _write_json(self, name, value):
+        temporary = self._path(name + '.tmp')
+        with open(temporary, 'w') as f:
+            json.dump(value, f)
+        os.replace(temporary, self._path(name))
+
+    def _chunk(self, row):
+        with open(self._path(METADATA_FILE), 'rb') as f:
+            f.seek(self._offsets[row])
+            return json.loads(f.readline())
+
+    def _candidates(self, query):
+        """
+        Rows scored for a query: all of them, or the probed IVF lists plus
+        the rows added after the IVF index was built
+        """
+        if self._ivf is None:
+            return None
+        centroids = self._ivf['centroids']
+        probe = min(self.ivf_probe, len(centroids))
+        nearest = np.argpartition(-(centroids @ query), probe - 1)[:probe]
+        offsets, order = self._ivf['offsets'], self._ivf['order']
+        lists = [order[offsets[c]:offsets[c + 1]] for c in nearest]
+        built_rows = int(self._ivf['rows'])
+        lists.append(np.arange(built_rows, len(self._matrix)))
+        return np.concatenate(lists)
+
+    def search(self, query, k=5):
+        """
+        Arguments:
+            query: Unit-length float32 query embedding
+            k: Number of chunks returned
+
+        Returns:
+            Up to k (chunk dict, cosine similarity) pairs, best first
+        """
+        self._refresh()
+        if not len(self._matrix):
+            return []
+
+        query = np.asarray(query, dtype=np.float32)
+        candidates = self._candidates(query)
+        if candidates is None:
+            candidates = np.arange(len(self._matrix))
+            scores = self._matrix @ query
+        else:
+            scores = self._matrix[candidates] @ query
+
+        if self._removed:
+            scores[np.isin(candidates, list(self._removed))] = -np.inf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (self._chunk(int(candidates[i])), float(scores[i]))
+            for i in top if np.isfinite(scores[i])
+        ]
+
+    def build_ivf(self, lists, iterations=10, sample_size=65536, seed=0):
+        """
+        Clusters the rows with spherical k-means and stores, per centroid,
+        the rows closest to it. Rows added later are searched exhaustively
+        until the next build.
+        """
+        with self._locked():
+            self._refresh()
+            rows = len(self._matrix)
+            lists = min(lists, rows)
+            rng = np.random.default_rng(seed)
+            sample = np.asarray(self._matrix[np.sort(rng.choice(rows, min(sample_size, rows), replace=False))])
+            centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(lists):
+                    members = sample[assignment == c]
+                    if len(members):
+                        centroid = members.sum(axis=0)
+                        centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+
+            assignment = np.empty(rows, dtype=np.int32)
+            for start in range(0, rows, sample_size):
+                block = np.asarray(self._matrix[start:start + sample_size])
+                assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+            order = np.argsort(assignment, kind='stable')
+            offsets = np.searchsorted(assignment[order], np.arange(lists + 1))
+            temporary = self._path('ivf.tmp.npz')
+            np.savez(temporary, centroids=centroids, order=order, offsets=offsets, rows=rows)
+            os.replace(temporary, self._path(IVF_FILE))
+            return {'lists': lists, 'rows': rows}
+
+    def stats(self):
+        self._refresh()
+        return {
+            'rows': len(self._matrix),
+            'removed': len(self._removed),
+            'ivf_rows': int(self._ivf['rows']) if self._ivf is not None else 0
+        }
@@ -1,43 +1,162 @@
+import hashlib
 import os
+import sys
 import time
-import re
+from collections import Counter
+from importlib import metadata
 from typing import Dict, Any
 
-from docling.document_converter import DocumentConverter
-from docling.chunking import HybridChunker
-from transformers import AutoTokenizer
+sys.path.append(os.path.dirname(os.path.realpath(__file__)))
+
+from pdf_ingest.chunk_store import ChunkStore
+from pdf_ingest.dedup import ChunkDeduplicator
+from pdf_ingest.manifest import IngestManifest, batch_key, state_keys
+from pdf_ingest.pipeline import chunk_batches, chunk_records, page_count, page_ranges, pipelines
+from pdf_ingest.pool import IngestPool
+from pdf_ingest.profiles import AUTO, ProfileStats, check_profile, detect_profile
+from step_metrics import metrics
 
 # Set environment variable to avoid tokenizer parallelism warning
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
+# Tokenizer of the embedding model, which bounds the chunk size
+EMBED_MODEL_ID = os.environ.get("EMBED_MODEL_ID", "sentence-transformers/all-MiniLM-L6-v2")
+MAX_TOKENS = int(os.environ.get("CHUNK_MAX_TOKENS", "1024"))
+
+# Docling pipeline profile: fast-text (text layer only, no OCR or table
+# model), tables, full-ocr or default (Docling's defaults). PDF_PROFILE=auto
+# samples the text layer of each file: fast-text when every sampled page has
+# text, full-ocr when none has, default for a mix. Events can pick their own
+# with a `profile` field.
+PDF_PROFILE = check_profile(os.environ.get("PDF_PROFILE", AUTO).lower())
+PDF_PROFILE_SAMPLE_PAGES = int(os.environ.get("PDF_PROFILE_SAMPLE_PAGES", "8"))
+# Pipeline built ahead of the first event; most PDFs are text-native
+WARM_PROFILE = "fast-text" if PDF_PROFILE == AUTO else PDF_PROFILE
+
+# The converter, tokenizer and chunker are built once per process and profile
+# and reused across files and events. PDF_WARMUP=true builds them in the
+# background as soon as the step is loaded.
+if os.environ.get("PDF_WARMUP", "false").lower() == "true":
+    pipelines.warm_up(EMBED_MODEL_ID, MAX_TOKENS, WARM_PROFILE)
+
+# PDF_WORKERS > 0 converts files on a pool of worker processes, each with its
+# own warmed pipeline; 0 converts them one after another in this process
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "0"))
+ingest_pool = IngestPool(PDF_WORKERS, EMBED_MODEL_ID, MAX_TOKENS, WARM_PROFILE) if PDF_WORKERS > 0 else None
+
+# PDFs longer than PDF_SHARD_PAGES pages are converted in page ranges of that
+# size: memory is bounded by the shard, the first chunks are saved as soon as
+# the first shard is done, and with PDF_WORKERS the shards of one PDF are
+# converted concurrently. 0 converts every PDF as a whole.
+PDF_SHARD_PAGES = int(os.environ.get("PDF_SHARD_PAGES", "0"))
+
+# Chunks are saved and emitted in batches of at most CHUNK_BATCH_SIZE chunks
+# and about CHUNK_BATCH_BYTES bytes of text, each under its own state key, so
+# Weaviate loading starts while the rest of the file is still being chunked.
+# 0 removes a bound; both 0 saves each file as a single batch.
+CHUNK_BATCH_SIZE = int(os.environ.get("CHUNK_BATCH_SIZE", "100"))
+CHUNK_BATCH_BYTES = int(os.environ.get("CHUNK_BATCH_BYTES", "1048576"))
+
+# CHUNK_STORE=state stores each chunk list in state; 'file' writes each batch to
+# a compact chunk file in CHUNK_STORE_DIR and keeps only a reference to it in state
+CHUNK_STORE = os.environ.get("CHUNK_STORE", "state").lower()
+CHUNK_STORE_DIR = os.environ.get("CHUNK_STORE_DIR", ".motia/chunk-store")
+chunk_store = ChunkStore(CHUNK_STORE_DIR) if CHUNK_STORE == "file" else None
+
+# CHUNK_DEDUP=true drops chunks that repeat text already in the corpus (exact
+# or with an estimated Jaccard similarity of at least CHUNK_DEDUP_THRESHOLD),
+# across the files of a run and against every earlier run
+CHUNK_DEDUP = os.environ.get("CHUNK_DEDUP", "false").lower() == "true"
+CHUNK_DEDUP_THRESHOLD = float(os.environ.get("CHUNK_DEDUP_THRESHOLD", "0.85"))
+CHUNK_DEDUP_DIR = os.environ.get("CHUNK_DEDUP_DIR", ".motia/chunk-dedup")
+dedup = ChunkDeduplicator(CHUNK_DEDUP_DIR, CHUNK_DEDUP_THRESHOLD) if CHUNK_DEDUP else None
+
+# Everything that changes the chunks of a file: the ingest manifest
+# reprocesses every file when one of these changes
+INGEST_SETTINGS = {
+    "embedModelId": EMBED_MODEL_ID,
+    "maxTokens": MAX_TOKENS,
+    "docling": metadata.version("docling"),
+    "dedupThreshold": CHUNK_DEDUP_THRESHOLD if CHUNK_DEDUP else None,
+    # Chunks never span two shards
+    "shardPages": PDF_SHARD_PAGES
+}
+
 config = {
     "type": "event",
     "name": "process-pdfs",
     "flows": ["rag-workflow"],
     "subscribes": ["rag.process.pdfs"],
-    "emits": [{ "topic": "rag.chunks.ready", "label": "PDF chunks ready" }],
+    "emits": [
+        { "topic": "rag.chunks.ready", "label": "PDF chunks ready" },
+        { "topic": "rag.chunks.removed", "label": "PDF chunks replaced or deleted" }
+    ],
     "input": None # No schema validation for Python right now
-    # input.stateKey: str
+    # input.files: [{ filePath, fileName }], input.profile?: str
 }
 
+@metrics.instrument('process-pdfs')
 async def handler(input, context):
-    for file in input['files']:
+    profile = check_profile(input.get('profile') or PDF_PROFILE)
+
+    # Only files whose content or ingest settings changed since the last run
+    # are converted; files gone from the folder are tombstoned
+    manifest = IngestManifest(context.state, {**INGEST_SETTINGS, "profile": profile})
+    with metrics.span('manifest'):
+        files, unchanged, removed = await manifest.plan(input['files'])
+    context.logger.info("PDF ingest plan", {
+        'process': len(files),
+        'unchanged': unchanged,
+        'removed': len(removed)
+    })
+
+    for entry in removed:
+        await remove_chunks(entry, context, manifest)
+
+    if not files:
+        return
+
+    with metrics.span('profile'):
+        for file in files:
+            file['profile'] = detect_profile(file['filePath'], PDF_PROFILE_SAMPLE_PAGES) if profile == AUTO else profile
+    context.logger.info("PDF profiles", dict(Counter(file['profile'] for file in files)))
+
+    dedup_totals = Counter()
+    profile_stats = ProfileStats()
+    try:
+        if ingest_pool is not None:
+            await process_in_pool(files, context, manifest, dedup_totals, profile_stats)
+        else:
+            await process_in_process(files, context, manifest, dedup_totals, profile_stats)
+    finally:
+        report_profiles(profile_stats, context)
+        if dedup is not None:
+            report_dedup(dedup_totals, context)
+
+
+def shards(file):
+    """
+    Page ranges a file is converted in, [None] for the whole file
+    """
+    if not PDF_SHARD_PAGES:
+        return [None]
+    return page_ranges(page_count(file['filePath']), PDF_SHARD_PAGES)
+
+
+async def process_in_process(files, context, manifest, dedup_totals, profile_stats):
+    """
+    Converts the files one after another in this process, stopping at the
+    first failure
+    """
+    for file in files:
         # Get file info from input
         file_path = file['filePath']
         filename = file['fileName']
-        
-        context.logger.info(f"Processing PDF file: {filename}")
 
-        # Initialize Docling converter and chunker
-        converter = DocumentConverter()
-        EMBED_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
-        MAX_TOKENS = 1024
+        with metrics.span('pipeline_load'):
+            pipeline = pipelines.get(EMBED_MODEL_ID, MAX_TOKENS, file['profile'])
 
-        tokenizer = AutoTokenizer.from_pretrained(EMBED_MODEL_ID)
-        chunker = HybridChunker(
-            tokenizer=tokenizer,
-            max_tokens=MAX_TOKENS,
-        )
+        context.logger.info(f"Processing PDF file: {filename}", {'profile': file['profile']})
 
         # In case of the warning:
         #  Token indices sequence length is longer than the specified maximum sequence length for this model (554 > 512).
@@ -45,42 +164,235 @@ async def handler(input, context):
         #  https://docling-project.github.io/docling/faq/#hybridchunker-triggers-warning-token-indices-sequence-length-is-longer-than-the-specified-maximum-sequence-length-for-this-model
 
         # Process the PDF
-        chunks = []
         try:
-            # Convert PDF to Docling document
-            result = converter.convert(file_path)
-            doc = result.document
-
-            # Get chunks using the chunker
-            for chunk in chunker.chunk(dl_doc=doc):
-                chunks.append({
-                    "text": chunk.text,
-                    "title": os.path.splitext(filename)[0],
-                    "metadata": {
-                        "source": filename,
-                        "page": chunk.page_number if hasattr(chunk, 'page_number') else 1
-                    }
-                })
+            writer = ChunkWriter(file, context, manifest, dedup_totals)
+            for page_range in shards(file):
+                # Convert PDF (or one page range of it) to Docling document
+                started = time.perf_counter()
+                with metrics.span('convert'):
+                    doc = pipeline.convert(file_path, page_range)
+                profile_stats.add(file['profile'], len(doc.pages), time.perf_counter() - started)
+
+                # Chunks are saved batch by batch as the chunker produces them
+                await writer.write(chunk_records(pipeline.chunk(doc), filename))
+            await writer.finish()
 
         except Exception as e:
             context.logger.error(f"Error processing {filename}: {str(e)}")
             raise e
 
-        context.logger.info(f"Processed {len(chunks)} chunks from PDF")
+    context.logger.info("PDF pipeline stats", pipelines.stats())
+
+
+async def process_in_pool(files, context, manifest, dedup_totals, profile_stats):
+    """
+    Converts the files, or the page ranges of large files, on the worker
+    pool. Shards finish in any order and are saved in page order, each as
+    soon as the shards before it are saved. A file that fails is logged and
+    skipped, the others still go through.
+    """
+    jobs = []
+    for file in files:
+        ranges = shards(file)
+        jobs.extend({**file, 'pageRange': page_range, 'shard': index, 'shards': len(ranges)}
+                    for index, page_range in enumerate(ranges))
+
+    writers = {}
+    finished_shards = {}
+    failed = []
+    async for job, chunks, timings, error in ingest_pool.process(jobs):
+        file_path = job['filePath']
+        filename = job['fileName']
+        if filename in failed:
+            continue
+        if error is not None:
+            context.logger.error(f"Error processing {filename}: {str(error)}")
+            failed.append(filename)
+            writers.pop(file_path, None)
+            finished_shards.pop(file_path, None)
+            continue
 
-        # Generate a unique state key using the filename (without extension) and timestamp
-        base_name = os.path.splitext(filename)[0]
-        # Remove any non-alphanumeric characters and replace spaces with underscores
-        safe_name = re.sub(r'[^a-zA-Z0-9]', '_', base_name)
-        chunks_state_key = f"chunks_{safe_name}_{int(time.time())}"
+        context.logger.info(f"Converted {filename} in a worker", {
+            **timings,
+            'pageRange': job['pageRange'],
+            'profile': job['profile']
+        })
+        profile_stats.add(job['profile'], timings['pages'], timings['convert_ms'] / 1000)
+        writer = writers.setdefault(file_path, ChunkWriter(job, context, manifest, dedup_totals))
+        finished = finished_shards.setdefault(file_path, {})
+        finished[job['shard']] = chunks
+        while writer.shards_written in finished:
+            await writer.write(finished.pop(writer.shards_written))
 
-        # Save chunks to state
-        await context.state.set('rag-workflow', chunks_state_key, chunks)
-        context.logger.info(f"Saved chunks to state with key: {chunks_state_key}")
+        if writer.shards_written == job['shards']:
+            await writer.finish()
+            del writers[file_path], finished_shards[file_path]
 
+    context.logger.info("PDF pool stats", ingest_pool.stats())
+    if failed:
+        metrics.mark_error()
+        context.logger.error(f"{len(failed)} of {len(files)} PDFs failed", {'files': failed})
+
+
+class ChunkWriter:
+    """
+    Saves the chunks of one file in batches as they come, each under its own
+    state key and announced with its own rag.chunks.ready, then records the
+    file in the manifest once all of them are saved
+
+    Arguments:
+        file: Planned file from the manifest
+        dedup_totals: Counter the dedup stats of the file are added to
+    """
+
+    def __init__(self, file, context, manifest, dedup_totals):
+        self.file = file
+        self.context = context
+        self.manifest = manifest
+        self.dedup_totals = dedup_totals
+        # Keys are derived from the file's content hash and the ingest
+        # settings, so re-ingesting the same file never duplicates its chunks
+        self.chunk_set = file['chunkSet']
+        self.batch_count = 0
+        self.chunk_count = 0
+        self.shards_written = 0
+
+    async def write(self, chunks):
+        """
+        Arguments:
+            chunks: Chunk dicts of the next shard, either a list or a
+                generator pulling from the chunker
+        """
+        if dedup is not None and self.shards_written == 0:
+            # The chunk set isn't in the manifest yet, so any rows it has
+            # come from an attempt that failed part way
+            await save_promoted(dedup.discard(self.file['fileName'], self.chunk_set), self.context, self.manifest)
+
+        batches = chunk_batches(chunks, CHUNK_BATCH_SIZE, CHUNK_BATCH_BYTES)
+        while True:
+            with metrics.span('chunk'):
+                batch = next(batches, None)
+            if batch is None:
+                break
+
+            if dedup is not None:
+                with metrics.span('dedup'):
+                    batch, counts = dedup.filter(batch, self.chunk_set)
+                self.dedup_totals.update(counts)
+                if not batch:
+                    continue
+
+            chunks_state_key = batch_key(self.chunk_set, self.batch_count)
+            with metrics.span('state_write'):
+                await save_batch(self.context, chunks_state_key, batch)
+
+            with metrics.span('emit'):
+                await self.context.emit({
+                    "topic": "rag.chunks.ready",
+                    "data": {
+                        "stateKey": chunks_state_key,
+                        "chunkSet": self.chunk_set
+                    }
+                })
+            self.batch_count += 1
+            self.chunk_count += len(batch)
+        self.shards_written += 1
+
+    async def finish(self):
+        file = self.file
+        self.context.logger.info(f"Processed {self.chunk_count} chunks from PDF", {
+            'chunkSet': self.chunk_set,
+            'batches': self.batch_count,
+            'shards': self.shards_written
+        })
+        await self.manifest.record(file, self.chunk_count, self.batch_count)
+
+        if file.get('previousChunkSet') and file['previousChunkSet'] != self.chunk_set:
+            # The file changed: drop the chunks of its previous content
+            for key in file['previousStateKeys']:
+                await delete_batch(self.context, key)
+            await self.context.emit({
+                "topic": "rag.chunks.removed",
+                "data": {
+                    "source": file['fileName'],
+                    "keepChunkSet": self.chunk_set
+                }
+            })
+            if dedup is not None:
+                await save_promoted(dedup.remove(file['fileName'], self.chunk_set), self.context, self.manifest)
+
+
+async def save_batch(context, key, chunks):
+    """
+    Saves a batch under `key`: the chunk list itself, or a chunk file and
+    its reference with CHUNK_STORE=file
+    """
+    value = chunk_store.save(key, chunks) if chunk_store is not None else chunks
+    await context.state.set('rag-workflow', key, value)
+
+
+async def delete_batch(context, key):
+    if chunk_store is not None:
+        chunk_store.delete(key)
+    await context.state.delete('rag-workflow', key)
+
+
+async def remove_chunks(entry, context, manifest):
+    """
+    Tombstones a file that is no longer in the folder: its chunks are
+    removed from state and from Weaviate, the manifest keeps the entry
+    marked as deleted
+    """
+    context.logger.info(f"Removing chunks of deleted PDF: {entry['fileName']}")
+    for key in state_keys(entry):
+        await delete_batch(context, key)
+    await context.emit({
+        "topic": "rag.chunks.removed",
+        "data": {
+            "source": entry['fileName']
+        }
+    })
+    if dedup is not None:
+        await save_promoted(dedup.remove(entry['fileName']), context, manifest)
+
+
+async def save_promoted(promoted, context, manifest):
+    """
+    Saves duplicates that were dropped in favour of chunks that have just
+    been removed, as an extra batch of the file they came from
+    """
+    for chunk_set, chunks in promoted.items():
+        digest = hashlib.sha1(''.join(chunk['text'] for chunk in chunks).encode('utf-8')).hexdigest()[:8]
+        chunks_state_key = f"{chunk_set}_promoted_{digest}"
+        await save_batch(context, chunks_state_key, chunks)
         await context.emit({
             "topic": "rag.chunks.ready",
             "data": {
-                "stateKey": chunks_state_key
+                "stateKey": chunks_state_key,
+                "chunkSet": chunk_set
             }
-        })
\ No newline at end of file
+        })
+        if not await manifest.add_state_keys(chunk_set, [chunks_state_key]):
+            context.logger.warn(f"No manifest entry for chunk set {chunk_set}, {chunks_state_key} is not tracked")
+        context.logger.info(f"Restored {len(chunks)} chunks of {chunks[0]['metadata']['source']} that were merged into removed chunks")
+
+
+def report_profiles(stats, context):
+    report = stats.report()
+    for profile, totals in report.items():
+        metrics.increment(f"pages_{profile}", totals['pages'])
+    context.logger.info("PDF profile stats", report)
+
+
+def report_dedup(totals, context):
+    duplicates = totals['exact'] + totals['near']
+    for counter in ('exact', 'near', 'bytes_saved'):
+        metrics.increment(f"dedup_{counter}", totals[counter])
+    context.logger.info("Chunk dedup stats", {
+        'chunks': totals['chunks'],
+        'duplicates': duplicates,
+        'exact': totals['exact'],
+        'near': totals['near'],
+        'bytes_saved': totals['bytes_saved'],
+        'saved_ratio': duplicates / totals['chunks'] if totals['chunks'] else 0
+    })
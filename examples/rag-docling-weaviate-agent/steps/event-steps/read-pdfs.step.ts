@@ -2,9 +2,11 @@ import { readdir } from 'fs/promises';
 import { join, resolve, isAbsolute } from 'path';
 import { EventConfig, Handlers } from 'motia';
 import { z } from 'zod';
+import { PdfProfile } from '../../types/index';
 
 const InputSchema = z.object({
   folderPath: z.string(),
+  profile: PdfProfile.optional(),
 });
 
 export const config: EventConfig = {
@@ -20,7 +22,7 @@ export const handler: Handlers['read-pdfs'] = async (
   input,
   { emit, logger }
 ) => {
-  const { folderPath } = input;
+  const { folderPath, profile } = input;
   const cwd = process.cwd();
   const currentDirName = resolve(cwd).split('/').pop() ?? '';
   // Normalize common cases where users paste repo-relative paths like
@@ -52,6 +54,8 @@ export const handler: Handlers['read-pdfs'] = async (
   );
 
   // Process PDF files in parallel
+  // (superseded by PDF_WORKERS, which converts the files of one event on a
+  // pool of warmed worker processes inside process-pdfs)
   /*await Promise.all(
     filesInfo.map(async (file) => {
       await emit({
@@ -61,9 +65,9 @@ export const handler: Handlers['read-pdfs'] = async (
     })
   );*/
 
-  // Process PDF files sequentially
+  // Send every file in one event; process-pdfs decides how to parallelize
   await emit({
     topic: 'rag.process.pdfs',
-    data: { files: filesInfo },
+    data: { files: filesInfo, profile },
   });
 };
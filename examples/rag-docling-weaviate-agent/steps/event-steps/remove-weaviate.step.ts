@@ -0,0 +1,55 @@
+import weaviate, { Filters } from 'weaviate-client';
+import { z } from 'zod';
+import { EventConfig, Handlers } from 'motia';
+
+const InputSchema = z.object({
+  source: z.string(),
+  // Set when the file was reprocessed: chunks of this set are kept
+  keepChunkSet: z.string().optional(),
+});
+
+export const config: EventConfig = {
+  type: 'event',
+  name: 'remove-weaviate',
+  subscribes: ['rag.chunks.removed'],
+  emits: [],
+  flows: ['rag-workflow'],
+  input: InputSchema,
+};
+
+export const handler: Handlers['remove-weaviate'] = async (input, { logger }) => {
+  // Chunks only go to the local index (embed-chunks)
+  if (process.env.VECTOR_STORE?.toLowerCase() === 'local') {
+    return;
+  }
+
+  const client = await weaviate.connectToWeaviateCloud(process.env.WEAVIATE_URL!, {
+    authCredentials: new weaviate.ApiKey(process.env.WEAVIATE_API_KEY!),
+    headers: {
+      'X-OpenAI-Api-Key': process.env.OPENAI_API_KEY!,
+    },
+  });
+
+  try {
+    const collection = client.collections.get('Books');
+    const bySource = collection.filter.byProperty('source').equal(input.source);
+    // Filtering on the chunk set rather than deleting everything from the
+    // source makes this safe to run before or after the new chunks are loaded
+    const filter = input.keepChunkSet
+      ? Filters.and(bySource, collection.filter.byProperty('chunkSet').notEqual(input.keepChunkSet))
+      : bySource;
+
+    const result = await collection.data.deleteMany(filter);
+    logger.info('Removed chunks from Weaviate', {
+      source: input.source,
+      keepChunkSet: input.keepChunkSet,
+      removed: result.successful,
+      failed: result.failed,
+    });
+  } catch (error) {
+    logger.error('Error in remove-weaviate step', { error });
+    throw error;
+  } finally {
+    await client.close();
+  }
+};
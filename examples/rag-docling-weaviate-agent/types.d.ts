@@ -12,11 +12,14 @@ declare module 'motia' {
   }
 
   type Handlers = {
-    'read-pdfs': EventHandler<{ folderPath: string }, never>
-    'process-pdfs': EventHandler<never, { topic: 'rag.chunks.ready'; data: { stateKey: string } }>
-    'load-weaviate': EventHandler<{ stateKey: string }, never>
+    'read-pdfs': EventHandler<{ folderPath: string; profile?: 'auto' | 'fast-text' | 'tables' | 'full-ocr' | 'default' }, never>
+    'process-pdfs': EventHandler<never, { topic: 'rag.chunks.ready'; data: { stateKey: string; chunkSet: string } } | { topic: 'rag.chunks.removed'; data: { source: string; keepChunkSet?: string } }>
+    'load-weaviate': EventHandler<{ stateKey: string; chunkSet?: string }, never>
+    'remove-weaviate': EventHandler<{ source: string; keepChunkSet?: string }, never>
+    'embed-chunks': EventHandler<never, { topic: 'rag.chunks.indexed'; data: { count: number; rows: number } }>
     'init-weaviate': EventHandler<{ folderPath: string }, never>
     'api-query-rag': ApiRouteHandler<{ query: string; limit?: number }, unknown, never>
-    'api-process-pdfs': ApiRouteHandler<{ folderPath: string }, unknown, { topic: 'rag.read.pdfs'; data: { folderPath: string } }>
+    'api-query-local': ApiRouteHandler<Record<string, unknown>, unknown, never>
+    'api-process-pdfs': ApiRouteHandler<{ folderPath: string; profile?: 'auto' | 'fast-text' | 'tables' | 'full-ocr' | 'default' }, unknown, { topic: 'rag.read.pdfs'; data: { folderPath: string; profile?: 'auto' | 'fast-text' | 'tables' | 'full-ocr' | 'default' } }>
   }
 }
\ No newline at end of file
@@ -5,6 +5,9 @@ export const ProcessPDFsInput = z.object({
   folder_path: z.string(),
 });
 
+// Docling pipeline profiles of process-pdfs; 'auto' picks one per file from its text layer
+export const PdfProfile = z.enum(['auto', 'fast-text', 'tables', 'full-ocr', 'default']);
+
 // Input schema for querying the RAG system
 export const QueryRAGInput = z.object({
   query: z.string(),
@@ -28,6 +31,7 @@ export const RAGResponse = z.object({
   chunks: z.array(DocumentChunk),
 });
 
+export type PdfProfileType = z.infer<typeof PdfProfile>;
 export type ProcessPDFsInputType = z.infer<typeof ProcessPDFsInput>;
 export type QueryRAGInputType = z.infer<typeof QueryRAGInput>;
 export type DocumentChunkType = z.infer<typeof DocumentChunk>;
@@ -0,0 +1,103 @@
+import { createReadStream } from 'fs';
+import { DocumentChunkType } from '../types/index';
+
+// Chunk files written by process-pdfs (steps/event-steps/pdf_ingest/chunk_store.py):
+//
+//   header  'RAGC', u8 version
+//   string  u8 1, u32 byte length, UTF-8 bytes (appended to the string dictionary)
+//   chunk   u8 2, u32 title id, u32 source id, u32 page, u32 text byte length, UTF-8 text
+//
+// All integers are little-endian.
+export const CHUNK_FORMAT = 'ragc/1';
+
+const MAGIC = 'RAGC';
+const VERSION = 1;
+const STRING = 1;
+const CHUNK = 2;
+const CHUNK_HEADER = 17;
+
+// What process-pdfs saves in state instead of the chunks with CHUNK_STORE=file
+export type StoredChunks = {
+  format: string;
+  path: string;
+  chunks: number;
+  bytes: number;
+};
+
+export const isStoredChunks = (value: unknown): value is StoredChunks =>
+  typeof value === 'object' && value !== null && (value as StoredChunks).format === CHUNK_FORMAT;
+
+// Reads a chunk file front to back, one chunk at a time
+export async function* readChunkFile(path: string): AsyncGenerator<DocumentChunkType> {
+  const strings: string[] = [];
+  let buffer = Buffer.alloc(0);
+  let headerRead = false;
+
+  for await (const data of createReadStream(path)) {
+    buffer = buffer.length ? Buffer.concat([buffer, data as Buffer]) : (data as Buffer);
+    let offset = 0;
+
+    if (!headerRead) {
+      if (buffer.length < MAGIC.length + 1) {
+        continue;
+      }
+      if (buffer.toString('latin1', 0, MAGIC.length) !== MAGIC || buffer[MAGIC.length] !== VERSION) {
+        throw new Error(`Not a ${CHUNK_FORMAT} chunk file: ${path}`);
+      }
+      offset = MAGIC.length + 1;
+      headerRead = true;
+    }
+
+    while (offset < buffer.length) {
+      const tag = buffer[offset];
+      if (tag === STRING) {
+        if (offset + 5 > buffer.length) break;
+        const end = offset + 5 + buffer.readUInt32LE(offset + 1);
+        if (end > buffer.length) break;
+        strings.push(buffer.toString('utf8', offset + 5, end));
+        offset = end;
+      } else if (tag === CHUNK) {
+        if (offset + CHUNK_HEADER > buffer.length) break;
+        const end = offset + CHUNK_HEADER + buffer.readUInt32LE(offset + 13);
+        if (end > buffer.length) break;
+        yield {
+          text: buffer.toString('utf8', offset + CHUNK_HEADER, end),
+          title: strings[buffer.readUInt32LE(offset + 1)],
+          metadata: {
+            source: strings[buffer.readUInt32LE(offset + 5)],
+            page: buffer.readUInt32LE(offset + 9),
+          },
+        };
+        offset = end;
+      } else {
+        throw new Error(`Corrupt chunk file ${path}: unknown record ${tag}`);
+      }
+    }
+
+    buffer = buffer.subarray(offset);
+  }
+
+  if (buffer.length || !headerRead) {
+    throw new Error(`Truncated chunk file: ${path}`);
+  }
+}
+
+// Chunks of a state value: a chunk file reference, or the chunk list itself
+// (CHUNK_STORE=state and chunks saved before chunk files)
+export async function* iterateChunks(
+  value: StoredChunks | DocumentChunkType[]
+): AsyncGenerator<DocumentChunkType> {
+  if (isStoredChunks(value)) {
+    // A file cut at a record boundary still parses, the reference has the count
+    let count = 0;
+    for await (const chunk of readChunkFile(value.path)) {
+      count += 1;
+      yield chunk;
+    }
+    if (count !== value.chunks) {
+      throw new Error(`Truncated chunk file: ${value.path} has ${count} of ${value.chunks} chunks`);
+    }
+  } else {
+    yield* value;
+  }
+}
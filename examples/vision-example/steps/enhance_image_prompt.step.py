@@ -1,5 +1,8 @@
 from anthropic import Anthropic
 import os
+import ultraimport
+
+metrics = ultraimport('__dir__/step_metrics.py', 'metrics')
 
 client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
 
@@ -13,6 +16,7 @@ config = {
   "input": None,  # No schema validation in Python
 }
 
+@metrics.instrument('enhance image prompt')
 async def handler(args, ctx):
   ctx.logger.info('enhance image prompt', args)
 
@@ -26,20 +30,22 @@ async def handler(args, ctx):
   Make sure the prompt is not too long. Only return the enhanced prompt, no other text.
   """
 
-  response = client.messages.create(
-    model="claude-3-sonnet-20240229",
-    messages=[{
-      "role": "user",
-      "content": prompt_enhancement_prompt
-    }],
-    max_tokens=1000
-  )
+  with metrics.span('llm'):
+    response = client.messages.create(
+      model="claude-3-sonnet-20240229",
+      messages=[{
+        "role": "user",
+        "content": prompt_enhancement_prompt
+      }],
+      max_tokens=1000
+    )
 
   enhanced_prompt = response.content[0].text
 
   ctx.logger.info('enhanced prompt', enhanced_prompt)
 
-  await ctx.emit({
-    "type": 'generate-image',
-    "data": {"prompt": enhanced_prompt, "original_prompt": prompt },
-  })
\ No newline at end of file
+  with metrics.span('emit'):
+    await ctx.emit({
+      "type": 'generate-image',
+      "data": {"prompt": enhanced_prompt, "original_prompt": prompt },
+    })
\ No newline at end of file
@@ -4,6 +4,7 @@ import os
 import json
 
 download_image = ultraimport('__dir__/download_image.py', 'download_image')
+metrics = ultraimport('__dir__/step_metrics.py', 'metrics')
 
 config = {
     "type": "event",
@@ -15,6 +16,7 @@ config = {
     "input": None,  # No schema validation in Python version
 }
 
+@metrics.instrument('Vision agent - evaluate vision result')
 async def handler(args, ctx):
     ctx.logger.info('evaluate vision result', args)
     
@@ -37,7 +39,8 @@ Take into account the following considerations for your evaluation:
 Return ONLY a numeric score between 0 and 100, where 100 means the image perfectly matches the prompt.
 Do not include any other text or explanation in your response - just the number."""
         
-        raw_response = lmm(prompt, media=[args.image])
+        with metrics.span('vision_llm'):
+            raw_response = lmm(prompt, media=[args.image])
         # Extract just the numeric value from the response
         score = float(raw_response.strip())
         
@@ -46,7 +49,7 @@ Do not include any other text or explanation in your response - just the number.
         
         # Write score to a file in tmp directory with trace ID
         score_file = f'{os.path.dirname(os.path.dirname(__file__))}/tmp/{ctx.trace_id}_report.txt'
-        with open(score_file, 'a') as f:
+        with metrics.span('write_report'), open(score_file, 'a') as f:
             report = {
                 "original_prompt": args.original_prompt,
                 "prompt": args.prompt,
@@ -61,4 +64,5 @@ Do not include any other text or explanation in your response - just the number.
             ctx.logger.info('image is not a good representation, try again or use a different prompt', score)
         
     except ValueError:
+        metrics.mark_error()
         ctx.logger.error('Invalid response from vision agent', raw_response)
\ No newline at end of file